@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+BATCH_SIZE = 500
+CANCEL_POLL_SECONDS = 0.1
+
+UNIVERSAL_TAGS = {
+    'NN': 'NOUN', 'NNS': 'NOUN', 'NNP': 'PROPN', 'NNPS': 'PROPN',
+    'VB': 'VERB', 'VBD': 'VERB', 'VBG': 'VERB', 'VBN': 'VERB', 'VBP': 'VERB', 'VBZ': 'VERB', 'MD': 'AUX',
+    'JJ': 'ADJ', 'JJR': 'ADJ', 'JJS': 'ADJ',
+    'RB': 'ADV', 'RBR': 'ADV', 'RBS': 'ADV', 'WRB': 'ADV',
+    'PRP': 'PRON', 'PRP$': 'PRON', 'WP': 'PRON', 'WP$': 'PRON', 'EX': 'PRON',
+    'DT': 'DET', 'PDT': 'DET', 'WDT': 'DET',
+    'IN': 'ADP', 'CC': 'CCONJ', 'CD': 'NUM', 'UH': 'INTJ', 'RP': 'PART', 'TO': 'PART', 'POS': 'PART',
+}
+TAG_FEATURES = {
+    'NN': 'Number=Sing', 'NNS': 'Number=Plur', 'NNP': 'Number=Sing', 'NNPS': 'Number=Plur',
+    'VB': 'VerbForm=Inf', 'VBD': 'Tense=Past|VerbForm=Fin', 'VBG': 'VerbForm=Ger',
+    'VBN': 'Tense=Past|VerbForm=Part', 'VBP': 'Tense=Pres|VerbForm=Fin',
+    'VBZ': 'Number=Sing|Person=3|Tense=Pres|VerbForm=Fin', 'MD': 'VerbType=Mod',
+    'JJ': 'Degree=Pos', 'JJR': 'Degree=Cmp', 'JJS': 'Degree=Sup',
+    'RBR': 'Degree=Cmp', 'RBS': 'Degree=Sup',
+    'PRP': 'PronType=Prs', 'PRP$': 'Poss=Yes|PronType=Prs', 'WP': 'PronType=Int', 'WP$': 'Poss=Yes|PronType=Int',
+    'WDT': 'PronType=Int', 'WRB': 'PronType=Int', 'CD': 'NumType=Card',
+}
+WORDNET_POS = {'N': 'n', 'V': 'v', 'J': 'a', 'R': 'r'}
+
+_tools = None
+
+
+def _load_tools():
+    global _tools
+    if _tools is None:
+        from nltk import pos_tag_sents
+        from nltk.stem import WordNetLemmatizer
+
+        _tools = (pos_tag_sents, WordNetLemmatizer())
+    return _tools
+
+
+def format_morphology(tag, lemma):
+    universal_tag = UNIVERSAL_TAGS.get(tag, 'X')
+    features = TAG_FEATURES.get(tag, '-')
+    return f"Часть речи: {universal_tag} ({tag}); лемма: {lemma}; признаки: {features}"
+
+
+def annotate_words(words):
+    pos_tag_sents, lemmatizer = _load_tools()
+    annotations = []
+    for (word, tag), in pos_tag_sents([[word] for word in words]):
+        wordnet_pos = WORDNET_POS.get(tag[:1])
+        lemma = lemmatizer.lemmatize(word, wordnet_pos) if wordnet_pos else word
+        annotations.append((word, format_morphology(tag, lemma)))
+    return annotations
+
+
+def words_without_morphology(lexicon):
+    if hasattr(lexicon, 'words_without_morphology'):
+        return lexicon.words_without_morphology()
+    return [word for word, data in lexicon.items() if not data['morphology']]
+
+
+def fill_morphology(lexicon, annotations):
+    if hasattr(lexicon, 'fill_morphology'):
+        return lexicon.fill_morphology(annotations)
+    filled = 0
+    for word, morphology in annotations:
+        entry = lexicon.get(word)
+        if entry is not None and not entry['morphology']:
+            entry['morphology'] = morphology
+            filled += 1
+    return filled
+
+
+class MorphologyJob:
+
+    def __init__(self, words, memo=None, max_workers=None, batch_size=BATCH_SIZE):
+        self.words = words
+        self.memo = memo if memo is not None else {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.messages = queue.Queue()
+        self.processed = 0
+        self.memo_hits = 0
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def words_per_second(self):
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed else 0.0
+
+    def _emit(self, annotations):
+        self.processed += len(annotations)
+        self.messages.put(('batch', annotations))
+
+    def _finish(self, kind):
+        self.finished_at = time.perf_counter()
+        self.messages.put((kind, None))
+
+    def _run(self):
+        try:
+            self.messages.put(('start', len(self.words)))
+
+            remembered = []
+            missing = []
+            for word in self.words:
+                morphology = self.memo.get(word)
+                if morphology is None:
+                    missing.append(word)
+                else:
+                    remembered.append((word, morphology))
+            self.memo_hits = len(remembered)
+            if remembered:
+                self._emit(remembered)
+
+            batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            if batches:
+                executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches)))
+                try:
+                    futures = {executor.submit(annotate_words, batch) for batch in batches}
+                    while futures:
+                        done, futures = wait(futures, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                        if self._cancel_event.is_set():
+                            self._finish('cancelled')
+                            return
+
+                        for future in done:
+                            annotations = future.result()
+                            self.memo.update(annotations)
+                            self._emit(annotations)
+                finally:
+                    executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+
+            self._finish('done')
+        except Exception as e:
+            self.finished_at = time.perf_counter()
+            self.messages.put(('error', e))
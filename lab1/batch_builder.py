@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dictionary_io import merge_counts, read_dictionary, write_dictionary
+from text_processing import DEFAULT_TOKENIZER, TOKENIZERS, get_tokenizer
+
+
+SOURCE_EXTENSIONS = ('.pdf', '.txt')
+
+
+def find_sources(root_dir):
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SOURCE_EXTENSIONS):
+                sources.append(os.path.join(dirpath, filename))
+    return sources
+
+
+def count_file(filepath, tokenizer=DEFAULT_TOKENIZER):
+    if filepath.lower().endswith('.pdf'):
+        from pdf_extract import count_pages, extract_page_range
+
+        word_counts = Counter()
+        for page_num, page_text, page_counts, page_error in extract_page_range(filepath, 0, count_pages(filepath), tokenizer):
+            if page_error:
+                print(f"Предупреждение: {filepath}: не удалось извлечь текст со страницы {page_num + 1}: {page_error}", file=sys.stderr)
+            word_counts.update(page_counts)
+        return word_counts
+
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        return Counter(get_tokenizer(tokenizer)(f.read()))
+
+
+def build_dictionary(sources, seed=None, max_workers=None, on_progress=None, tokenizer=DEFAULT_TOKENIZER):
+    word_data = seed if seed is not None else {}
+    if not sources:
+        return word_data
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(count_file, filepath, tokenizer): filepath for filepath in sources}
+        for done, future in enumerate(as_completed(futures), start=1):
+            filepath = futures[future]
+            try:
+                merge_counts(word_data, future.result())
+            except Exception as e:
+                print(f"Предупреждение: не удалось обработать '{filepath}': {e}", file=sys.stderr)
+            if on_progress:
+                on_progress(done, len(futures), filepath)
+
+    return word_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Пакетное построение частотного словаря по каталогу PDF и текстовых файлов."
+    )
+    parser.add_argument("source_dir", help="каталог с файлами .pdf и .txt (обходится рекурсивно)")
+    parser.add_argument("-o", "--output", required=True, help="путь к результирующему словарю JSON")
+    parser.add_argument("-s", "--seed", help="существующий словарь JSON: его частоты и морфология сохраняются, новые частоты добавляются к ним")
+    parser.add_argument("-t", "--tokenizer", choices=sorted(TOKENIZERS), default=DEFAULT_TOKENIZER,
+                        help="токенизатор: nltk (word_tokenize) или fast (быстрый, на регулярном выражении)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="число рабочих процессов (по умолчанию - число ядер)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source_dir):
+        parser.error(f"каталог не найден: {args.source_dir}")
+
+    seed = read_dictionary(args.seed) if args.seed else None
+    sources = find_sources(args.source_dir)
+    print(f"Найдено файлов: {len(sources)}")
+
+    def report(done, total, filepath):
+        print(f"[{done}/{total}] {filepath}")
+
+    start = time.perf_counter()
+    word_data = build_dictionary(sources, seed=seed, max_workers=args.workers, on_progress=report,
+                                 tokenizer=args.tokenizer)
+    write_dictionary(word_data, args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"Словарь сохранен в '{args.output}': {len(word_data)} словоформ, {elapsed:.1f} с.")
+
+
+if __name__ == "__main__":
+    main()
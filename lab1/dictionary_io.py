@@ -0,0 +1,59 @@
+import json
+
+
+def validate_dictionary(word_data):
+    if not isinstance(word_data, dict): raise ValueError("Формат файла не dict.")
+    for word, data in word_data.items():
+        if not isinstance(data, dict) or 'frequency' not in data or 'morphology' not in data: raise ValueError(f"Структура для '{word}' некорректна.")
+        if not isinstance(data['frequency'], int): raise ValueError(f"Частота для '{word}' не int.")
+        if not isinstance(data['morphology'], str): raise ValueError(f"Морфология для '{word}' не str.")
+
+
+def read_dictionary(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        word_data = json.load(f)
+    validate_dictionary(word_data)
+    return word_data
+
+
+def apply_count_deltas(word_data, deltas):
+    vocabulary_changed = False
+    for word, delta in deltas.items():
+        if not delta:
+            continue
+        entry = word_data.get(word)
+        if entry is None:
+            if delta > 0:
+                word_data[word] = {'frequency': delta, 'morphology': ''}
+                vocabulary_changed = True
+        elif entry['frequency'] + delta > 0:
+            entry['frequency'] += delta
+        else:
+            del word_data[word]
+            vocabulary_changed = True
+    return vocabulary_changed
+
+
+def write_dictionary(word_data, filepath):
+    sorted_word_data = {
+        word: {'frequency': data['frequency'], 'morphology': data['morphology']}
+        for word, data in sorted(word_data.items())
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(sorted_word_data, f, ensure_ascii=False, indent=4)
+
+
+def sorted_words(word_data):
+    if hasattr(word_data, 'sorted_words'):
+        return word_data.sorted_words()
+    return sorted(word_data)
+
+
+def merge_counts(word_data, word_counts):
+    for word, freq in word_counts.items():
+        entry = word_data.get(word)
+        if entry is None:
+            word_data[word] = {'frequency': freq, 'morphology': ''}
+        else:
+            entry['frequency'] += freq
+    return word_data
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "iazis", "extraction")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+ENTRY_SUFFIX = ".json.gz"
+TEMP_SUFFIX = ".tmp"
+STALE_TEMP_SECONDS = 60 * 60
+STATS_FILE = "stats.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("IAZIS_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def make_key(self, content_digest, extractor, version):
+        return hashlib.sha256(f"{content_digest}:{extractor}:{version}".encode('utf-8')).hexdigest()
+
+    def file_key(self, filepath, extractor, version):
+        return self.make_key(file_digest(filepath), extractor, version)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key, record=True):
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            if record:
+                self._record(hit=False)
+            return None
+        if record:
+            self._record(hit=True)
+        return data
+
+    def put(self, key, data):
+        path = self._entry_path(key)
+        temp_path = path + TEMP_SUFFIX
+        try:
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            self._remove(temp_path)
+            raise
+        self.evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _remove_stale_temp_files(self):
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith(TEMP_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stale = now - os.stat(path).st_mtime > STALE_TEMP_SECONDS
+                except OSError:
+                    continue
+                if stale:
+                    self._remove(path)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        self._remove_stale_temp_files()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    def clear(self):
+        self._remove_stale_temp_files()
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def _stats_path(self):
+        return os.path.join(self.directory, STATS_FILE)
+
+    def _load_totals(self):
+        try:
+            with open(self._stats_path(), 'r', encoding='utf-8') as f:
+                totals = json.load(f)
+            return int(totals.get('hits', 0)), int(totals.get('misses', 0))
+        except (OSError, ValueError, AttributeError):
+            return 0, 0
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            total_hits, total_misses = self._load_totals()
+            totals = {'hits': total_hits + (1 if hit else 0), 'misses': total_misses + (0 if hit else 1)}
+            try:
+                with open(self._stats_path(), 'w', encoding='utf-8') as f:
+                    json.dump(totals, f)
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        total_hits, total_misses = self._load_totals()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'total_hits': total_hits,
+            'total_misses': total_misses,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'directory': self.directory,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        session_requests = stats['hits'] + stats['misses']
+        total_requests = stats['total_hits'] + stats['total_misses']
+        session_rate = stats['hits'] / session_requests if session_requests else 0.0
+        total_rate = stats['total_hits'] / total_requests if total_requests else 0.0
+        return (f"Каталог: {stats['directory']}\n"
+                f"Записей: {stats['entries']}, размер: {stats['size_bytes'] / (1024 * 1024):.1f} МБ "
+                f"из {stats['max_bytes'] / (1024 * 1024):.0f} МБ\n"
+                f"Текущий сеанс: попаданий {stats['hits']}, промахов {stats['misses']} ({session_rate:.0%})\n"
+                f"Всего: попаданий {stats['total_hits']}, промахов {stats['total_misses']} ({total_rate:.0%})")
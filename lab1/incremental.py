@@ -0,0 +1,57 @@
+from collections import Counter
+from difflib import SequenceMatcher
+
+from text_processing import get_tokenizer
+
+
+class IncrementalAnalysis:
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.tokenize_words = get_tokenizer(tokenizer)
+        self.paragraphs = []
+        self.paragraph_counts = []
+
+    def count_paragraph(self, paragraph):
+        if not paragraph.strip():
+            return None
+        return Counter(self.tokenize_words(paragraph))
+
+    def update(self, text):
+        old_paragraphs = self.paragraphs
+        old_counts = self.paragraph_counts
+        new_paragraphs = text.splitlines()
+
+        prefix = 0
+        limit = min(len(old_paragraphs), len(new_paragraphs))
+        while prefix < limit and old_paragraphs[prefix] == new_paragraphs[prefix]:
+            prefix += 1
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and old_paragraphs[-suffix - 1] == new_paragraphs[-suffix - 1]:
+            suffix += 1
+
+        old_middle = old_paragraphs[prefix:len(old_paragraphs) - suffix]
+        new_middle = new_paragraphs[prefix:len(new_paragraphs) - suffix]
+        middle_counts = old_counts[prefix:len(old_counts) - suffix]
+
+        delta = Counter()
+        new_counts = []
+        changed = 0
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_middle, new_middle).get_opcodes():
+            if tag == 'equal':
+                new_counts.extend(middle_counts[i1:i2])
+                continue
+            for counts in middle_counts[i1:i2]:
+                if counts:
+                    delta.subtract(counts)
+            for paragraph in new_middle[j1:j2]:
+                counts = self.count_paragraph(paragraph)
+                if counts:
+                    delta.update(counts)
+                new_counts.append(counts)
+            changed += max(i2 - i1, j2 - j1)
+
+        self.paragraphs = new_paragraphs
+        self.paragraph_counts = old_counts[:prefix] + new_counts + old_counts[len(old_counts) - suffix:]
+        return delta, changed
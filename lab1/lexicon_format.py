@@ -0,0 +1,286 @@
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+
+from dictionary_io import read_dictionary, write_dictionary
+
+
+MAGIC = b'LEXB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQQQQ')
+ALIGNMENT = 8
+BINARY_EXTENSION = '.lexb'
+
+
+def is_binary_dictionary_path(filepath):
+    return filepath.lower().endswith(BINARY_EXTENSION)
+
+
+def _packed(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _padding(length):
+    return b'\0' * (-length % ALIGNMENT)
+
+
+def _iter_entries(word_data):
+    if hasattr(word_data, 'iter_entries'):
+        return word_data.iter_entries()
+    return ((word, data['frequency'], data['morphology']) for word, data in sorted(word_data.items()))
+
+
+def write_binary_dictionary(word_data, filepath):
+    word_offsets = array('Q', [0])
+    word_blob = bytearray()
+    frequencies = array('Q')
+    morphology_offsets = array('Q', [0])
+    morphology_blob = bytearray()
+
+    for word, frequency, morphology in _iter_entries(word_data):
+        word_blob += word.encode('utf-8')
+        word_offsets.append(len(word_blob))
+        frequencies.append(frequency)
+        if morphology:
+            morphology_blob += morphology.encode('utf-8')
+        morphology_offsets.append(len(morphology_blob))
+
+    sections = [_packed(word_offsets), bytes(word_blob), _packed(frequencies),
+                _packed(morphology_offsets), bytes(morphology_blob)]
+    positions = []
+    position = HEADER.size + len(_padding(HEADER.size))
+    for section in sections:
+        positions.append(position)
+        position += len(section) + len(_padding(len(section)))
+
+    temp_path = filepath + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(frequencies), *positions))
+        f.write(_padding(HEADER.size))
+        for section in sections:
+            f.write(section)
+            f.write(_padding(len(section)))
+
+    if isinstance(word_data, MappedDictionary) and os.path.exists(filepath) \
+            and os.path.samefile(word_data.filepath, filepath):
+        word_data.close()
+        os.replace(temp_path, filepath)
+        word_data.reopen()
+    else:
+        os.replace(temp_path, filepath)
+
+
+class WordTable(Sequence):
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return self.dictionary.base_size
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.dictionary.word_at(i) for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return self.dictionary.word_at(item)
+
+
+class LazyEntry(MutableMapping):
+
+    def __init__(self, dictionary, word, index):
+        self.dictionary = dictionary
+        self.word = word
+        self.index = index
+        self.overrides = {}
+
+    def __getitem__(self, key):
+        if key in self.overrides:
+            return self.overrides[key]
+        if key == 'frequency':
+            return self.dictionary.frequency_at(self.index)
+        if key == 'morphology':
+            return self.dictionary.morphology_at(self.index)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.overrides[key] = value
+        self.dictionary.changed[self.word] = self
+
+    def __delitem__(self, key):
+        raise TypeError("Поля записи словаря нельзя удалять.")
+
+    def __iter__(self):
+        yield 'frequency'
+        yield 'morphology'
+        yield from (key for key in self.overrides if key not in ('frequency', 'morphology'))
+
+    def __len__(self):
+        return len(set(self.overrides) | {'frequency', 'morphology'})
+
+
+class MappedDictionary(Mapping):
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = None
+        self._mmap = None
+        self.reopen()
+
+    def reopen(self):
+        self.close()
+        self._file = open(self.filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, *positions = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError("Файл не является бинарным словарем.")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия бинарного словаря: {version}.")
+
+        word_offsets_pos, words_pos, frequencies_pos, morphology_offsets_pos, morphology_pos = positions
+        view = memoryview(self._mmap)
+        self._views = [view]
+        self.base_size = count
+        self._word_offsets = self._cast(view, word_offsets_pos, count + 1)
+        self._words_pos = words_pos
+        self._frequencies = self._cast(view, frequencies_pos, count)
+        self._morphology_offsets = self._cast(view, morphology_offsets_pos, count + 1)
+        self._morphology_pos = morphology_pos
+
+        self.words = WordTable(self)
+        self.changed = {}
+        self.added = set()
+
+    def _cast(self, view, position, length):
+        section = view[position:position + length * 8]
+        values = section.cast('Q')
+        self._views.extend((section, values))
+        if sys.byteorder != 'little':
+            values = array('Q', values)
+            values.byteswap()
+        return values
+
+    def close(self):
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def word_at(self, index):
+        start = self._words_pos + self._word_offsets[index]
+        end = self._words_pos + self._word_offsets[index + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def frequency_at(self, index):
+        return self._frequencies[index]
+
+    def morphology_at(self, index):
+        start = self._morphology_pos + self._morphology_offsets[index]
+        end = self._morphology_pos + self._morphology_offsets[index + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def index_of(self, word):
+        low, high = 0, self.base_size
+        while low < high:
+            middle = (low + high) // 2
+            if self.word_at(middle) < word:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.base_size and self.word_at(low) == word:
+            return low
+        return -1
+
+    def __getitem__(self, word):
+        entry = self.changed.get(word)
+        if entry is not None:
+            return entry
+        index = self.index_of(word)
+        if index < 0:
+            raise KeyError(word)
+        return LazyEntry(self, word, index)
+
+    def __setitem__(self, word, entry):
+        if word not in self:
+            self.added.add(word)
+        self.changed[word] = entry
+
+    def __contains__(self, word):
+        return word in self.changed or self.index_of(word) >= 0
+
+    def __len__(self):
+        return self.base_size + len(self.added)
+
+    def __iter__(self):
+        if not self.added:
+            return iter(self.words)
+        return heapq.merge(self.words, sorted(self.added))
+
+    def sorted_words(self):
+        if not self.added:
+            return self.words
+        return list(self)
+
+    def iter_entries(self):
+        if self.added:
+            for word in self:
+                entry = self[word]
+                yield word, entry['frequency'], entry['morphology']
+            return
+
+        for index in range(self.base_size):
+            word = self.word_at(index)
+            entry = self.changed.get(word)
+            if entry is not None:
+                yield word, entry['frequency'], entry['morphology']
+            else:
+                yield word, self.frequency_at(index), self.morphology_at(index)
+
+
+def open_binary_dictionary(filepath):
+    return MappedDictionary(filepath)
+
+
+def json_to_binary(json_path, binary_path):
+    write_binary_dictionary(read_dictionary(json_path), binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    word_data = open_binary_dictionary(binary_path)
+    try:
+        write_dictionary(word_data, json_path)
+    finally:
+        word_data.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Преобразование словаря между форматами JSON и бинарным (.lexb).")
+    parser.add_argument("source", help="исходный словарь (.json или .lexb)")
+    parser.add_argument("target", help="результирующий словарь (.json или .lexb)")
+    args = parser.parse_args(argv)
+
+    if is_binary_dictionary_path(args.source):
+        binary_to_json(args.source, args.target)
+    else:
+        json_to_binary(args.source, args.target)
+    print(f"Словарь '{args.source}' преобразован в '{args.target}'.")
+
+
+if __name__ == "__main__":
+    main()
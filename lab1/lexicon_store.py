@@ -0,0 +1,208 @@
+import sqlite3
+from collections.abc import Mapping, MutableMapping
+
+
+PAGE_SIZE = 256
+MAX_CACHED_PAGES = 8
+MAX_CODE_POINT = 0x10FFFF
+
+SORT_ORDERS = {
+    'word': "word",
+    'frequency': "frequency DESC, word",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lexicon (
+    word TEXT PRIMARY KEY,
+    frequency INTEGER NOT NULL,
+    morphology TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lexicon_by_frequency ON lexicon (frequency DESC, word);
+"""
+
+
+def prefix_bounds(prefix):
+    if not prefix:
+        return "", None
+    last = ord(prefix[-1])
+    if last == MAX_CODE_POINT:
+        return prefix, None
+    return prefix, prefix[:-1] + chr(last + 1)
+
+
+class StoreEntry(MutableMapping):
+
+    def __init__(self, store, word, frequency, morphology):
+        self.store = store
+        self.word = word
+        self.values = {'frequency': frequency, 'morphology': morphology}
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        if key not in self.values:
+            raise KeyError(key)
+        self.store.update_entry(self.word, key, value)
+        self.values[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Поля записи словаря нельзя удалять.")
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class LexiconView:
+
+    def __init__(self, store, prefix="", order='word'):
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Неизвестный порядок сортировки: {order}")
+        self.store = store
+        self.order = order
+        self.lower, self.upper = prefix_bounds(prefix)
+        self._length = None
+        self._pages = {}
+        self._after = {0: None}
+
+    def _where(self):
+        if self.upper is None:
+            return "word >= ?", (self.lower,)
+        return "word >= ? AND word < ?", (self.lower, self.upper)
+
+    def __len__(self):
+        if self._length is None:
+            where, params = self._where()
+            self._length = self.store.connection.execute(
+                f"SELECT COUNT(*) FROM lexicon WHERE {where}", params).fetchone()[0]
+        return self._length
+
+    def _rows_after(self, key, limit):
+        where, params = self._where()
+        execute = self.store.connection.execute
+        if key is None:
+            return execute(f"SELECT word, frequency FROM lexicon WHERE {where} ORDER BY {SORT_ORDERS[self.order]} LIMIT ?",
+                           params + (limit,)).fetchall()
+        word, frequency = key
+        if self.order == 'word':
+            return execute(f"SELECT word, frequency FROM lexicon WHERE {where} AND word > ? ORDER BY word LIMIT ?",
+                           params + (word, limit)).fetchall()
+        rows = execute(f"SELECT word, frequency FROM lexicon WHERE {where} AND frequency = ? AND word > ? "
+                       f"ORDER BY word LIMIT ?", params + (frequency, word, limit)).fetchall()
+        if len(rows) < limit:
+            rows += execute(f"SELECT word, frequency FROM lexicon WHERE {where} AND frequency < ? "
+                            f"ORDER BY frequency DESC, word LIMIT ?", params + (frequency, limit - len(rows))).fetchall()
+        return rows
+
+    def _page(self, number):
+        page = self._pages.get(number)
+        if page is None:
+            rows = []
+            for current in range(max(known for known in self._after if known <= number), number + 1):
+                rows = self._rows_after(self._after[current], PAGE_SIZE)
+                if not rows:
+                    break
+                self._after[current + 1] = rows[-1]
+            if len(self._pages) >= MAX_CACHED_PAGES:
+                self._pages.clear()
+            page = self._pages[number] = [word for word, _ in rows]
+        return page
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            words = []
+            position = start
+            while position < stop:
+                number, offset = divmod(position, PAGE_SIZE)
+                chunk = self._page(number)[offset:offset + stop - position]
+                if not chunk:
+                    break
+                words.extend(chunk)
+                position += len(chunk)
+            return words
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        number, offset = divmod(item, PAGE_SIZE)
+        return self._page(number)[offset]
+
+
+class LexiconStore(Mapping):
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def apply_counts(self, counts):
+        rows = [(word, delta) for word, delta in counts.items() if delta]
+        if not rows:
+            return 0
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO lexicon (word, frequency) VALUES (?, ?) "
+                "ON CONFLICT(word) DO UPDATE SET frequency = frequency + excluded.frequency",
+                rows)
+            self.connection.execute("DELETE FROM lexicon WHERE frequency <= 0")
+        return len(rows)
+
+    def update_entry(self, word, field, value):
+        if field not in ('frequency', 'morphology'):
+            raise KeyError(field)
+        with self.connection:
+            self.connection.execute(f"UPDATE lexicon SET {field} = ? WHERE word = ?", (value, word))
+
+    def words_without_morphology(self):
+        return [word for word, in self.connection.execute("SELECT word FROM lexicon WHERE morphology = '' ORDER BY word")]
+
+    def fill_morphology(self, annotations):
+        with self.connection:
+            cursor = self.connection.executemany(
+                "UPDATE lexicon SET morphology = ? WHERE word = ? AND morphology = ''",
+                [(morphology, word) for word, morphology in annotations])
+        return cursor.rowcount
+
+    def frequency(self, word):
+        row = self.connection.execute("SELECT frequency FROM lexicon WHERE word = ?", (word,)).fetchone()
+        return row[0] if row else 0
+
+    def view(self, prefix="", order='word'):
+        return LexiconView(self, prefix, order)
+
+    def iter_entries(self):
+        yield from self.connection.execute("SELECT word, frequency, morphology FROM lexicon ORDER BY word")
+
+    def items(self):
+        for word, frequency, morphology in self.iter_entries():
+            yield word, StoreEntry(self, word, frequency, morphology)
+
+    def __getitem__(self, word):
+        row = self.connection.execute(
+            "SELECT frequency, morphology FROM lexicon WHERE word = ?", (word,)).fetchone()
+        if row is None:
+            raise KeyError(word)
+        return StoreEntry(self, word, *row)
+
+    def __contains__(self, word):
+        return self.connection.execute("SELECT 1 FROM lexicon WHERE word = ?", (word,)).fetchone() is not None
+
+    def __iter__(self):
+        return (word for word, in self.connection.execute("SELECT word FROM lexicon ORDER BY word"))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM lexicon").fetchone()[0]
@@ -1,10 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import PyPDF2
-from nltk.tokenize import word_tokenize
-from collections import Counter
 import json
 import os
+import queue
+import sqlite3
+import time
+
+from auto_morphology import MorphologyJob, fill_morphology, words_without_morphology
+from extraction_cache import ExtractionCache
+from dictionary_io import apply_count_deltas, merge_counts, read_dictionary, sorted_words, write_dictionary
+from incremental import IncrementalAnalysis
+from lexicon_store import LexiconStore
+from lexicon_format import is_binary_dictionary_path, open_binary_dictionary, write_binary_dictionary
+from pdf_extract import PdfExtractionJob
+from virtual_list import VirtualWordList
+from word_index import SubstringIndex
+
+
+EXTRACTION_POLL_MS = 100
+WORD_LIST_REFRESH_SECONDS = 1.0
+SORT_ORDER_LABELS = {"По алфавиту": 'word', "По частоте": 'frequency'}
 
 
 class LexicalAnalyzerApp:
@@ -19,6 +35,20 @@ class LexicalAnalyzerApp:
         self.raw_text = ""
         self.word_data = {}
         self.filtered_word_list = []
+        self.word_index = None
+        self.input_analysis = None
+        self.extraction_job = None
+        self.extracted_pages = []
+        self.last_list_refresh = 0
+        self.lexicon_store = None
+        self.morphology_job = None
+        self.morphology_memo = {}
+        self.morphology_filled = 0
+        try:
+            self.extraction_cache = ExtractionCache()
+        except OSError as e:
+            print(f"Предупреждение: кэш извлечения текста недоступен: {e}")
+            self.extraction_cache = None
 
         style = ttk.Style()
         style.configure("TButton", padding=6, relief="flat", background="#ccc")
@@ -30,6 +60,15 @@ class LexicalAnalyzerApp:
 
         control_frame = ttk.Frame(master, padding="10")
         control_frame.pack(side=tk.TOP, fill=tk.X)
+        self.control_frame = control_frame
+
+        self.progress_frame = ttk.Frame(master, padding=(10, 0, 10, 5))
+        self.progress_label = ttk.Label(self.progress_frame, text="Извлечение текста из PDF...")
+        self.progress_label.pack(side=tk.LEFT)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL, mode='determinate')
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.cancel_button = ttk.Button(self.progress_frame, text="Отмена", command=self.cancel_background_job)
+        self.cancel_button.pack(side=tk.RIGHT)
 
         input_text_frame = ttk.LabelFrame(master, text="Или введите текст для анализа здесь", padding="10")
         input_text_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=False, padx=10, pady=5)
@@ -50,9 +89,22 @@ class LexicalAnalyzerApp:
         self.load_dict_button = ttk.Button(control_frame, text="Загрузить словарь", command=self.load_dictionary)
         self.load_dict_button.pack(side=tk.LEFT, padx=5)
 
+        self.store_button = ttk.Button(control_frame, text="Накопительный словарь", command=self.toggle_lexicon_store)
+        self.store_button.pack(side=tk.LEFT, padx=5)
+
+        self.auto_morphology_button = ttk.Button(control_frame, text="Заполнить морфологию", command=self.auto_fill_morphology)
+        self.auto_morphology_button.pack(side=tk.LEFT, padx=5)
+
         self.help_button = ttk.Button(control_frame, text="Помощь", command=self.show_help)
         self.help_button.pack(side=tk.RIGHT, padx=5)
 
+        self.cache_button = ttk.Button(control_frame, text="Кэш", command=self.show_cache_stats)
+        self.cache_button.pack(side=tk.RIGHT, padx=5)
+
+        self.fast_tokenizer_var = tk.BooleanVar(value=False)
+        self.fast_tokenizer_check = ttk.Checkbutton(control_frame, text="Быстрая токенизация", variable=self.fast_tokenizer_var)
+        self.fast_tokenizer_check.pack(side=tk.RIGHT, padx=5)
+
         self.input_text_widget = scrolledtext.ScrolledText(input_text_frame, wrap=tk.WORD, height=8, relief=tk.SOLID, borderwidth=1)
         self.input_text_widget.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
         self.input_text_widget.insert("1.0", "Введите или вставьте сюда текст на английском языке")
@@ -73,17 +125,14 @@ class LexicalAnalyzerApp:
         self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.filter_var.trace_add("write", self.filter_list)
 
-        self.word_tree = ttk.Treeview(list_frame)
-        self.word_tree.heading('#0', text='Слово (Частота)')
-        self.word_tree.column("#0", anchor=tk.W)
+        self.sort_var = tk.StringVar(value="По алфавиту")
+        self.sort_combobox = ttk.Combobox(list_controls_frame, textvariable=self.sort_var, values=list(SORT_ORDER_LABELS),
+                                          state=tk.DISABLED, width=12)
+        self.sort_combobox.pack(side=tk.LEFT, padx=(5, 0))
+        self.sort_combobox.bind("<<ComboboxSelected>>", self.filter_list)
 
-        tree_scroll_y = ttk.Scrollbar(list_frame, orient="vertical", command=self.word_tree.yview)
-        tree_scroll_x = ttk.Scrollbar(list_frame, orient="horizontal", command=self.word_tree.xview)
-        self.word_tree.configure(yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
-        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        self.word_tree.pack(fill=tk.BOTH, expand=True)
-        self.word_tree.bind('<<TreeviewSelect>>', self.on_word_select)
+        self.word_list = VirtualWordList(list_frame, format_row=self.format_word_row, on_select=self.on_word_select)
+        self.word_list.pack(fill=tk.BOTH, expand=True)
 
         self.detail_label = ttk.Label(detail_frame, text="Морфологическая информация:", font=('Helvetica', 12, 'bold'))
         self.detail_label.pack(pady=(0, 5), anchor=tk.W)
@@ -116,51 +165,147 @@ class LexicalAnalyzerApp:
             return
 
         self.pdf_path = filepath
-        extracted_text = ""
+        self.input_text_widget.delete("1.0", tk.END)
+        self.add_placeholder(None)
+        self.raw_text = ""
+        self.extracted_pages = []
+        self.word_data = {}
+        self.word_index = None
+        self.input_analysis = None
+        self.update_word_list()
+        self.clear_details()
+        self.save_dict_button.config(state=tk.DISABLED)
+
+        self.extraction_job = PdfExtractionJob(self.pdf_path, tokenizer=self.tokenizer_name(), cache=self.extraction_cache)
+        self.extraction_job.start()
+        self.show_progress()
+        self.master.after(EXTRACTION_POLL_MS, self.poll_extraction)
+
+    def show_progress(self, text="Извлечение текста из PDF..."):
+        self.progress_bar.config(value=0, maximum=1)
+        self.progress_label.config(text=text)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_frame.pack(side=tk.TOP, fill=tk.X, after=self.control_frame)
+        self.load_pdf_button.config(state=tk.DISABLED)
+        self.load_dict_button.config(state=tk.DISABLED)
+        self.process_input_button.config(state=tk.DISABLED)
+        self.store_button.config(state=tk.DISABLED)
+        self.auto_morphology_button.config(state=tk.DISABLED)
+
+    def hide_progress(self):
+        self.progress_frame.pack_forget()
+        self.load_pdf_button.config(state=tk.NORMAL)
+        self.load_dict_button.config(state=tk.NORMAL)
+        self.process_input_button.config(state=tk.NORMAL)
+        self.store_button.config(state=tk.NORMAL)
+        self.auto_morphology_button.config(state=tk.NORMAL)
+        self.extraction_job = None
+        self.morphology_job = None
+
+    def cancel_background_job(self):
+        job = self.extraction_job or self.morphology_job
+        if job:
+            job.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.progress_label.config(text="Отмена...")
+
+    def poll_extraction(self):
+
+        job = self.extraction_job
+        if job is None:
+            return
 
+        pages_arrived = False
+        try:
+            while True:
+                kind, payload = job.messages.get_nowait()
+
+                if kind == 'start':
+                    if payload == 0:
+                        self.hide_progress()
+                        messagebox.showwarning("Пустой PDF", "Выбранный PDF файл не содержит страниц.", parent=self.master)
+                        return
+                    self.progress_bar.config(maximum=payload)
+
+                elif kind == 'pages':
+                    for page_num, page_text, page_counts, page_error in payload:
+                        if page_error:
+                            print(f"Предупреждение: Не удалось извлечь текст со страницы {page_num + 1}: {page_error}")
+                        if page_text:
+                            self.extracted_pages.append(page_text)
+                        self.add_word_counts(page_counts)
+                    processed = payload[-1][0] + 1
+                    self.progress_bar.config(value=processed)
+                    self.progress_label.config(text=f"Страница {processed} из {job.num_pages}")
+                    pages_arrived = True
+
+                elif kind == 'done':
+                    self.finish_extraction()
+                    return
 
+                elif kind == 'cancelled':
+                    self.hide_progress()
+                    self.extracted_pages = []
+                    self.word_data = {}
+                    self.word_index = None
+                    self.update_word_list()
+                    messagebox.showinfo("Отменено", "Извлечение текста из PDF отменено.", parent=self.master)
+                    return
 
-        try:
-            with open(self.pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                num_pages = len(reader.pages)
-                if num_pages == 0:
-                    messagebox.showwarning("Пустой PDF", "Выбранный PDF файл не содержит страниц.", parent=self.master)
+                elif kind == 'error':
+                    self.hide_progress()
+                    self.word_data = {}
+                    self.word_index = None
+                    self.update_word_list()
+                    if isinstance(payload, PyPDF2.errors.PdfReadError):
+                        messagebox.showerror("Ошибка чтения PDF",
+                                             f"Не удалось прочитать файл (возможно, он поврежден или зашифрован):\n{payload}",
+                                             parent=self.master)
+                    else:
+                        messagebox.showerror("Ошибка чтения PDF", f"Не удалось прочитать файл:\n{payload}", parent=self.master)
                     return
+        except queue.Empty:
+            pass
 
-                for page_num in range(num_pages):
-                    page = reader.pages[page_num]
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            extracted_text += page_text + "\n"
-                    except Exception as page_error:
-                        print(f"Предупреждение: Не удалось извлечь текст со страницы {page_num + 1}: {page_error}")
+        if pages_arrived:
+            now = time.monotonic()
+            if now - self.last_list_refresh >= WORD_LIST_REFRESH_SECONDS:
+                self.last_list_refresh = now
+                self.update_word_list()
 
+        self.master.after(EXTRACTION_POLL_MS, self.poll_extraction)
 
+    def finish_extraction(self):
 
-            if extracted_text:
-                self.input_text_widget.delete("1.0", tk.END)
-                self.add_placeholder(None)
-                self.raw_text = extracted_text
-                self.word_data = {}
-                self.update_word_list()
-                self.clear_details()
-                self.process_text()
-                messagebox.showinfo("Успех",
-                                    f"Текст из PDF '{os.path.basename(self.pdf_path)}' успешно загружен и обработан.",
-                                    parent=self.master)
-            else:
-                messagebox.showwarning("Предупреждение",
-                                       "Не удалось извлечь текст из PDF файла. Возможно, он содержит только изображения или защищен.",
-                                       parent=self.master)
-
-        except PyPDF2.errors.PdfReadError as pdf_err:
-            messagebox.showerror("Ошибка чтения PDF",
-                                 f"Не удалось прочитать файл (возможно, он поврежден или зашифрован):\n{pdf_err}",
-                                 parent=self.master)
-        except Exception as e:
-            messagebox.showerror("Ошибка чтения PDF", f"Не удалось прочитать файл:\n{e}", parent=self.master)
+        from_cache = self.extraction_job.from_cache
+        self.hide_progress()
+        self.raw_text = "".join(page_text + "\n" for page_text in self.extracted_pages)
+        self.extracted_pages = []
+
+        if not self.raw_text:
+            messagebox.showwarning("Предупреждение",
+                                   "Не удалось извлечь текст из PDF файла. Возможно, он содержит только изображения или защищен.",
+                                   parent=self.master)
+            return
+
+        self.store_counts({word: data['frequency'] for word, data in self.word_data.items()})
+        if self.report_processing_result():
+            cache_note = " (из кэша)" if from_cache else ""
+            messagebox.showinfo("Успех",
+                                f"Текст из PDF '{os.path.basename(self.pdf_path)}' успешно загружен и обработан{cache_note}.",
+                                parent=self.master)
+
+    def show_cache_stats(self):
+
+        if self.extraction_cache is None:
+            messagebox.showinfo("Кэш извлечения", "Кэш извлечения текста недоступен.", parent=self.master)
+            return
+
+        if messagebox.askyesno("Кэш извлечения",
+                               f"{self.extraction_cache.format_stats()}\n\nОчистить кэш?",
+                               default=messagebox.NO, parent=self.master):
+            self.extraction_cache.clear()
+            messagebox.showinfo("Кэш извлечения", "Кэш очищен.", parent=self.master)
 
 
     def process_input_text(self):
@@ -171,75 +316,218 @@ class LexicalAnalyzerApp:
             messagebox.showwarning("Нет текста", "Пожалуйста, введите или вставьте текст в поле для анализа.", parent=self.master)
             return
 
+        tokenizer = self.tokenizer_name()
+        if self.input_analysis is None or self.input_analysis.tokenizer != tokenizer:
+            self.input_analysis = IncrementalAnalysis(tokenizer)
+            self.word_data = {}
+            self.word_index = None
+            self.update_word_list()
+            self.clear_details()
+
         self.pdf_path = None
         self.raw_text = input_text
-        self.word_data = {}
-        self.update_word_list()
-        self.clear_details()
         self.process_text()
 
     def process_text(self):
 
         try:
-            tokens = [word.lower() for word in word_tokenize(self.raw_text) if word.isalpha()]
+            deltas, changed_paragraphs = self.input_analysis.update(self.raw_text)
+            if apply_count_deltas(self.word_data, deltas):
+                self.word_index = None
+            self.store_counts(deltas)
+            self.report_processing_result(f"Переанализировано абзацев: {changed_paragraphs}.")
 
-            if not tokens:
-                source = f"PDF файла '{os.path.basename(self.pdf_path)}'" if self.pdf_path else "введенного текста"
-                messagebox.showinfo("Нет слов", f"В тексте из {source} не найдено слов для анализа (после фильтрации).", parent=self.master)
-                self.save_dict_button.config(state=tk.DISABLED)
-                return
+        except Exception as e:
+            self.input_analysis = None
+            messagebox.showerror("Ошибка обработки", f"Произошла ошибка при обработке текста:\n{e}", parent=self.master)
+            self.save_dict_button.config(state=tk.DISABLED)
 
-            word_counts = Counter(tokens)
-            self.word_data = {}
-            for word, freq in word_counts.items():
-                self.word_data[word] = {'frequency': freq, 'morphology': ''}
+    def toggle_lexicon_store(self):
 
-            self.update_word_list()
-            self.save_dict_button.config(state=tk.NORMAL)
+        if self.lexicon_store is not None:
+            if messagebox.askyesno("Накопительный словарь",
+                                   f"Отключить накопительный словарь?\n{self.lexicon_store.filepath}",
+                                   parent=self.master):
+                self.close_lexicon_store()
+                self.update_word_list()
+                self.save_dict_button.config(state=tk.NORMAL if self.word_data else tk.DISABLED)
+            return
 
-            source_msg = f"PDF файла '{os.path.basename(self.pdf_path)}'" if self.pdf_path else "введенного текста"
-            messagebox.showinfo("Обработка завершена", f"Анализ {source_msg} завершен.\nНайдено {len(self.word_data)} уникальных словоформ.", parent=self.master)
+        filepath = filedialog.asksaveasfilename(
+            title="Открыть или создать накопительный словарь",
+            defaultextension=".sqlite",
+            filetypes=[("SQLite Database", "*.sqlite *.db"), ("All Files", "*.*")],
+            confirmoverwrite=False,
+            parent=self.master
+        )
+        if not filepath:
+            return
 
+        try:
+            self.lexicon_store = LexiconStore(filepath)
+        except sqlite3.Error as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть накопительный словарь:\n{e}", parent=self.master)
+            return
 
-        except Exception as e:
-            messagebox.showerror("Ошибка обработки", f"Произошла ошибка при обработке текста:\n{e}", parent=self.master)
-            self.save_dict_button.config(state=tk.DISABLED)
+        self.store_button.config(text="Отключить накопительный словарь")
+        self.sort_combobox.config(state="readonly")
+        self.update_word_list()
+        self.save_dict_button.config(state=tk.NORMAL if len(self.lexicon_store) else tk.DISABLED)
+
+    def close_lexicon_store(self):
+        if self.lexicon_store is not None:
+            self.lexicon_store.close()
+            self.lexicon_store = None
+        self.store_button.config(text="Накопительный словарь")
+        self.sort_var.set("По алфавиту")
+        self.sort_combobox.config(state=tk.DISABLED)
+
+    def store_counts(self, counts):
+        if self.lexicon_store is None:
+            return
+        try:
+            self.lexicon_store.apply_counts(counts)
+        except sqlite3.Error as e:
+            messagebox.showerror("Ошибка", f"Не удалось обновить накопительный словарь:\n{e}", parent=self.master)
 
-    def update_word_list(self):
+    def lexicon(self):
+        return self.lexicon_store if self.lexicon_store is not None else self.word_data
 
-        for item in self.word_tree.get_children():
-            self.word_tree.delete(item)
+    def auto_fill_morphology(self):
 
-        word_filter_term = self.filter_var.get().lower().strip()
-        sorted_words = sorted(self.word_data.keys())
-        self.filtered_word_list = []
+        lexicon = self.lexicon()
+        if not lexicon:
+            messagebox.showwarning("Нет данных", "Словарь пуст. Сначала обработайте текст или загрузите словарь.", parent=self.master)
+            return
 
-        for word in sorted_words:
-            if not word_filter_term or word_filter_term in word:
-                self.filtered_word_list.append(word)
-                frequency = self.word_data[word]['frequency']
-                display_text = f"{word} ({frequency})"
-                self.word_tree.insert('', tk.END, iid=word, text=display_text)
+        words = words_without_morphology(lexicon)
+        if not words:
+            messagebox.showinfo("Нет работы", "У всех словоформ уже есть морфологическая информация.", parent=self.master)
+            return
 
-        if not self.filtered_word_list:
-            self.clear_details()
+        self.morphology_filled = 0
+        self.morphology_job = MorphologyJob(words, memo=self.morphology_memo)
+        self.morphology_job.start()
+        self.show_progress("Морфологическая разметка...")
+        self.master.after(EXTRACTION_POLL_MS, self.poll_morphology)
+
+    def poll_morphology(self):
+
+        job = self.morphology_job
+        if job is None:
+            return
+
+        try:
+            while True:
+                kind, payload = job.messages.get_nowait()
+
+                if kind == 'start':
+                    self.progress_bar.config(maximum=max(payload, 1))
+
+                elif kind == 'batch':
+                    self.morphology_filled += fill_morphology(self.lexicon(), payload)
+                    self.progress_bar.config(value=job.processed)
+                    self.progress_label.config(
+                        text=f"Размечено {job.processed} из {len(job.words)} ({job.words_per_second():.0f} слов/с)")
+
+                elif kind in ('done', 'cancelled'):
+                    self.finish_morphology(job, cancelled=kind == 'cancelled')
+                    return
+
+                elif kind == 'error':
+                    self.hide_progress()
+                    if isinstance(payload, LookupError):
+                        messagebox.showerror("Ошибка разметки",
+                                             "Не найдены данные NLTK для разметки. Выполните:\n"
+                                             "nltk.download('averaged_perceptron_tagger') и nltk.download('wordnet')\n\n"
+                                             f"{payload}", parent=self.master)
+                    else:
+                        messagebox.showerror("Ошибка разметки", f"Не удалось заполнить морфологию:\n{payload}", parent=self.master)
+                    self.refresh_selected_details()
+                    return
+        except queue.Empty:
+            pass
+
+        self.master.after(EXTRACTION_POLL_MS, self.poll_morphology)
+
+    def finish_morphology(self, job, cancelled):
+
+        self.hide_progress()
+        self.refresh_selected_details()
+        status = "Разметка прервана" if cancelled else "Разметка завершена"
+        messagebox.showinfo("Морфология",
+                            f"{status}.\nЗаполнено словоформ: {self.morphology_filled} из {len(job.words)}.\n"
+                            f"Из кэша: {job.memo_hits}. Время: {job.elapsed:.1f} с, "
+                            f"скорость: {job.words_per_second():.0f} слов/с.",
+                            parent=self.master)
+
+    def refresh_selected_details(self):
+        selected = self.word_list.selected_item()
+        if selected is not None:
+            self.on_word_select(selected)
+
+    def tokenizer_name(self):
+        return 'fast' if self.fast_tokenizer_var.get() else 'nltk'
+
+    def add_word_counts(self, word_counts):
+        vocabulary_size = len(self.word_data)
+        merge_counts(self.word_data, word_counts)
+        if len(self.word_data) != vocabulary_size:
+            self.word_index = None
+
+    def report_processing_result(self, details=None):
+
+        if not self.word_data:
+            source = f"PDF файла '{os.path.basename(self.pdf_path)}'" if self.pdf_path else "введенного текста"
+            messagebox.showinfo("Нет слов", f"В тексте из {source} не найдено слов для анализа (после фильтрации).", parent=self.master)
+            self.update_word_list()
+            self.save_dict_button.config(state=tk.DISABLED)
+            return False
+
+        self.update_word_list()
+        self.save_dict_button.config(state=tk.NORMAL)
+
+        source_msg = f"PDF файла '{os.path.basename(self.pdf_path)}'" if self.pdf_path else "введенного текста"
+        message = f"Анализ {source_msg} завершен.\nНайдено {len(self.word_data)} уникальных словоформ."
+        if self.lexicon_store is not None:
+            message += f"\nВ накопительном словаре: {len(self.lexicon_store)} словоформ."
+        if details:
+            message += f"\n{details}"
+        messagebox.showinfo("Обработка завершена", message, parent=self.master)
+        return True
+
+    def update_word_list(self):
+
+        word_filter_term = self.filter_var.get().lower().strip()
+        if self.lexicon_store is not None:
+            self.filtered_word_list = self.lexicon_store.view(word_filter_term, SORT_ORDER_LABELS[self.sort_var.get()])
+            matches_filter = lambda word: word.startswith(word_filter_term)
         else:
-            selected = self.word_tree.selection()
-            if selected and selected[0] not in self.filtered_word_list:
-                 self.clear_details()
-            elif not selected:
-                 self.clear_details()
+            if self.word_index is None:
+                self.word_index = SubstringIndex(sorted_words(self.word_data))
+            self.filtered_word_list = self.word_index.search(word_filter_term)
+            matches_filter = lambda word: word_filter_term in word
+        self.word_list.set_items(self.filtered_word_list)
+
+        selected = self.word_list.selected_item()
+        if selected is None or selected not in self.lexicon() or not matches_filter(selected):
+            self.word_list.clear_selection()
+            self.clear_details()
+
+    def format_word_row(self, word):
+        if self.lexicon_store is not None:
+            return f"{word} ({self.lexicon_store.frequency(word)})"
+        return f"{word} ({self.word_data[word]['frequency']})"
 
     def filter_list(self, *args):
         self.update_word_list()
 
-    def on_word_select(self, event):
+    def on_word_select(self, selected_word):
 
-        selected_items = self.word_tree.selection()
-        if selected_items:
-            selected_word = selected_items[0]
-            if selected_word in self.word_data:
-                morphology = self.word_data[selected_word].get('morphology', '')
+        if selected_word:
+            lexicon = self.lexicon()
+            if selected_word in lexicon:
+                morphology = lexicon[selected_word].get('morphology', '')
                 self.morphology_text.config(state=tk.NORMAL)
                 self.morphology_text.delete('1.0', tk.END)
                 self.morphology_text.insert('1.0', morphology)
@@ -260,16 +548,17 @@ class LexicalAnalyzerApp:
 
     def save_morphology(self):
 
-        selected_items = self.word_tree.selection()
-        if not selected_items:
+        selected_word = self.word_list.selected_item()
+        if not selected_word:
             messagebox.showwarning("Нет выбора", "Сначала выберите слово в списке.", parent=self.master)
             return
 
-        selected_word = selected_items[0]
-        if selected_word in self.word_data:
+        lexicon = self.lexicon()
+        if selected_word in lexicon:
             new_morphology = self.morphology_text.get('1.0', tk.END).strip()
-            if self.word_data[selected_word]['morphology'] != new_morphology:
-                self.word_data[selected_word]['morphology'] = new_morphology
+            entry = lexicon[selected_word]
+            if entry['morphology'] != new_morphology:
+                entry['morphology'] = new_morphology
                 messagebox.showinfo("Сохранено", f"Морфологическая информация для слова '{selected_word}' обновлена.", parent=self.master)
             else:
                 messagebox.showinfo("Нет изменений", "Информация не была изменена.", parent=self.master)
@@ -278,23 +567,25 @@ class LexicalAnalyzerApp:
 
     def save_dictionary(self):
 
-        if not self.word_data:
+        lexicon = self.lexicon()
+        if not lexicon:
             messagebox.showwarning("Нет данных", "Словарь пуст. Нечего сохранять.", parent=self.master)
             return
 
         filepath = filedialog.asksaveasfilename(
             title="Сохранить словарь как",
             defaultextension=".json",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
+            filetypes=[("JSON Files", "*.json"), ("Binary Dictionary", "*.lexb"), ("All Files", "*.*")],
             parent=self.master
         )
         if not filepath:
             return
 
         try:
-            sorted_word_data = dict(sorted(self.word_data.items()))
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(sorted_word_data, f, ensure_ascii=False, indent=4)
+            if is_binary_dictionary_path(filepath):
+                write_binary_dictionary(lexicon, filepath)
+            else:
+                write_dictionary(lexicon, filepath)
             messagebox.showinfo("Успех", f"Словарь успешно сохранен в файл:\n{filepath}", parent=self.master)
         except Exception as e:
             messagebox.showerror("Ошибка сохранения", f"Не удалось сохранить словарь:\n{e}", parent=self.master)
@@ -303,23 +594,22 @@ class LexicalAnalyzerApp:
 
         filepath = filedialog.askopenfilename(
             title="Загрузить словарь из файла",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")],
+            filetypes=[("JSON Files", "*.json"), ("Binary Dictionary", "*.lexb"), ("All Files", "*.*")],
             parent=self.master
         )
         if not filepath:
             return
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-
-            if not isinstance(loaded_data, dict): raise ValueError("Формат файла не dict.")
-            for word, data in loaded_data.items():
-                 if not isinstance(data, dict) or 'frequency' not in data or 'morphology' not in data: raise ValueError(f"Структура для '{word}' некорректна.")
-                 if not isinstance(data['frequency'], int): raise ValueError(f"Частота для '{word}' не int.")
-                 if not isinstance(data['morphology'], str): raise ValueError(f"Морфология для '{word}' не str.")
+            if is_binary_dictionary_path(filepath):
+                loaded_data = open_binary_dictionary(filepath)
+            else:
+                loaded_data = read_dictionary(filepath)
 
+            self.close_lexicon_store()
             self.word_data = loaded_data
+            self.word_index = None
+            self.input_analysis = None
             self.filter_var.set("")
             self.update_word_list()
             self.save_dict_button.config(state=tk.NORMAL)
@@ -347,7 +637,7 @@ class LexicalAnalyzerApp:
 
                                                 Основные шаги
 
-        1. Нажмите кнопку "Загрузить PDF" и выберите файл. Текст будет извлечен автоматически.
+        1. Нажмите кнопку "Загрузить PDF" и выберите файл. Текст будет извлечен автоматически в фоновом режиме: страницы обрабатываются параллельно, ход извлечения показывается полосой прогресса, а кнопка "Отмена" прерывает загрузку. Список слов пополняется по мере обработки страниц.
         2. После загрузки PDF нажмите "Обработать текст". Программа разобьет текст на слова, подсчитает их частоту и отобразит в списке слева в формате "слово (частота)".
         3. Просмотр и редактирование:
             Список слов слева показывает словоформы и их частоту, отсортированные по алфавиту.
@@ -355,11 +645,15 @@ class LexicalAnalyzerApp:
             Выберите строку в списке, чтобы увидеть/изменить морфологическую информацию для соответствующего слова справа.
             Введите или отредактируйте текст в поле "Морфологическая информация". 
             Нажмите "Сохранить информацию", чтобы сохранить изменения для выбранного слова.
-        4. Нажмите "Сохранить словарь", чтобы сохранить текущий список слов, их частоты и введенную морфологическую информацию в файл формата JSON. Словарь будет сохранен в отсортированном виде.
-        5. Нажмите "Загрузить словарь", чтобы загрузить ранее сохраненный словарь из файла JSON. Это заменит текущие данные.
+        4. Нажмите "Сохранить словарь", чтобы сохранить текущий список слов, их частоты и введенную морфологическую информацию в файл формата JSON. Словарь будет сохранен в отсортированном виде. Для больших словарей выберите расширение .lexb: компактный бинарный формат открывается без чтения всего файла в память.
+        Флажок "Быстрая токенизация" включает токенизатор на регулярном выражении: он выделяет те же слова, что и word_tokenize, но работает в несколько раз быстрее.
+        5. Нажмите "Загрузить словарь", чтобы загрузить ранее сохраненный словарь из файла JSON или .lexb. Это заменит текущие данные.
+        6. Кнопка "Заполнить морфологию" автоматически размечает все словоформы без морфологической информации: часть речи, лемма и грамматические признаки определяются NLTK параллельно в нескольких процессах. Введенная вручную информация никогда не перезаписывается, а разметку можно прервать кнопкой "Отмена".
+        7. Кнопка "Накопительный словарь" подключает файл базы SQLite, в котором частоты накапливаются по всем обработанным документам. Пока он подключен, список слов показывает накопленный словарь: фильтр ищет слова по началу, а список можно упорядочить по алфавиту или по частоте. Морфологическая информация сохраняется прямо в базу, а "Сохранить словарь" выгружает ее содержимое в JSON или .lexb.
 
                                                           Примечания
                                                            
+        Извлеченный из PDF текст кэшируется на диске по содержимому файла, поэтому повторное открытие того же документа происходит почти мгновенно. Кнопка "Кэш" показывает статистику попаданий и промахов и позволяет очистить кэш.
         Извлечение текста из некоторых PDF (особенно сканированных изображений или защищенных) может быть невозможным или неполным.
         """
         help_window = tk.Toplevel(self.master)
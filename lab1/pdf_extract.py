@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import PyPDF2
+
+from extraction_cache import file_digest
+from text_processing import DEFAULT_TOKENIZER, get_tokenizer
+
+
+PAGES_PER_TASK = 4
+CANCEL_POLL_SECONDS = 0.1
+PDF_EXTRACTOR = 'lab1-pypdf2-pages'
+EXTRACTOR_VERSION = 1
+
+
+def count_pages(pdf_path):
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def extract_page_range(pdf_path, first_page, last_page, tokenizer=DEFAULT_TOKENIZER):
+    tokenize_words = get_tokenizer(tokenizer)
+    pages = []
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page_num in range(first_page, last_page):
+            try:
+                page_text = reader.pages[page_num].extract_text() or ""
+                error = None
+            except Exception as page_error:
+                page_text = ""
+                error = str(page_error)
+            pages.append((page_num, page_text, Counter(tokenize_words(page_text)), error))
+    return pages
+
+
+class PdfExtractionJob:
+
+    def __init__(self, pdf_path, max_workers=None, pages_per_task=PAGES_PER_TASK, tokenizer=DEFAULT_TOKENIZER, cache=None):
+        self.pdf_path = pdf_path
+        self.tokenizer = tokenizer
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.cache = cache
+        self.from_cache = False
+        self.messages = queue.Queue()
+        self.num_pages = 0
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _cache_keys(self):
+        digest = file_digest(self.pdf_path)
+        text_key = self.cache.make_key(digest, PDF_EXTRACTOR, EXTRACTOR_VERSION)
+        counts_key = self.cache.make_key(digest, f"{PDF_EXTRACTOR}-counts-{self.tokenizer}", EXTRACTOR_VERSION)
+        return text_key, counts_key
+
+    def _emit_cached(self, text_key, counts_key):
+        cached_text = self.cache.get(text_key)
+        if cached_text is None:
+            return False
+
+        page_texts = cached_text['pages']
+        cached_counts = self.cache.get(counts_key, record=False)
+        if cached_counts is None:
+            tokenize_words = get_tokenizer(self.tokenizer)
+            page_counts = [Counter(tokenize_words(page_text)) for page_text in page_texts]
+            self._store(counts_key, {'pages': page_counts})
+        else:
+            page_counts = [Counter(counts) for counts in cached_counts['pages']]
+
+        self.from_cache = True
+        self.num_pages = len(page_texts)
+        self.messages.put(('start', self.num_pages))
+        pages = [(page_num, page_text, counts, None)
+                 for page_num, (page_text, counts) in enumerate(zip(page_texts, page_counts))]
+        if pages:
+            self.messages.put(('pages', pages))
+        self.messages.put(('done', None))
+        return True
+
+    def _store(self, key, data):
+        try:
+            self.cache.put(key, data)
+        except OSError as e:
+            print(f"Предупреждение: не удалось сохранить результат в кэш извлечения: {e}")
+
+    def _run(self):
+        try:
+            text_key = counts_key = None
+            if self.cache is not None:
+                text_key, counts_key = self._cache_keys()
+                if self._emit_cached(text_key, counts_key):
+                    return
+
+            self.num_pages = count_pages(self.pdf_path)
+            self.messages.put(('start', self.num_pages))
+            if self.num_pages == 0:
+                self.messages.put(('done', None))
+                return
+
+            ranges = [(first, min(first + self.pages_per_task, self.num_pages))
+                      for first in range(0, self.num_pages, self.pages_per_task)]
+            pending = {}
+            next_page = 0
+            page_texts = []
+            page_counts = []
+
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(ranges)))
+            try:
+                futures = {executor.submit(extract_page_range, self.pdf_path, first, last, self.tokenizer)
+                           for first, last in ranges}
+                while futures:
+                    done, futures = wait(futures, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    if self._cancel_event.is_set():
+                        self.messages.put(('cancelled', None))
+                        return
+
+                    for future in done:
+                        for page in future.result():
+                            pending[page[0]] = page
+
+                    ready = []
+                    while next_page in pending:
+                        page = pending.pop(next_page)
+                        ready.append(page)
+                        page_texts.append(page[1])
+                        page_counts.append(page[2])
+                        next_page += 1
+                    if ready:
+                        self.messages.put(('pages', ready))
+            finally:
+                executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+
+            if self.cache is not None:
+                self._store(text_key, {'pages': page_texts})
+                self._store(counts_key, {'pages': page_counts})
+            self.messages.put(('done', None))
+        except Exception as e:
+            self.messages.put(('error', e))
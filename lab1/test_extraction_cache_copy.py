@@ -0,0 +1,11 @@
+from pathlib import Path
+
+
+HERE = Path(__file__).parent
+
+
+def test_lab3_4_copy_matches_original():
+    original = (HERE / 'extraction_cache.py').read_text(encoding='utf-8')
+    marker, copy = (HERE.parent / 'lab3_4' / 'extraction_cache.py').read_text(encoding='utf-8').split('\n', 1)
+    assert marker.startswith('# Копия lab1/extraction_cache.py')
+    assert copy == original
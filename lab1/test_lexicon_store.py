@@ -0,0 +1,59 @@
+import pytest
+
+import lexicon_store
+from lexicon_store import SORT_ORDERS, LexiconStore
+
+
+WORDS = [f"{first}{second}{third}" for first in "abc" for second in "abcd" for third in "xyz"]
+PREFIXES = ["", "a", "ab", "c", "bdz", "q"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexicon_store, 'PAGE_SIZE', 4)
+    monkeypatch.setattr(lexicon_store, 'MAX_CACHED_PAGES', 2)
+    store = LexiconStore(str(tmp_path / 'lexicon.db'))
+    # Частоты 1..3 повторяются, так что группы одинаковых частот пересекают границы страниц.
+    store.apply_counts({word: index % 3 + 1 for index, word in enumerate(WORDS)})
+    yield store
+    store.close()
+
+
+def ordered(store, prefix, order):
+    return [word for word, in store.connection.execute(
+        f"SELECT word FROM lexicon WHERE word LIKE ? ORDER BY {SORT_ORDERS[order]}", (prefix + '%',))]
+
+
+@pytest.mark.parametrize('order', list(SORT_ORDERS))
+@pytest.mark.parametrize('prefix', PREFIXES)
+def test_walking_pages_matches_order_by(store, prefix, order):
+    view = store.view(prefix, order)
+    walked = []
+    for start in range(0, len(view), lexicon_store.PAGE_SIZE):
+        walked.extend(view[start:start + lexicon_store.PAGE_SIZE])
+    assert walked == ordered(store, prefix, order)
+    assert [view[position] for position in range(len(view))] == walked
+
+
+@pytest.mark.parametrize('order', list(SORT_ORDERS))
+@pytest.mark.parametrize('prefix', PREFIXES)
+def test_direct_jump_matches_walk(store, prefix, order):
+    walked = store.view(prefix, order)[:]
+    for position in range(len(walked)):
+        assert store.view(prefix, order)[position] == walked[position]
+    view = store.view(prefix, order)
+    for position in reversed(range(len(walked))):
+        assert view[position] == walked[position]
+
+
+@pytest.mark.parametrize('order', list(SORT_ORDERS))
+@pytest.mark.parametrize('prefix', PREFIXES)
+def test_prefix_filter_on_every_page(store, prefix, order):
+    view = store.view(prefix, order)
+    assert len(view) == len(ordered(store, prefix, order))
+    for start in range(0, len(view), lexicon_store.PAGE_SIZE):
+        page = view[start:start + lexicon_store.PAGE_SIZE]
+        assert page
+        assert all(word.startswith(prefix) for word in page)
+    with pytest.raises(IndexError):
+        view[len(view)]
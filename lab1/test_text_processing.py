@@ -0,0 +1,59 @@
+import pytest
+from nltk.tokenize import word_tokenize
+
+from text_processing import get_tokenizer, iter_words_fast, tokenize_words, tokenize_words_fast
+
+
+SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "I can't believe it's not butter, isn't it?",
+    "They'll say we're late; you'd agree, wouldn't you?",
+    "Mr. Smith paid $3.50 for 2 apples at 10:30 on 1,000 days.",
+    "She said, \"Go home\" -- and he left... quietly.",
+    "'Tis the season, and 'twas a fine day for more'n one.",
+    "I cannot go, I'm gonna stay, gotta wait, wanna rest, gimme that, lemme see.",
+    "e-mail, well-known and self-made words stay whole",
+    "The dogs' bones and the cat's toys (see fig. 3) [sic] {ok} <tag>",
+    "He shouted: stop!Now! Really?Yes* @home #tag 50% & more",
+    "Words_with_underscores and x2 digits and don''t quotes",
+    "It was the end of the U.S.",
+    "Nothing alphabetic: 123 456 ... --- !!!",
+    "\"Stop.\" he said",
+    "He said 'no.'",
+    "'Halt.' she said, and the sergeant (a vet.) agreed with Mr.",
+]
+TEXT = "Mr. Smith went to Washington. He didn't stay long! 'Twas a quick trip, wasn't it? Yes."
+TEXT_WORDS = ['smith', 'went', 'to', 'washington', 'he', 'did', 'stay', 'long', 'twas', 'a', 'quick', 'trip',
+              'was', 'it', 'yes']
+
+
+def reference_words(sentence):
+    return [word.lower() for word in word_tokenize(sentence, preserve_line=True) if word.isalpha()]
+
+
+@pytest.mark.parametrize('sentence', SENTENCES)
+def test_fast_tokenizer_matches_word_tokenize_on_sentence(sentence):
+    assert tokenize_words_fast(sentence) == reference_words(sentence)
+
+
+def test_fast_tokenizer_splits_sentences_like_punkt():
+    assert tokenize_words_fast(TEXT) == TEXT_WORDS
+
+
+def test_fast_tokenizer_matches_word_tokenize_on_text():
+    try:
+        expected = tokenize_words(TEXT)
+    except LookupError:
+        pytest.skip("нет данных NLTK punkt_tab для word_tokenize")
+    assert tokenize_words_fast(TEXT) == expected
+
+
+def test_fast_tokenizer_streams_words():
+    assert list(iter_words_fast(SENTENCES[0])) == tokenize_words_fast(SENTENCES[0])
+
+
+def test_get_tokenizer():
+    assert get_tokenizer('fast') is tokenize_words_fast
+    assert get_tokenizer() is tokenize_words
+    with pytest.raises(KeyError):
+        get_tokenizer('missing')
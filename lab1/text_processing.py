@@ -0,0 +1,120 @@
+import re
+
+from nltk.tokenize import word_tokenize
+
+
+DEFAULT_TOKENIZER = 'nltk'
+
+# Символы, которые word_tokenize всегда отделяет от соседних: пробелы, кавычки,
+# скобки, ;@#$%&?!*, тире, а также ",", ":" перед не-цифрой, "..", "--" и "''".
+# Всё остальное (цифры, "_", одиночные "-", ".", "'", "/" и т.п.) склеивается
+# со словом в один токен, который затем отбрасывается фильтром isalpha().
+FAST_CHUNK_PATTERN = re.compile(
+    r"(?:[^\s«“‘„`»”’\";@#$%&‒-―?!*\[\](){}<>,:.\-']"
+    r"|[,:](?=\d)"
+    r"|(?<!\.)\.(?!\.)"
+    r"|(?<!-)-(?!-)"
+    r"|(?<!')'(?!'))+"
+)
+# Точка в конце текста отделяется всегда, как в Treebank, даже после сокращения.
+# Внутри текста точка перед закрывающей кавычкой или скобкой и словом со
+# строчной буквы не конец предложения: '"Stop." he said'.
+CLOSING_PATTERN = re.compile(r"([\]\)}>\"'»”’]*)(\s*)")
+LEADING_QUOTE_PATTERN = re.compile(r"(?<!\w)'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)", re.IGNORECASE)
+CLITIC_SUFFIXES = ("n't", "'ll", "'re", "'ve", "'s", "'m", "'d", "'")
+SPLIT_CONTRACTIONS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+APOSTROPHE_CONTRACTIONS = {
+    "d'ye": ('ye',),
+    "more'n": ('more',),
+    "'tis": ('is',),
+    "'twas": ('was',),
+}
+ABBREVIATIONS = frozenset((
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'etc', 'inc', 'ltd', 'co', 'corp',
+    'fig', 'no', 'vol', 'pp', 'ed', 'eds', 'gen', 'gov', 'rev', 'sen', 'rep', 'dept', 'univ',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+))
+
+
+def tokenize_words(text):
+    return [word.lower() for word in word_tokenize(text) if word.isalpha()]
+
+
+def _sentence_ending(text, chunk, end):
+    closing, space = CLOSING_PATTERN.match(text, end).groups()
+    after = end + len(closing) + len(space)
+    if after == len(text):
+        return 'text'
+    if not space or (closing or chunk[-1] == "'") and text[after].islower():
+        return None
+    return 'sentence'
+
+
+def _piece_words(piece, ending):
+    lower = piece.lower()
+    if lower in APOSTROPHE_CONTRACTIONS:
+        return APOSTROPHE_CONTRACTIONS[lower]
+
+    if ending:
+        core = lower.rstrip("'")
+        if core.endswith('.') and len(core) > 1:
+            core = core[:-1]
+            if ending == 'text' and not core.endswith('.') or len(core) > 1 and core not in ABBREVIATIONS:
+                lower = core
+
+    for suffix in CLITIC_SUFFIXES:
+        if lower.endswith(suffix) and len(lower) > len(suffix) and lower[-len(suffix) - 1] != "'":
+            lower = lower[:-len(suffix)]
+            break
+
+    if lower.isalpha():
+        return SPLIT_CONTRACTIONS.get(lower, (lower,))
+    return ()
+
+
+def _chunk_words(chunk, ending):
+    if chunk.isalpha():
+        lower = chunk.lower()
+        return SPLIT_CONTRACTIONS.get(lower, (lower,))
+
+    if "'" not in chunk:
+        return _piece_words(chunk, ending)
+
+    words = []
+    start = 0
+    for match in LEADING_QUOTE_PATTERN.finditer(chunk):
+        words.extend(_piece_words(chunk[start:match.end()], None))
+        start = match.end()
+    words.extend(_piece_words(chunk[start:], ending))
+    return words
+
+
+def iter_words_fast(text):
+    for match in FAST_CHUNK_PATTERN.finditer(text):
+        chunk = match.group()
+        if chunk.isalpha() and chunk.lower() not in SPLIT_CONTRACTIONS:
+            yield chunk.lower()
+        else:
+            ending = _sentence_ending(text, chunk, match.end()) if chunk[-1] in ".'" else None
+            yield from _chunk_words(chunk, ending)
+
+
+def tokenize_words_fast(text):
+    return list(iter_words_fast(text))
+
+
+TOKENIZERS = {
+    'nltk': tokenize_words,
+    'fast': tokenize_words_fast,
+}
+
+
+def get_tokenizer(name=DEFAULT_TOKENIZER):
+    return TOKENIZERS[name]
@@ -0,0 +1,117 @@
+import argparse
+import sys
+import time
+from collections import Counter
+
+from text_processing import tokenize_words, tokenize_words_fast
+
+
+def read_corpus(paths):
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            texts.append(f.read())
+    return texts
+
+
+def load_reference_corpus(fileids=None):
+    from nltk.corpus import gutenberg
+
+    return [gutenberg.raw(fileid) for fileid in (fileids or gutenberg.fileids())]
+
+
+def measure(tokenizer, texts, repeat):
+    size_mb = sum(len(text.encode('utf-8')) for text in texts) / (1024 * 1024)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = [tokenizer(text) for text in texts]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return tokens, size_mb / best if best else float('inf'), best
+
+
+def token_diff(reference, candidate, window=50, anchor=3):
+    missing = Counter()
+    extra = Counter()
+    matched = i = j = 0
+    while i < len(reference) and j < len(candidate):
+        if reference[i] == candidate[j]:
+            matched += 1
+            i += 1
+            j += 1
+            continue
+
+        skip = None
+        for distance in range(1, 2 * window + 1):
+            for skip_reference in range(distance + 1):
+                skip_candidate = distance - skip_reference
+                if reference[i + skip_reference:i + skip_reference + anchor] == \
+                        candidate[j + skip_candidate:j + skip_candidate + anchor]:
+                    skip = (skip_reference, skip_candidate)
+                    break
+            if skip:
+                break
+        skip_reference, skip_candidate = skip or (1, 1)
+        missing.update(reference[i:i + skip_reference])
+        extra.update(candidate[j:j + skip_candidate])
+        i += skip_reference
+        j += skip_candidate
+
+    missing.update(reference[i:])
+    extra.update(candidate[j:])
+    return matched, missing, extra
+
+
+def run(texts, repeat=3, top=15, out=sys.stdout):
+    reference_tokens, reference_speed, reference_time = measure(tokenize_words, texts, repeat)
+    fast_tokens, fast_speed, fast_time = measure(tokenize_words_fast, texts, repeat)
+
+    matched = 0
+    missing = Counter()
+    extra = Counter()
+    for reference, candidate in zip(reference_tokens, fast_tokens):
+        doc_matched, doc_missing, doc_extra = token_diff(reference, candidate)
+        matched += doc_matched
+        missing.update(doc_missing)
+        extra.update(doc_extra)
+    missing_total = sum(missing.values())
+    extra_total = sum(extra.values())
+    reference_count = sum(len(tokens) for tokens in reference_tokens)
+    fast_count = sum(len(tokens) for tokens in fast_tokens)
+    parity = matched / max(reference_count, fast_count, 1)
+
+    print(f"Документов: {len(texts)}, объем: {sum(len(t.encode('utf-8')) for t in texts) / (1024 * 1024):.2f} МБ", file=out)
+    print(f"word_tokenize: {reference_count} токенов, {reference_time:.3f} с, {reference_speed:.2f} МБ/с", file=out)
+    print(f"fast:          {fast_count} токенов, {fast_time:.3f} с, {fast_speed:.2f} МБ/с", file=out)
+    print(f"Ускорение: {reference_time / fast_time if fast_time else float('inf'):.1f}x", file=out)
+    print(f"Совпадение последовательностей токенов: {parity:.5%}", file=out)
+    print(f"Пропущено быстрым токенизатором: {missing_total}, лишних: {extra_total}", file=out)
+    if missing:
+        print("Чаще всего пропущены: " + ", ".join(f"{token}({count})" for token, count in missing.most_common(top)), file=out)
+    if extra:
+        print("Чаще всего лишние: " + ", ".join(f"{token}({count})" for token, count in extra.most_common(top)), file=out)
+    return parity
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Сравнение быстрого токенизатора с word_tokenize: скорость (МБ/с) и расхождение токенов."
+    )
+    parser.add_argument("files", nargs="*", help="текстовые файлы эталонного корпуса (по умолчанию - корпус NLTK gutenberg)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="число повторов замера (берется лучшее время)")
+    parser.add_argument("--top", type=int, default=15, help="сколько расходящихся токенов показать")
+    parser.add_argument("--min-parity", type=float, default=None,
+                        help="минимально допустимая доля совпадающих токенов; при меньшем значении код выхода 1")
+    args = parser.parse_args(argv)
+
+    texts = read_corpus(args.files) if args.files else load_reference_corpus()
+    parity = run(texts, repeat=args.repeat, top=args.top)
+    if args.min_parity is not None and parity < args.min_parity:
+        print(f"Совпадение {parity:.5%} ниже порога {args.min_parity:.5%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
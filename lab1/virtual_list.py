@@ -0,0 +1,124 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualWordList(ttk.Frame):
+
+    def __init__(self, master, format_row, on_select=None, row_height=25, **kwargs):
+        super().__init__(master, **kwargs)
+        self.format_row = format_row
+        self.on_select = on_select
+        self.row_height = row_height
+        self.items = []
+        self.offset = 0
+        self.visible_rows = 1
+        self.selected = None
+
+        self.tree = ttk.Treeview(self, show='tree headings', selectmode='browse')
+        self.tree.heading('#0', text='Слово (Частота)')
+        self.tree.column('#0', anchor=tk.W)
+
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.scroll_x.set)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Up>', lambda event: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda event: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda event: self._move_selection(-self.visible_rows))
+        self.tree.bind('<Next>', lambda event: self._move_selection(self.visible_rows))
+
+    def set_items(self, items):
+        self.items = items
+        self.offset = min(self.offset, self._max_offset())
+        self.render()
+
+    def refresh(self):
+        self.render()
+
+    def selected_item(self):
+        return self.selected
+
+    def clear_selection(self):
+        if self.selected is not None:
+            self.selected = None
+            self.render()
+
+    def yview(self, *args):
+        if not args:
+            return self._fractions()
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.items))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows
+            self.offset += step
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self.render()
+
+    def scroll(self, rows):
+        self.yview('scroll', rows, 'units')
+        return "break"
+
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        for item in self.items[self.offset:self.offset + self.visible_rows]:
+            self.tree.insert('', tk.END, iid=item, text=self.format_row(item))
+        if self.selected is not None and self.tree.exists(self.selected):
+            self.tree.selection_set(self.selected)
+            self.tree.focus(self.selected)
+        self.scroll_y.set(*self._fractions())
+
+    def _fractions(self):
+        total = len(self.items)
+        if not total:
+            return 0.0, 1.0
+        return self.offset / total, min(1.0, (self.offset + self.visible_rows) / total)
+
+    def _max_offset(self):
+        return max(0, len(self.items) - self.visible_rows)
+
+    def _on_configure(self, event):
+        rows = max(1, event.height // self.row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.offset = min(self.offset, self._max_offset())
+            self.render()
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-1 if event.delta > 0 else 1)
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection or selection[0] == self.selected:
+            return
+        self.selected = selection[0]
+        if self.on_select:
+            self.on_select(self.selected)
+
+    def _move_selection(self, step):
+        if not len(self.items):
+            return "break"
+        rendered = self.tree.get_children()
+        if self.selected in rendered:
+            row = self.offset + rendered.index(self.selected) + step
+        else:
+            row = self.offset if step > 0 else self.offset + len(rendered) - 1
+        row = max(0, min(row, len(self.items) - 1))
+        if row < self.offset:
+            self.offset = row
+        elif row >= self.offset + self.visible_rows:
+            self.offset = row - self.visible_rows + 1
+        self.selected = self.items[row]
+        self.render()
+        if self.on_select:
+            self.on_select(self.selected)
+        return "break"
@@ -0,0 +1,72 @@
+from array import array
+
+
+NGRAM_SIZE = 3
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class FilteredWords:
+
+    def __init__(self, words, positions):
+        self.words = words
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.words[pos] for pos in self.positions[item]]
+        return self.words[self.positions[item]]
+
+
+class SubstringIndex:
+
+    def __init__(self, sorted_words):
+        self.words = sorted_words
+        self.postings = None
+        self._last_term = None
+        self._last_positions = None
+
+    def _build_postings(self):
+        self.postings = {}
+        for pos, word in enumerate(self.words):
+            for n in range(1, NGRAM_SIZE + 1):
+                for gram in ngrams(word, n):
+                    postings = self.postings.get(gram)
+                    if postings is None:
+                        postings = self.postings[gram] = array('i')
+                    postings.append(pos)
+
+    def __len__(self):
+        return len(self.words)
+
+    def search(self, term):
+        if not term:
+            self._last_term, self._last_positions = None, None
+            return self.words
+
+        if self.postings is None:
+            self._build_postings()
+        words = self.words
+
+        if len(term) <= NGRAM_SIZE:
+            positions = self.postings.get(term, array('i'))
+        else:
+            candidates = None
+            for gram in ngrams(term):
+                postings = self.postings.get(gram)
+                if postings is None:
+                    candidates = ()
+                    break
+                if candidates is None or len(postings) < len(candidates):
+                    candidates = postings
+            if self._last_term is not None and self._last_term in term and len(self._last_positions) < len(candidates):
+                candidates = self._last_positions
+            positions = array('i', [pos for pos in candidates if term in words[pos]])
+
+        self._last_term, self._last_positions = term, positions
+        return FilteredWords(words, positions)
@@ -0,0 +1,180 @@
+from itertools import combinations
+
+import numpy as np
+
+
+MEASURES = ('count', 'pmi', 'log_likelihood', 't_score')
+NGRAM_SIZES = (2, 3)
+FIELDS = ('token_lower', 'lemma', 'tag')
+
+
+class NgramTable:
+
+    def __init__(self, corpus, field, n, window, ngrams, counts, measures, total):
+        self.corpus = corpus
+        self.field = field
+        self.n = n
+        self.window = window
+        self.ngrams = ngrams
+        self.counts = counts
+        self.measures = dict(measures, count=counts)
+        self.total = total
+
+    def __len__(self):
+        return len(self.counts)
+
+    def order(self, measure='count'):
+        return np.lexsort((-self.counts, -self.measures[measure]))
+
+    def rows(self, measure='count', limit=None):
+        strings = (self.corpus.tags if self.field == 'tag' else self.corpus.strings).strings
+        order = self.order(measure)
+        if limit is not None:
+            order = order[:limit]
+        pmi, log_likelihood, t_score = (self.measures[name] for name in MEASURES[1:])
+        for row in order.tolist():
+            words = tuple(strings[column[row]] for column in self.ngrams)
+            yield words, int(self.counts[row]), float(pmi[row]), float(log_likelihood[row]), float(t_score[row])
+
+
+def _column(corpus, name, start, end):
+    column = getattr(corpus, name)[start:end]
+    return np.frombuffer(column, dtype=np.dtype(column.typecode))
+
+
+def _word_arrays(corpus, field, start, end):
+    values = _column(corpus, field, start, end)
+    is_word = np.frombuffer(bytes(corpus.is_word), dtype=np.uint8).astype(bool)
+    words = is_word[_column(corpus, 'token', start, end)]
+
+    doc, sent_num = _column(corpus, 'doc', start, end), _column(corpus, 'sent_num', start, end)
+    boundaries = ~words
+    boundaries[:1] = True
+    boundaries[1:] |= (doc[1:] != doc[:-1]) | (sent_num[1:] != sent_num[:-1])
+    segments = np.cumsum(boundaries)
+    return values[words], segments[words]
+
+
+def _instances(values, segments, n, window):
+    if n == 2:
+        lefts, rights = [], []
+        for distance in range(1, window):
+            same = segments[:-distance] == segments[distance:]
+            lefts.append(values[:-distance][same])
+            rights.append(values[distance:][same])
+        return [np.concatenate(lefts), np.concatenate(rights)]
+    same = segments[:1 - n] == segments[n - 1:]
+    return [values[offset:len(values) - n + 1 + offset][same] for offset in range(n)]
+
+
+def _keys(codes, size):
+    keys = codes[0].astype(np.uint64)
+    for column in codes[1:]:
+        keys = keys * np.uint64(size) + column
+    return keys
+
+
+def _decode(keys, size, n):
+    codes = []
+    for _ in range(n):
+        keys, column = np.divmod(keys, np.uint64(size))
+        codes.append(column.astype(np.int64))
+    return codes[::-1]
+
+
+def _lookup(codes, rows, positions, size):
+    keys, counts = np.unique(_keys([codes[position] for position in positions], size), return_counts=True)
+    wanted = _keys([rows[position] for position in positions], size)
+    return counts[np.searchsorted(keys, wanted)]
+
+
+def _association(subset_counts, n, total):
+    positions = range(n)
+    total = float(total)
+    full = subset_counts[tuple(positions)]
+    marginals = [subset_counts[(position,)] for position in positions]
+
+    log_likelihood = np.zeros(len(full))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for size in range(n + 1):
+            for cell in combinations(positions, size):
+                observed = np.zeros(len(full))
+                for extra in range(n - size + 1):
+                    for added in combinations([p for p in positions if p not in cell], extra):
+                        superset = tuple(sorted(cell + added))
+                        observed += (-1) ** extra * subset_counts.get(superset, total)
+                expected = np.ones(len(full))
+                for position in positions:
+                    expected *= marginals[position] if position in cell else total - marginals[position]
+                expected /= total ** (n - 1)
+                log_likelihood += np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+
+        independent = np.prod(marginals, axis=0) / total ** (n - 1)
+        pmi = np.log2(full / independent)
+        t_score = (full - independent) / np.sqrt(full)
+    return {'pmi': pmi, 'log_likelihood': 2 * log_likelihood, 't_score': t_score}
+
+
+def ngram_window(n, field, window):
+    if n not in NGRAM_SIZES:
+        raise ValueError(f"Поддерживаются только n-граммы длины {', '.join(map(str, NGRAM_SIZES))}.")
+    if field not in FIELDS:
+        raise ValueError(f"Неизвестное поле '{field}'.")
+    window = window or n
+    if window < n or (n > 2 and window != n):
+        raise ValueError("Окно больше длины n-граммы поддерживается только для биграмм; "
+                         "для биграмм окно должно быть не меньше 2.")
+    return window
+
+
+def ngram_statistics(corpus, n=2, field='token_lower', window=None, min_freq=1, document=None):
+    window = ngram_window(n, field, window)
+    if document is None:
+        start, end = 0, len(corpus)
+    else:
+        start, end = corpus.documents[document]['start'], corpus.documents[document]['end']
+    values, segments = _word_arrays(corpus, field, start, end)
+    columns = _instances(values, segments, n, window)
+    total = len(columns[0])
+
+    present = np.bincount(values, minlength=1) > 0
+    vocabulary = np.flatnonzero(present)
+    size = max(len(vocabulary), 1)
+    if size ** n >= 2 ** 64:
+        raise ValueError("Словарь слишком велик для подсчета n-грамм этой длины.")
+    lookup = (np.cumsum(present) - 1).astype(np.uint32)
+    codes = [lookup[column] for column in columns]
+    del columns, values, segments
+
+    keys, counts = np.unique(_keys(codes, size), return_counts=True)
+    keep = counts >= min_freq
+    keys, counts = keys[keep], counts[keep]
+    rows = _decode(keys, size, n)
+
+    subset_counts = {tuple(range(n)): counts.astype(np.float64)}
+    for position in range(n):
+        subset_counts[(position,)] = np.bincount(codes[position], minlength=size)[rows[position]].astype(np.float64)
+    for subset_size in range(2, n):
+        for positions in combinations(range(n), subset_size):
+            subset_counts[positions] = _lookup(codes, rows, positions, size).astype(np.float64)
+
+    measures = _association(subset_counts, n, total)
+    return NgramTable(corpus, field, n, window, [vocabulary[row] for row in rows], counts, measures, total)
+
+
+def ngram_table(corpus, field, n, window, grouped, min_freq=1):
+    grouped = np.array(grouped, dtype=np.int64).reshape(-1, n + 1)
+    ngrams, counts = grouped[:, :n], grouped[:, n]
+    total = int(counts.sum())
+    keep = counts >= min_freq
+
+    subset_counts = {tuple(range(n)): counts[keep].astype(np.float64)}
+    for subset_size in range(1, n):
+        for positions in combinations(range(n), subset_size):
+            _, inverse = np.unique(ngrams[:, positions], axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            subset_counts[positions] = np.bincount(inverse, weights=counts)[inverse][keep]
+
+    measures = _association(subset_counts, n, total)
+    return NgramTable(corpus, field, n, window, [ngrams[keep, position] for position in range(n)],
+                      counts[keep], measures, total)
@@ -0,0 +1,29 @@
+import pytest
+
+import corpus_engine
+from corpus_engine import CorpusEngine
+from text_pipeline import iter_records
+
+
+# Тексты в тестах уже размечены: одно предложение на строку, токены через пробел
+# в виде "слово/ТЕГ" или "слово/ТЕГ/лемма" (по умолчанию лемма - слово в нижнем регистре).
+def iter_tagged_lines(text):
+    for sent_num, line in enumerate(text.splitlines(), 1):
+        for token_num, item in enumerate(line.split(), 1):
+            token, tag, *lemma = item.split('/')
+            token_lower = token.lower()
+            yield token, token_lower, tag, lemma[0] if lemma else token_lower, sent_num, token_num
+
+
+def process_tagged_text(text, doc_name):
+    return list(iter_records(iter_tagged_lines(text), doc_name))
+
+
+@pytest.fixture
+def tagged_text(monkeypatch):
+    monkeypatch.setattr(corpus_engine, 'process_text', process_tagged_text)
+
+
+@pytest.fixture
+def engine(tagged_text, tmp_path):
+    return CorpusEngine(lemma_cache_path=str(tmp_path / 'lemmas.cache'))
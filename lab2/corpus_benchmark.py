@@ -0,0 +1,105 @@
+import argparse
+import gc
+import re
+import sys
+import time
+import tracemalloc
+
+from corpus_store import ColumnarCorpus
+
+
+SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]*")
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+TAGS = ('NN', 'NNS', 'VB', 'VBD', 'VBZ', 'JJ', 'RB', 'IN', 'DT', 'PRP', 'CC', 'CD', '.', ',')
+SYNTHETIC_TEXT = (
+    "The quick brown fox jumps over the lazy dog. Researchers analysed the corpora, "
+    "and the results were surprising! Were the annotators consistent? They counted 42 tokens."
+)
+
+
+def iter_records(texts, doc_names, min_tokens=0):
+    emitted = 0
+    repetition = 0
+    while True:
+        for text, doc_name in zip(texts, doc_names):
+            if repetition:
+                doc_name = f"{doc_name} #{repetition}"
+            for sent_idx, sentence in enumerate(SENTENCE_PATTERN.findall(text)):
+                for token_idx, match in enumerate(TOKEN_PATTERN.finditer(sentence)):
+                    token = match.group()
+                    token_lower = token.lower()
+                    yield {
+                        'token': token,
+                        'token_lower': token_lower,
+                        'tag': TAGS[len(token) % len(TAGS)],
+                        'lemma': token_lower[:-1] if token_lower.endswith('s') else token_lower,
+                        'doc_name': doc_name,
+                        'sent_num': sent_idx + 1,
+                        'token_num': token_idx + 1,
+                    }
+                    emitted += 1
+        repetition += 1
+        if emitted >= min_tokens or not emitted:
+            return
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    corpus = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return corpus, size, elapsed
+
+
+def run(texts, doc_names, min_tokens=0, out=sys.stdout):
+    records, list_size, list_time = measure(lambda: list(iter_records(texts, doc_names, min_tokens)))
+    token_count = len(records)
+    del records
+
+    columnar, columnar_size, columnar_time = measure(
+        lambda: ColumnarCorpus.from_records(iter_records(texts, doc_names, min_tokens)))
+
+    ratio = list_size / columnar_size if columnar_size else float('inf')
+    print(f"Токенов: {token_count}, документов: {len(columnar.docs)}, "
+          f"уникальных строк: {len(columnar.strings)}, тегов: {len(columnar.tags)}", file=out)
+    print(f"Список словарей:    {list_size / (1024 * 1024):9.1f} МБ, {list_size / max(token_count, 1):6.1f} байт/токен, "
+          f"построение {list_time:.2f} с", file=out)
+    print(f"Колоночный корпус:  {columnar_size / (1024 * 1024):9.1f} МБ, {columnar_size / max(token_count, 1):6.1f} байт/токен, "
+          f"построение {columnar_time:.2f} с", file=out)
+    print(f"Сокращение памяти: {ratio:.1f}x", file=out)
+    return ratio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Сравнение памяти корпуса в виде списка словарей и в колоночном представлении."
+    )
+    parser.add_argument("files", nargs="*", help="текстовые файлы (по умолчанию - синтетический текст)")
+    parser.add_argument("-n", "--tokens", type=int, default=1_000_000,
+                        help="минимальное число токенов; тексты повторяются как новые документы")
+    parser.add_argument("--min-ratio", type=float, default=None,
+                        help="минимально допустимое сокращение памяти; при меньшем значении код выхода 1")
+    args = parser.parse_args(argv)
+
+    if args.files:
+        texts = []
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+        doc_names = args.files
+    else:
+        texts, doc_names = [SYNTHETIC_TEXT], ["synthetic.txt"]
+
+    ratio = run(texts, doc_names, args.tokens)
+    if args.min_ratio is not None and ratio < args.min_ratio:
+        print(f"Сокращение {ratio:.1f}x меньше порога {args.min_ratio:.1f}x", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+
+from corpus_engine import DOCUMENT_ANALYSES, DOCUMENT_FIELD_LABELS, NGRAM_FIELD_LABELS, NGRAM_MEASURE_LABELS, CorpusEngine
+from corpus_format import is_segmented_corpus
+from corpus_sqlite import DATABASE_EXTENSION, SqliteCorpusEngine, is_database
+from diagnostics import action_timings, collect_diagnostics, export_diagnostics, set_memory_tracing
+from kwic import KWIC_SORT_LABELS
+
+
+def open_engine(path, must_exist=True):
+    if is_database(path):
+        if must_exist and not os.path.exists(path):
+            raise ValueError(f"Файл корпуса '{path}' не найден.")
+        return SqliteCorpusEngine(path)
+    engine = CorpusEngine()
+    if os.path.exists(path):
+        if not is_segmented_corpus(path):
+            raise ValueError(f"Файл '{path}' сохранен в старом формате. "
+                             f"Преобразуйте его: python corpus_format.py convert {path} новый.scorpus")
+        engine.load(path)
+    elif must_exist:
+        raise ValueError(f"Файл корпуса '{path}' не найден.")
+    return engine
+
+
+def write_lines(lines, output=None):
+    if output is None:
+        for line in lines:
+            print(line)
+        return
+    with open(output, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+
+
+def save(engine, path):
+    if engine.database:
+        print(f"Изменения записаны в базу '{path}'.", file=sys.stderr)
+        return
+    if engine.corpus_file is None:
+        segments, written = engine.save_as(path)
+    else:
+        segments, written = engine.save()
+    print(f"Корпус сохранен в '{path}': дописано сегментов {segments}, {written / 1024:.0f} КБ", file=sys.stderr)
+
+
+def add(engine, args):
+    if not args.no_lemma_cache:
+        engine.load_lemma_cache()
+    job, (kind, error) = engine.ingest_files(
+        args.paths, args.workers, lambda job: print(engine.format_ingest_progress(job), file=sys.stderr))
+    print(engine.format_ingest_summary(job, kind, error), file=sys.stderr)
+    if engine.corpus.documents:
+        save(engine, args.corpus)
+    if not args.no_lemma_cache:
+        engine.save_lemma_cache()
+    return 0 if kind == 'done' and not engine.ingest_summary['failed'] else 1
+
+
+def add_text(engine, args):
+    with open(args.file, 'r', encoding='utf-8') if args.file != '-' else sys.stdin as f:
+        text = f.read().strip()
+    identifier = engine.add_text(args.identifier or engine.next_text_identifier(), text)
+    print(f"Текст '{identifier}' добавлен. Всего токенов в корпусе: {len(engine.corpus)}", file=sys.stderr)
+    save(engine, args.corpus)
+    return 0
+
+
+def remove(engine, args):
+    if not engine.corpus.has_document(args.document):
+        raise ValueError(f"Документа '{args.document}' нет в корпусе.")
+    engine.remove_document(args.document)
+    save(engine, args.corpus)
+    return 0
+
+
+def report(engine, args):
+    if args.command == "content":
+        lines = engine.iter_content_report()
+    elif args.command == "stats":
+        lines = engine.iter_frequency_report()
+    elif args.command == "concordance":
+        results = engine.concordance(engine.concordance_query(args.query), args.sort, args.top)
+        lines = engine.iter_concordance_report(args.query, results)
+    elif args.command == "word":
+        lines = engine.iter_word_report(args.word)
+    elif args.command == "query":
+        lines = engine.iter_pattern_report(engine.pattern_query(args.pattern), args.sort, args.top)
+    elif args.command in DOCUMENT_ANALYSES:
+        result = engine.document_analysis(args.command, args.document, args.field, args.top)
+        lines = engine.iter_document_report(args.command, args.document, args.field, result)
+    else:
+        table = engine.ngram_statistics(args.n, args.field, args.window, args.min_freq, args.document)
+        lines = engine.iter_ngram_report(table, args.measure, args.document)
+    write_lines(lines, args.output)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Корпусный менеджер без графического интерфейса.")
+    parser.add_argument("--diagnostics", metavar="FILE", default=None,
+                        help="записать в файл JSON время этапов обработки и команды, размер структур данных и память по модулям (tracemalloc)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help_text, report_command=True):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("corpus", help=f"файл корпуса .scorpus или база {DATABASE_EXTENSION}")
+        if report_command:
+            command.add_argument("-o", "--output", help="записать отчет в файл вместо вывода на экран")
+        return command
+
+    def add_kwic_options(command):
+        command.add_argument("--sort", default='position', choices=list(KWIC_SORT_LABELS),
+                             help="порядок строк: по позиции, имени документа, левому или правому контексту")
+        command.add_argument("--top", type=int, default=None, help="вывести только первые N строк в этом порядке")
+
+    command = add_command("add", "добавить файлы .txt или папки и сохранить корпус (файл создается при необходимости)", False)
+    command.add_argument("paths", nargs="+", help="файлы .txt или папки с ними")
+    command.add_argument("--workers", type=int, default=None, help="число процессов обработки")
+    command.add_argument("--no-lemma-cache", action="store_true", help="не загружать и не сохранять кэш лемм")
+    command = add_command("add-text", "добавить текст из файла или стандартного ввода как отдельный документ", False)
+    command.add_argument("file", help="файл с текстом или - для стандартного ввода")
+    command.add_argument("--identifier", help="идентификатор документа")
+    command = add_command("remove", "удалить документ из корпуса", False)
+    command.add_argument("document", help="имя документа")
+    add_command("content", "содержимое корпуса")
+    add_command("stats", "частотная статистика")
+    command = add_command("concordance", "конкорданс слова или фразы")
+    command.add_argument("query", help="слово или фраза")
+    add_kwic_options(command)
+    command = add_command("word", "информация о вхождениях слова")
+    command.add_argument("word", help="слово")
+    command = add_command("query", "поиск по шаблону, например '[lemma=\"be\"] [tag=\"VBN\"]'")
+    command.add_argument("pattern", help="шаблон запроса")
+    add_kwic_options(command)
+    command = add_command("ngrams", "n-граммы и меры ассоциации")
+    command.add_argument("-n", type=int, default=2, choices=(2, 3), help="длина n-граммы")
+    command.add_argument("--field", default='token_lower', choices=list(NGRAM_FIELD_LABELS), help="поле для подсчета")
+    command.add_argument("--window", type=int, default=None, help="окно для биграмм")
+    command.add_argument("--min-freq", type=int, default=2, help="минимальная частота")
+    command.add_argument("--document", default=None, help="считать только по этому документу")
+    command.add_argument("--measure", default='count', choices=list(NGRAM_MEASURE_LABELS), help="мера для сортировки")
+    for analysis, help_text, top in (("tfidf", "ключевые термины документа по TF-IDF", 50),
+                                     ("keyness", "ключевые слова документа в сравнении с остальным корпусом", 50),
+                                     ("similar", "документы, похожие на данный (косинусное сходство TF-IDF)", 20)):
+        command = add_command(analysis, help_text)
+        command.add_argument("document", help="имя документа")
+        command.add_argument("--field", default='lemma', choices=list(DOCUMENT_FIELD_LABELS), help="поле для подсчета")
+        command.add_argument("--top", type=int, default=top, help="сколько строк вывести")
+    args = parser.parse_args(argv)
+
+    handlers = {"add": add, "add-text": add_text, "remove": remove}
+    if args.diagnostics is not None:
+        set_memory_tracing(True)
+    try:
+        with action_timings.measure(args.command):
+            engine = open_engine(args.corpus, must_exist=args.command not in ("add", "add-text"))
+            status = handlers.get(args.command, report)(engine, args)
+        if args.diagnostics is not None:
+            export_diagnostics(args.diagnostics, collect_diagnostics(engine))
+        return status
+    except BrokenPipeError:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+import os
+import queue
+from itertools import islice
+
+from corpus_format import CorpusFile, convert_legacy_corpus, load_corpus_file
+from corpus_index import CorpusIndex
+from corpus_query import PatternQuery
+from corpus_stats import CorpusStatistics
+from diagnostics import pipeline_timings
+from corpus_store import ColumnarCorpus
+from ingest import IngestJob, find_text_files
+from kwic import KWIC_SORT_LABELS, PAGE_ROWS, CorpusContexts, KwicResults
+from lemma_cache import DEFAULT_CACHE_PATH
+from text_pipeline import iter_records, iter_stream_tokens, lemma_cache, process_text
+from text_stream import SentenceReader
+
+try:
+    from collocations import ngram_statistics
+    from document_terms import DocumentTerms
+except ImportError:
+    print("NumPy library not found. N-gram statistics and document comparison will be disabled. "
+          "Install with: pip install numpy")
+    ngram_statistics = None
+    DocumentTerms = None
+
+
+NGRAM_FIELD_LABELS = {'token_lower': "словоформам", 'lemma': "леммам", 'tag': "тегам"}
+NGRAM_MEASURE_LABELS = {'count': "частоте", 'pmi': "PMI", 'log_likelihood': "log-likelihood", 't_score': "t-score"}
+NGRAM_NAMES = {2: "Биграммы", 3: "Триграммы"}
+WHOLE_CORPUS = "Весь корпус"
+DOCUMENT_FIELD_LABELS = {'lemma': "леммам", 'token_lower': "словоформам"}
+DOCUMENT_ANALYSES = {
+    'tfidf': "Ключевые термины (TF-IDF)",
+    'keyness': "Ключевые слова: документ против остального корпуса",
+    'similar': "Похожие документы",
+}
+INGEST_STATUS = {'done': "Загрузка завершена", 'cancelled': "Загрузка отменена", 'error': "Загрузка прервана ошибкой"}
+
+
+class CorpusEngine:
+
+    database = False
+
+    def __init__(self, lemma_cache_path=DEFAULT_CACHE_PATH):
+        self.lemma_cache = lemma_cache
+        self.lemma_cache_path = lemma_cache_path
+        self.ingest_job = None
+        self.ingest_summary = None
+        self._open()
+
+    def _open(self):
+        self._use(ColumnarCorpus())
+
+    def _use(self, corpus, base=None, corpus_file=None):
+        self.corpus = corpus
+        self.index = CorpusIndex(corpus, base)
+        self.stats = CorpusStatistics(corpus)
+        self.contexts = CorpusContexts(corpus)
+        self.terms = DocumentTerms(corpus) if DocumentTerms is not None else None
+        self.corpus_file = corpus_file
+
+    def _update_index(self, added=()):
+        self.index.update()
+        if self.terms is not None:
+            self.terms.add(added)
+
+    def _check_new_document(self, doc_name, message):
+        if self.corpus.has_document(doc_name):
+            raise ValueError(message)
+
+    def add_file(self, filepath):
+        doc_name = os.path.basename(filepath)
+        self._check_new_document(doc_name, f"Файл '{doc_name}' уже есть в корпусе.")
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = SentenceReader(f)
+            try:
+                document = self.corpus.add_document(doc_name, iter_records(iter_stream_tokens(reader), doc_name),
+                                                    source=filepath)
+            except Exception:
+                if self.corpus.has_document(doc_name):
+                    self.corpus.remove_document(doc_name)
+                raise
+        document['characters'] = reader.characters
+        self._update_index([doc_name])
+        return doc_name
+
+    def add_text(self, identifier, text):
+        self._check_new_document(identifier, f"Идентификатор '{identifier}' уже используется.")
+        self.corpus.add_document(identifier, process_text(text, identifier), characters=len(text))
+        self._update_index([identifier])
+        return identifier
+
+    def next_text_identifier(self):
+        existing_ids = {doc_name for doc_name in self.corpus.document_names() if doc_name.startswith('Введенный текст')}
+        count = 1
+        while f"Введенный текст {count}" in existing_ids:
+            count += 1
+        return f"Введенный текст {count}"
+
+    def remove_document(self, doc_name):
+        document = self.corpus.documents[doc_name]
+        self.stats.remove_range(document['start'], document['end'])
+        start, end = self.corpus.remove_document(doc_name)
+        self.index.remove_range(start, end)
+        if self.terms is not None:
+            self.terms.remove(doc_name)
+
+    def start_ingest(self, paths, max_workers=None):
+        filepaths = []
+        for path in paths:
+            filepaths.extend(find_text_files(path) if os.path.isdir(path) else [path])
+
+        selected = []
+        skipped = []
+        seen_names = set()
+        for filepath in filepaths:
+            doc_name = os.path.basename(filepath)
+            if self.corpus.has_document(doc_name) or doc_name in seen_names:
+                skipped.append(doc_name)
+            else:
+                seen_names.add(doc_name)
+                selected.append(filepath)
+
+        if not selected:
+            raise ValueError("Все выбранные файлы уже есть в корпусе." if filepaths else "Не найдено файлов .txt.")
+
+        self.ingest_summary = {'added': 0, 'skipped': skipped, 'failed': []}
+        self.ingest_job = IngestJob(selected, max_workers=max_workers, lemma_entries=self.lemma_cache.snapshot())
+        self.ingest_job.start()
+        return self.ingest_job
+
+    def cancel_ingest(self):
+        if self.ingest_job is not None:
+            self.ingest_job.cancel()
+
+    def poll_ingest(self, timeout=None):
+        job = self.ingest_job
+        if job is None:
+            return None
+
+        added = []
+        finished = None
+        try:
+            while finished is None:
+                kind, payload = job.messages.get(timeout=timeout) if timeout else job.messages.get_nowait()
+                timeout = None
+
+                if kind == 'document':
+                    filepath, batch, characters, (lemma_hits, lemma_misses, lemma_entries), timings = payload
+                    pipeline_timings.merge(timings)
+                    self.lemma_cache.merge(lemma_entries)
+                    self.lemma_cache.add_counts(lemma_hits, lemma_misses)
+                    doc_name = os.path.basename(filepath)
+                    self.corpus.add_batch(doc_name, batch, source=filepath, characters=characters)
+                    self.ingest_summary['added'] += 1
+                    added.append(doc_name)
+
+                elif kind == 'failed':
+                    filepath, error = payload
+                    self.ingest_summary['failed'].append(f"{os.path.basename(filepath)}: {error}")
+
+                elif kind in INGEST_STATUS:
+                    finished = (kind, payload)
+                    self.ingest_job = None
+        except queue.Empty:
+            pass
+
+        if added:
+            self._update_index(added)
+        return finished
+
+    def ingest_files(self, paths, max_workers=None, progress=None):
+        job = self.start_ingest(paths, max_workers)
+        while True:
+            finished = self.poll_ingest(timeout=0.5)
+            if finished is not None:
+                return job, finished
+            if progress is not None:
+                progress(job)
+
+    def format_ingest_progress(self, job):
+        return (f"Обработка файлов: {job.completed} из {len(job.filepaths)}, "
+                f"{job.tokens} токенов, {job.tokens_per_second():.0f} токенов/с")
+
+    def format_ingest_summary(self, job, kind, error=None):
+        summary = self.ingest_summary
+        message = (f"{INGEST_STATUS[kind]}.\nДобавлено документов: {summary['added']} из {len(job.filepaths)}.\n"
+                   f"Токенов: {job.tokens} за {job.elapsed:.1f} с ({job.tokens_per_second():.0f} токенов/с).\n"
+                   f"{self.lemma_cache.format_stats()}")
+        if summary['skipped']:
+            message += f"\nПропущено (уже в корпусе): {', '.join(summary['skipped'][:10])}"
+            if len(summary['skipped']) > 10:
+                message += f" и еще {len(summary['skipped']) - 10}"
+        if summary['failed']:
+            message += "\nНе удалось обработать:\n" + "\n".join(summary['failed'][:10])
+        if error is not None:
+            message += f"\n{error}"
+        return message
+
+    def iter_content_report(self):
+        corpus = self.corpus
+        if not corpus:
+            yield "Корпус пуст."
+            return
+
+        unique_docs = sorted(corpus.document_names())
+        yield "=== Содержимое корпуса ==="
+        yield ""
+        yield f"Всего документов/текстов: {len(unique_docs)}"
+        yield f"Всего токенов (вкл. пунктуацию): {len(corpus)}"
+        yield f"Всего токенов (только слова): {corpus.word_count()}"
+        yield ""
+        yield "--- Документы/Тексты в корпусе ---"
+        for i, doc_name in enumerate(unique_docs):
+            document = corpus.documents[doc_name]
+            yield (f"{i+1}. {doc_name} (токенов: {document['end'] - document['start']}, "
+                   f"слов: {document['words']}, предложений: {document['sentences']})")
+            if document['source']:
+                yield f"    Источник: {document['source']}"
+
+    def iter_frequency_report(self):
+        corpus_stats = self.stats
+        yield "=== Частотная статистика ==="
+        yield ""
+        yield f"Всего документов/текстов: {len(self.corpus.documents)}"
+        yield f"Всего слов: {corpus_stats.total('tokens')}"
+        yield f"Уникальных слов: {corpus_stats.unique('tokens')}"
+        yield f"Всего лемм: {corpus_stats.total('lemmas')}"
+        yield f"Уникальных лемм: {corpus_stats.unique('lemmas')}"
+        yield f"Всего тегов частей речи: {corpus_stats.total('tags')}"
+        yield f"Уникальных тегов: {corpus_stats.unique('tags')}"
+
+        for title, kind in (("--- Частота Токенов ---", 'tokens'),
+                            ("--- Частота Лемм ---", 'lemmas'),
+                            ("--- Частота Тегов Частей Речи ---", 'tags')):
+            yield ""
+            yield title
+            for item, count in corpus_stats.iter_ranked(kind):
+                yield f"{item}: {count}"
+
+    def _check_ngram_request(self, document):
+        if ngram_statistics is None:
+            raise ValueError("Для подсчета n-грамм нужна библиотека NumPy (pip install numpy).")
+        if document is not None and not self.corpus.has_document(document):
+            raise ValueError(f"Документа '{document}' нет в корпусе.")
+
+    def ngram_statistics(self, n=2, field='token_lower', window=None, min_freq=1, document=None):
+        self._check_ngram_request(document)
+        return ngram_statistics(self.corpus, n, field, window, max(min_freq, 1), document)
+
+    def iter_ngram_report(self, table, measure='count', document=None):
+        window = f", окно {table.window}" if table.n == 2 and table.window > 2 else ""
+        yield f"=== {NGRAM_NAMES[table.n]} по {NGRAM_FIELD_LABELS[table.field]}{window}: {document or WHOLE_CORPUS} ==="
+        yield f"Всего экземпляров: {table.total}, различных n-грамм с частотой не ниже порога: {len(table)}"
+        yield "N-граммы не переходят через границы предложений и знаки препинания."
+        yield ""
+        yield f"{'N-грамма':<45} {'Частота':>8} {'PMI':>8} {'LL':>12} {'t-score':>8}"
+        for words, count, pmi, log_likelihood, t_score in table.rows(measure):
+            yield f"{' '.join(words):<45} {count:>8} {pmi:>8.2f} {log_likelihood:>12.2f} {t_score:>8.2f}"
+
+    def document_analysis(self, analysis, document, field='lemma', limit=50):
+        if self.terms is None:
+            raise ValueError("Для сравнения документов нужна библиотека NumPy (pip install numpy).")
+        if not self.corpus.has_document(document):
+            raise ValueError(f"Документа '{document}' нет в корпусе.")
+        matrix = self.terms.matrix(field)
+        if analysis == 'tfidf':
+            return matrix.top_terms(document, limit)
+        if analysis == 'keyness':
+            return matrix.keyness(document, limit)
+        if analysis == 'similar':
+            return matrix.similar(document, limit)
+        raise ValueError(f"Неизвестный вид анализа '{analysis}'.")
+
+    def iter_document_report(self, analysis, document, field, result):
+        field_label = DOCUMENT_FIELD_LABELS[field]
+        if analysis == 'tfidf':
+            yield f"=== Ключевые термины документа '{document}' по {field_label} (TF-IDF) ==="
+            yield f"Документов в корпусе: {len(self.corpus.documents)}"
+            yield ""
+            yield f"{'Термин':<35} {'Частота':>8} {'Документов':>10} {'TF-IDF':>10}"
+            for term, count, documents, weight in result:
+                yield f"{term:<35} {count:>8} {documents:>10} {weight:>10.3f}"
+        elif analysis == 'keyness':
+            document_total, rest_total, overused, underused = result
+            yield f"=== Ключевые слова документа '{document}' по {field_label}: документ против остального корпуса ==="
+            yield f"Слов в документе: {document_total}, в остальном корпусе: {rest_total}"
+            for title, rows in (("--- Чаще, чем в остальном корпусе ---", overused),
+                                ("--- Реже, чем в остальном корпусе ---", underused)):
+                yield ""
+                yield title
+                if not rows:
+                    yield "Значимых различий нет."
+                    continue
+                yield f"{'Термин':<35} {'В документе':>12} {'В остальных':>12} {'LL':>10} {'Log ratio':>10}"
+                for term, count, rest_count, log_likelihood, log_ratio in rows:
+                    yield f"{term:<35} {count:>12} {rest_count:>12} {log_likelihood:>10.2f} {log_ratio:>10.2f}"
+        else:
+            yield f"=== Документы, похожие на '{document}' (косинусное сходство TF-IDF по {field_label}) ==="
+            yield ""
+            if not result:
+                yield "В корпусе нет других документов."
+                return
+            yield f"{'Документ':<50} {'Сходство':>9}"
+            for doc_name, score in result:
+                yield f"{doc_name:<50} {score:>9.3f}"
+
+    def concordance_query(self, query):
+        from nltk.tokenize import word_tokenize
+        query_tokens_lower = [token.lower() for token in word_tokenize(query) if token.isalpha()]
+        if not query_tokens_lower:
+            raise ValueError("Запрос не содержит слов для поиска.")
+        return query_tokens_lower
+
+    def concordance(self, query_tokens_lower, sort='position', limit=None):
+        n_query = len(query_tokens_lower)
+        hits = ((start, start + n_query) for start in self.index.find_phrase(query_tokens_lower))
+        return KwicResults(self.contexts, hits, sort, limit)
+
+    def iter_kwic_report(self, title, results, not_found):
+        if not results.total:
+            yield not_found
+            return
+        shown = f", показаны первые {len(results)}" if len(results) < results.total else ""
+        yield f"=== {title} ({results.total} найдено{shown}, {KWIC_SORT_LABELS[results.sort]}) ==="
+        yield ""
+        yield from results.lines()
+
+    def iter_concordance_report(self, query, results):
+        return self.iter_kwic_report(f"Конкорданс для '{query}'", results, f"Фраза '{query}' не найдена в корпусе.")
+
+    def pattern_query(self, query_text):
+        return PatternQuery(self.corpus, query_text, self.index)
+
+    def iter_pattern_report(self, query, sort='position', limit=None):
+        if sort != 'position' or limit is not None:
+            yield from self.iter_kwic_report(f"Поиск по шаблону: {query.text}",
+                                             KwicResults(self.contexts, query.matches(), sort, limit),
+                                             "Совпадений не найдено.")
+            return
+        yield f"=== Поиск по шаблону: {query.text} ==="
+        yield ""
+        matches = query.matches()
+        found = 0
+        while True:
+            page = list(islice(matches, PAGE_ROWS))
+            if not page:
+                break
+            found += len(page)
+            yield from self.contexts.format_page(page)
+        if not found:
+            yield "Совпадений не найдено."
+
+    def iter_word_report(self, word):
+        positions = self.index.positions('token_lower', word.lower())
+        if not positions:
+            yield f"Слово '{word}' не найдено в корпусе. Введите одно слово для анализа."
+            return
+
+        yield f"=== Информация о слове '{word}' ==="
+        yield ""
+        yield f"Найдено вхождений: {len(positions)}"
+        yield ""
+        yield "--- Местоположения ---"
+        for position in positions:
+            info = self.corpus[position]
+            yield (f"- Документ: {info['doc_name']}, "
+                   f"Предложение: {info['sent_num']}, "
+                   f"Слово: {info['token_num']}")
+            yield f"  Токен: '{info['token']}', Тег: {info['tag']}, Лемма: {info['lemma']}"
+            yield ""
+
+    def has_unsaved_changes(self):
+        if self.corpus_file is None:
+            return bool(self.corpus.documents)
+        return self.corpus_file.has_changes(self.corpus)
+
+    def save(self):
+        if self.corpus_file is None:
+            raise ValueError("Корпус еще не сохранялся: укажите файл.")
+        if not self.corpus_file.has_changes(self.corpus):
+            return 0, 0
+        return self.corpus_file.sync(self.corpus)
+
+    def save_as(self, filepath):
+        if not self.corpus.documents:
+            raise ValueError("Корпус пуст. Нечего сохранять.")
+        if self.corpus_file is not None:
+            self._detach_file()
+        self.corpus_file, (segments, written) = CorpusFile.create(filepath, self.corpus)
+        return segments, written
+
+    def _detach_file(self):
+        self.corpus.materialize()
+        if self.index.base is not None:
+            self.index.base.detach()
+        self.corpus_file.close()
+
+    def load(self, filepath):
+        previous = self.corpus_file
+        self._use(*load_corpus_file(filepath))
+        if previous is not None:
+            previous.close()
+
+    def import_legacy(self, filepath, target):
+        convert_legacy_corpus(filepath, target)
+        self.load(target)
+
+    def close(self):
+        corpus_file = self.corpus_file
+        self._open()
+        if corpus_file is not None:
+            corpus_file.close()
+
+    def load_lemma_cache(self):
+        return self.lemma_cache.load(self.lemma_cache_path)
+
+    def save_lemma_cache(self, persist=True):
+        if persist:
+            self.lemma_cache.save(self.lemma_cache_path)
+        elif os.path.exists(self.lemma_cache_path):
+            os.remove(self.lemma_cache_path)
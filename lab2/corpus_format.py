@@ -0,0 +1,403 @@
+import argparse
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from corpus_index import INDEXED_FIELDS
+from corpus_store import ColumnarCorpus
+
+
+MAGIC = b'IAZC'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SEGMENT_MAGIC = b'SEGM'
+SEGMENT_HEADER = struct.Struct('<4sHHQ')
+META_LENGTH = struct.Struct('<I')
+VOCABULARY_SEGMENT = 1
+DOCUMENT_SEGMENT = 2
+REMOVAL_SEGMENT = 3
+ALIGNMENT = 8
+CORPUS_EXTENSION = '.scorpus'
+COLUMN_TYPES = (
+    ('token', 'I'),
+    ('token_lower', 'I'),
+    ('lemma', 'I'),
+    ('tag', 'H'),
+    ('sent_num', 'I'),
+    ('token_num', 'I'),
+)
+DOCUMENT_KEYS = ('sentences', 'words', 'source', 'characters', 'added')
+POSTING_PARTS = ('terms', 'offsets', 'positions')
+
+
+def is_segmented_corpus(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _packed(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _padding(length):
+    return b'\0' * (-length % ALIGNMENT)
+
+
+def _segment(kind, meta, sections=()):
+    table = {}
+    body = bytearray()
+    for name, data in sections:
+        table[name] = (len(body), len(data))
+        body += data
+        body += _padding(len(data))
+    meta_bytes = json.dumps(dict(meta, sections=table), ensure_ascii=False).encode('utf-8')
+    head = META_LENGTH.pack(len(meta_bytes)) + meta_bytes
+    payload = head + _padding(len(head)) + body
+    return SEGMENT_HEADER.pack(SEGMENT_MAGIC, kind, 0, len(payload)) + payload
+
+
+def _read_segment(view, offset):
+    meta_length, = META_LENGTH.unpack_from(view, offset)
+    meta_end = offset + META_LENGTH.size + meta_length
+    meta = json.loads(bytes(view[offset + META_LENGTH.size:meta_end]).decode('utf-8'))
+    body = meta_end + (-(meta_end - offset) % ALIGNMENT)
+    sections = {name: view[body + start:body + start + length] for name, (start, length) in meta.pop('sections').items()}
+    return meta, sections
+
+
+def _pack_strings(prefix, strings):
+    return [
+        (f'{prefix}_lengths', _packed(array('I', map(len, strings)))),
+        (f'{prefix}_text', ''.join(strings).encode('utf-8')),
+    ]
+
+
+def _unpack_strings(sections, prefix):
+    text = bytes(sections[f'{prefix}_text']).decode('utf-8')
+    strings = []
+    offset = 0
+    for length in sections[f'{prefix}_lengths'].cast('I'):
+        strings.append(text[offset:offset + length])
+        offset += length
+    return strings
+
+
+def _build_postings(column):
+    groups = {}
+    for position, value in enumerate(column):
+        group = groups.get(value)
+        if group is None:
+            group = groups[value] = array('I')
+        group.append(position)
+    terms = array('I', sorted(groups))
+    offsets = array('I', [0])
+    positions = array('I')
+    for value in terms:
+        positions.extend(groups[value])
+        offsets.append(len(positions))
+    return terms, offsets, positions
+
+
+def _document_segment(corpus, doc_name, document):
+    start, end = document['start'], document['end']
+    sections = [(name, _packed(getattr(corpus, name)[start:end])) for name, _ in COLUMN_TYPES]
+
+    sent_num = corpus.sent_num[start:end]
+    sentence_starts = array('I', (position for position in range(len(sent_num))
+                                  if position == 0 or sent_num[position] != sent_num[position - 1]))
+    sections.append(('sentence_starts', _packed(sentence_starts)))
+
+    for field in INDEXED_FIELDS:
+        postings = _build_postings(getattr(corpus, field)[start:end])
+        sections += [(f'{field}_{part}', _packed(values)) for part, values in zip(POSTING_PARTS, postings)]
+
+    meta = {key: document[key] for key in DOCUMENT_KEYS}
+    meta.update(name=doc_name, tokens=end - start)
+    return _segment(DOCUMENT_SEGMENT, meta, sections)
+
+
+class SegmentPostings:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.segments = []
+        self._sentence_starts = None
+
+    def add(self, doc_name, document, sections):
+        views = {'sentence_starts': sections['sentence_starts'].cast('I')}
+        for field in INDEXED_FIELDS:
+            if f'{field}_terms' in sections:
+                for part in POSTING_PARTS:
+                    views[f'{field}_{part}'] = sections[f'{field}_{part}'].cast('I')
+            else:
+                postings = _build_postings(sections[field].cast(dict(COLUMN_TYPES)[field]))
+                views.update((f'{field}_{part}', values) for part, values in zip(POSTING_PARTS, postings))
+        self.segments.append((doc_name, document, views))
+
+    def _live(self):
+        documents = self.corpus.documents
+        for doc_name, document, views in self.segments:
+            if documents.get(doc_name) is document:
+                yield document, views
+
+    def _lookup(self, views, field, value_id):
+        terms = views[f'{field}_terms']
+        index = bisect_left(terms, value_id)
+        if index == len(terms) or terms[index] != value_id:
+            return None
+        offsets = views[f'{field}_offsets']
+        return offsets[index], offsets[index + 1]
+
+    def positions(self, field, value_id):
+        result = array('I')
+        for document, views in self._live():
+            found = self._lookup(views, field, value_id)
+            if found is not None:
+                start = document['start']
+                result.extend(start + position for position in views[f'{field}_positions'][found[0]:found[1]])
+        return result
+
+    def count(self, field, value_id):
+        total = 0
+        for document, views in self._live():
+            found = self._lookup(views, field, value_id)
+            if found is not None:
+                total += found[1] - found[0]
+        return total
+
+    def end(self):
+        documents = self.corpus.documents
+        for doc_name, document, views in reversed(self.segments):
+            if documents.get(doc_name) is document:
+                return document['end']
+        return 0
+
+    def sentence_starts(self):
+        if self._sentence_starts is None:
+            starts = array('I')
+            for document, views in self._live():
+                start = document['start']
+                starts.extend(start + position for position in views['sentence_starts'])
+            self._sentence_starts = starts
+        return self._sentence_starts
+
+    def invalidate(self):
+        self._sentence_starts = None
+
+    def detach(self):
+        self.segments = [(doc_name, document, {key: array('I', bytes(values)) for key, values in views.items()})
+                         for doc_name, document, views in self.segments]
+
+
+def _column_loader(typecode, parts):
+    def load():
+        column = array(typecode)
+        for part in parts:
+            column.frombytes(part)
+        if sys.byteorder != 'little':
+            column.byteswap()
+        return column
+    return load
+
+
+def _doc_column_loader(parts):
+    def load():
+        column = array('I')
+        for doc_id, tokens in parts:
+            column.extend(array('I', [doc_id]) * tokens)
+        return column
+    return load
+
+
+class CorpusFile:
+
+    def __init__(self, path):
+        self.path = path
+        self.end = HEADER.size
+        self.segments = 0
+        self.saved_strings = 0
+        self.saved_tags = 0
+        self.documents = {}
+        self.mapping = None
+
+    @classmethod
+    def create(cls, path, corpus):
+        corpus_file = cls(path)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0))
+            result = corpus_file._write_changes(f, corpus)
+        os.replace(temp_path, path)
+        return corpus_file, result
+
+    def close(self):
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
+    def has_changes(self, corpus):
+        if len(corpus.strings) > self.saved_strings or len(corpus.tags) > self.saved_tags:
+            return True
+        if len(corpus.documents) != len(self.documents):
+            return True
+        return any(self.documents.get(doc_name) is not document for doc_name, document in corpus.documents.items())
+
+    def sync(self, corpus):
+        with open(self.path, 'r+b') as f:
+            f.seek(self.end)
+            f.truncate()
+            result = self._write_changes(f, corpus)
+            f.flush()
+            os.fsync(f.fileno())
+        return result
+
+    def _write_changes(self, f, corpus):
+        segments = []
+        if len(corpus.strings) > self.saved_strings or len(corpus.tags) > self.saved_tags:
+            meta = {'first_string': self.saved_strings, 'first_tag': self.saved_tags}
+            sections = (_pack_strings('strings', corpus.strings.strings[self.saved_strings:])
+                        + _pack_strings('tags', corpus.tags.strings[self.saved_tags:]))
+            segments.append(_segment(VOCABULARY_SEGMENT, meta, sections))
+            self.saved_strings, self.saved_tags = len(corpus.strings), len(corpus.tags)
+
+        for doc_name, document in list(self.documents.items()):
+            if corpus.documents.get(doc_name) is not document:
+                segments.append(_segment(REMOVAL_SEGMENT, {'name': doc_name}))
+                del self.documents[doc_name]
+
+        written = 0
+        for segment in segments:
+            f.write(segment)
+            written += len(segment)
+        for doc_name, document in corpus.documents.items():
+            if self.documents.get(doc_name) is not document:
+                segment = _document_segment(corpus, doc_name, document)
+                f.write(segment)
+                written += len(segment)
+                segments.append(segment)
+                self.documents[doc_name] = document
+
+        self.end = f.tell()
+        self.segments += len(segments)
+        return len(segments), written
+
+
+def load_corpus_file(path):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f"Файл '{path}' не является корпусом.")
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _ = HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC or version != VERSION:
+        mapping.close()
+        if magic != MAGIC:
+            raise ValueError(f"Файл '{path}' не является корпусом.")
+        raise ValueError(f"Неподдерживаемая версия формата корпуса: {version}.")
+
+    corpus = ColumnarCorpus()
+    corpus_file = CorpusFile(path)
+    corpus_file.mapping = mapping
+    view = memoryview(mapping)
+    loaded = {}
+    offset = HEADER.size
+    while offset + SEGMENT_HEADER.size <= size:
+        magic, kind, _, length = SEGMENT_HEADER.unpack_from(mapping, offset)
+        payload = offset + SEGMENT_HEADER.size
+        if magic != SEGMENT_MAGIC or payload + length > size:
+            break
+        meta, sections = _read_segment(view, payload)
+        if kind == VOCABULARY_SEGMENT:
+            if meta['first_string'] != len(corpus.strings) or meta['first_tag'] != len(corpus.tags):
+                raise ValueError(f"Файл корпуса '{path}' поврежден: нарушен порядок словарей.")
+            for value in _unpack_strings(sections, 'strings'):
+                corpus._intern_string(value)
+            for value in _unpack_strings(sections, 'tags'):
+                corpus.tags.intern(value)
+        elif kind == DOCUMENT_SEGMENT:
+            loaded.pop(meta['name'], None)
+            loaded[meta['name']] = (meta, sections)
+        elif kind == REMOVAL_SEGMENT:
+            loaded.pop(meta['name'], None)
+        corpus_file.segments += 1
+        offset = payload + length
+    corpus_file.end = offset
+    corpus_file.saved_strings = len(corpus.strings)
+    corpus_file.saved_tags = len(corpus.tags)
+
+    base = SegmentPostings(corpus)
+    column_parts = {name: [] for name, _ in COLUMN_TYPES}
+    doc_parts = []
+    for doc_name, (meta, sections) in loaded.items():
+        document = corpus._register_document(doc_name)
+        for key in DOCUMENT_KEYS:
+            document[key] = meta[key]
+        document['end'] = document['start'] + meta['tokens']
+        corpus_file.documents[doc_name] = document
+        for name, _ in COLUMN_TYPES:
+            column_parts[name].append(sections[name])
+        doc_parts.append((corpus.docs.intern(doc_name), meta['tokens']))
+        base.add(doc_name, document, sections)
+
+    for name, typecode in COLUMN_TYPES:
+        corpus.defer_column(name, _column_loader(typecode, column_parts[name]))
+    corpus.defer_column('doc', _doc_column_loader(doc_parts))
+    return corpus, base, corpus_file
+
+
+def read_legacy_corpus(path):
+    with open(path, 'rb') as f:
+        loaded = pickle.load(f)
+    if isinstance(loaded, list):
+        return ColumnarCorpus.from_records(loaded)
+    if isinstance(loaded, ColumnarCorpus):
+        if 'documents' in vars(loaded):
+            loaded.__dict__.setdefault('_column_loaders', {})
+            return loaded
+        return ColumnarCorpus.from_records(loaded.record(position) for position in range(len(loaded.token)))
+    raise TypeError("Файл не содержит корпус в старом формате (список токенов).")
+
+
+def convert_legacy_corpus(source, target):
+    corpus = read_legacy_corpus(source)
+    CorpusFile.create(target, corpus)
+    return corpus
+
+
+def describe(path):
+    corpus, _, corpus_file = load_corpus_file(path)
+    return (f"Файл: {path}\n"
+            f"Размер: {os.path.getsize(path) / 1024:.0f} КБ, сегментов: {corpus_file.segments}\n"
+            f"Документов: {len(corpus.documents)}, токенов: {len(corpus)}, строк в словаре: {len(corpus.strings)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сегментированный формат корпуса (.scorpus).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="преобразовать корпус старого формата (pickle) в .scorpus")
+    convert.add_argument("source", help="файл .corpus старого формата")
+    convert.add_argument("target", help="результирующий файл .scorpus")
+    info = commands.add_parser("info", help="показать сведения о файле .scorpus")
+    info.add_argument("path", help="файл .scorpus")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        corpus = convert_legacy_corpus(args.source, args.target)
+        print(f"Корпус '{args.source}' преобразован в '{args.target}': "
+              f"{len(corpus.documents)} документов, {len(corpus)} токенов.")
+    else:
+        print(describe(args.path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+INDEXED_FIELDS = ('token_lower', 'lemma', 'tag')
+
+
+def _remove_positions(positions, start, end):
+    removed = end - start
+    low = bisect_left(positions, start)
+    high = bisect_left(positions, end, low)
+    tail = positions[high:]
+    del positions[low:]
+    positions.extend(position - removed for position in tail)
+
+
+def _bounds(starts, position, end):
+    sentence = bisect_right(starts, position) - 1
+    if sentence + 1 < len(starts):
+        return starts[sentence], starts[sentence + 1]
+    return starts[sentence], end
+
+
+class CorpusIndex:
+
+    def __init__(self, corpus, base=None):
+        self.corpus = corpus
+        self.base = base
+        self.postings = {field: {} for field in INDEXED_FIELDS}
+        self.sentence_starts = array('I')
+        self.indexed = len(corpus) if base is not None else 0
+        self.update()
+
+    def update(self):
+        corpus = self.corpus
+        total = len(corpus)
+        if self.indexed >= total:
+            return
+
+        for field in INDEXED_FIELDS:
+            field_postings = self.postings[field]
+            column = getattr(corpus, field)
+            for position in range(self.indexed, total):
+                value_id = column[position]
+                postings = field_postings.get(value_id)
+                if postings is None:
+                    postings = field_postings[value_id] = array('I')
+                postings.append(position)
+
+        doc, sent_num = corpus.doc, corpus.sent_num
+        starts = self.sentence_starts
+        for position in range(self.indexed, total):
+            if position == 0 or doc[position] != doc[position - 1] or sent_num[position] != sent_num[position - 1]:
+                starts.append(position)
+
+        self.indexed = total
+
+    def remove_range(self, start, end):
+        removed = end - start
+        if not removed:
+            return
+        for field_postings in self.postings.values():
+            for value_id, postings in list(field_postings.items()):
+                if postings[-1] < start:
+                    continue
+                _remove_positions(postings, start, end)
+                if not postings:
+                    del field_postings[value_id]
+        _remove_positions(self.sentence_starts, start, end)
+        self.indexed -= removed
+        if self.base is not None:
+            self.base.invalidate()
+
+    def _vocabulary(self, field):
+        return self.corpus.tags if field == 'tag' else self.corpus.strings
+
+    def value_positions(self, field, value_id):
+        postings = self.postings[field].get(value_id, ())
+        if self.base is None:
+            return postings
+        merged = self.base.positions(field, value_id)
+        merged.extend(postings)
+        return merged
+
+    def value_count(self, field, value_id):
+        count = len(self.postings[field].get(value_id, ()))
+        if self.base is not None:
+            count += self.base.count(field, value_id)
+        return count
+
+    def positions(self, field, value):
+        value_id = self._vocabulary(field).get(value)
+        if value_id is None:
+            return ()
+        return self.value_positions(field, value_id)
+
+    def sentence_bounds(self, position):
+        if self.base is not None:
+            base_end = self.base.end()
+            if position < base_end:
+                return _bounds(self.base.sentence_starts(), position, base_end)
+        return _bounds(self.sentence_starts, position, self.indexed)
+
+    def find_phrase(self, words, field='token_lower'):
+        if not words:
+            return []
+        strings = self.corpus.strings
+        word_ids = []
+        counts = []
+        for word in words:
+            word_id = strings.get(word)
+            count = self.value_count(field, word_id) if word_id is not None else 0
+            if not count:
+                return []
+            word_ids.append(word_id)
+            counts.append(count)
+
+        rarest = min(range(len(word_ids)), key=counts.__getitem__)
+        column = getattr(self.corpus, field)
+        last_offset = len(word_ids) - 1
+        matches = []
+        for position in self.value_positions(field, word_ids[rarest]):
+            start = position - rarest
+            if start < 0 or start + last_offset >= self.indexed:
+                continue
+            if any(column[start + offset] != word_id for offset, word_id in enumerate(word_ids)):
+                continue
+            if self.sentence_bounds(start)[1] <= start + last_offset:
+                continue
+            matches.append(start)
+        return matches
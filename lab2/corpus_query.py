@@ -0,0 +1,264 @@
+import fnmatch
+import heapq
+import re
+
+
+ATTRIBUTES = {'word': 'token_lower', 'token': 'token', 'lemma': 'lemma', 'tag': 'tag'}
+DEFAULT_ATTRIBUTE = 'word'
+MAX_REPEAT = 20
+KWIC_CONTEXT_TOKENS = 8
+KWIC_WIDTH = 50
+LEXEME_NAMES = {
+    'name': "имя атрибута",
+    'op': "'=' или '!='",
+    'string': "значение в кавычках",
+    'regex': "/регулярное выражение/",
+    'symbol': "'&' или ']'",
+}
+
+_LEXEME_RE = re.compile(r'''\s*(?:
+    (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<regex>/(?:[^/\\]|\\.)*/)
+  | (?P<repeat>\{\s*\d+\s*(?:,\s*\d*\s*)?\})
+  | (?P<op>!=|=)
+  | (?P<symbol>[\[\]&?])
+  | (?P<name>[^\s\[\]&?=!{}"/]+)
+)''', re.VERBOSE)
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def _lexemes(text):
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _LEXEME_RE.match(text, position)
+        if match is None or match.end() == position:
+            position = len(text) - len(text[position:].lstrip())
+            raise QuerySyntaxError(f"Неожиданный символ в позиции {position + 1}: '{text[position]}'.")
+        kind = match.lastgroup
+        yield kind, match.group(kind)
+        position = match.end()
+
+
+def _unquote(value):
+    return re.sub(r'\\(.)', r'\1', value[1:-1])
+
+
+def _repeat(value):
+    if value == '?':
+        return 0, 1
+    parts = value.strip('{} ').split(',')
+    low = int(parts[0])
+    high = int(parts[1]) if len(parts) > 1 and parts[1].strip() else (low if len(parts) == 1 else MAX_REPEAT)
+    if high < low or high > MAX_REPEAT:
+        raise QuerySyntaxError(f"Недопустимое число повторов {value}: допускается от 0 до {MAX_REPEAT}.")
+    return low, high
+
+
+def parse_query(text):
+    lexemes = list(_lexemes(text))
+    elements = []
+    index = 0
+
+    def expect(*kinds):
+        if index >= len(lexemes) or lexemes[index][0] not in kinds:
+            found = f"'{lexemes[index][1]}'" if index < len(lexemes) else "конец запроса"
+            raise QuerySyntaxError(f"Ошибка в запросе: ожидалось {' или '.join(LEXEME_NAMES[kind] for kind in kinds)}, найдено {found}.")
+        return lexemes[index]
+
+    while index < len(lexemes):
+        kind, value = lexemes[index]
+        conditions = []
+        if kind in ('string', 'name', 'regex'):
+            conditions.append((DEFAULT_ATTRIBUTE, value, False, kind))
+            index += 1
+        elif (kind, value) == ('symbol', '['):
+            index += 1
+            while lexemes[index:index + 1] != [('symbol', ']')]:
+                if conditions:
+                    expect('symbol')
+                    if lexemes[index][1] != '&':
+                        raise QuerySyntaxError(f"Ошибка в запросе: условия разделяются знаком '&', найдено '{lexemes[index][1]}'.")
+                    index += 1
+                attribute = expect('name')[1]
+                if attribute not in ATTRIBUTES:
+                    raise QuerySyntaxError(f"Неизвестный атрибут '{attribute}'. Допустимы: {', '.join(ATTRIBUTES)}.")
+                index += 1
+                negated = expect('op')[1] == '!='
+                index += 1
+                value_kind, value = expect('string', 'regex')
+                conditions.append((attribute, value, negated, value_kind))
+                index += 1
+                if index >= len(lexemes):
+                    raise QuerySyntaxError("Ошибка в запросе: не закрыта скобка ']'.")
+            index += 1
+        else:
+            raise QuerySyntaxError(f"Ошибка в запросе: неожиданное '{value}'.")
+
+        low = high = 1
+        if index < len(lexemes) and (lexemes[index][0] == 'repeat' or lexemes[index] == ('symbol', '?')):
+            low, high = _repeat(lexemes[index][1])
+            index += 1
+        elements.append((conditions, low, high))
+
+    if not elements:
+        raise QuerySyntaxError("Запрос пуст.")
+    return elements
+
+
+def _matcher(attribute, value, kind):
+    flags = re.IGNORECASE if attribute == 'word' else 0
+    if kind == 'regex':
+        try:
+            return re.compile(_unquote(value), flags).fullmatch
+        except re.error as e:
+            raise QuerySyntaxError(f"Ошибка в регулярном выражении {value}: {e}.")
+    value = _unquote(value) if kind == 'string' else value
+    if attribute == 'word':
+        value = value.lower()
+    if '*' in value or '?' in value:
+        return re.compile(fnmatch.translate(value), flags).match
+    return value
+
+
+class PatternQuery:
+
+    def __init__(self, corpus, text, index=None):
+        self.corpus = corpus
+        self.index = index
+        self.text = text
+        self.elements = [([self._bind(*condition) for condition in conditions], low, high)
+                         for conditions, low, high in parse_query(text)]
+        self.anchor, self.anchor_field, self.anchor_ids = self._choose_anchor()
+        self.columns = self._columns()
+
+    def _bind(self, attribute, value, negated, kind):
+        corpus = self.corpus
+        field = ATTRIBUTES[attribute]
+        vocabulary = corpus.tags if field == 'tag' else corpus.strings
+        matcher = _matcher(attribute, value, kind)
+        if isinstance(matcher, str):
+            value_id = vocabulary.get(matcher)
+            ids = frozenset() if value_id is None else frozenset([value_id])
+        else:
+            ids = frozenset(value_id for value_id, string in enumerate(vocabulary.strings) if matcher(string))
+
+        if field == 'token':
+            strings = corpus.strings
+            lowered = {strings.get(strings[value_id].lower()) for value_id in ids}
+            lowered.discard(None)
+            index_ids, index_field = frozenset(lowered), 'token_lower'
+        else:
+            index_ids, index_field = ids, field
+        return field, ids, negated, index_field, index_ids
+
+    def _columns(self):
+        fields = {condition[0] for conditions, low, high in self.elements for condition in conditions}
+        return {field: getattr(self.corpus, field) for field in fields}
+
+    def _estimate(self, field, ids, limit):
+        total = 0
+        for value_id in ids:
+            total += self.index.value_count(field, value_id)
+            if total >= limit:
+                break
+        return total
+
+    def _choose_anchor(self):
+        best = None
+        for offset, (conditions, low, high) in enumerate(self.elements):
+            if (low, high) != (1, 1):
+                continue
+            for field, ids, negated, index_field, index_ids in conditions:
+                if negated:
+                    continue
+                limit = best[0] if best is not None else len(self.corpus) + 1
+                count = self._estimate(index_field, index_ids, limit)
+                if count < limit:
+                    best = (count, offset, index_field, index_ids)
+        if best is None:
+            raise QuerySyntaxError("В запросе нет условия для поиска по индексу: нужна хотя бы одна позиция "
+                                   "без повторов с условием без отрицания.")
+        return best[1:]
+
+    def _anchor_positions(self):
+        postings = [self.index.value_positions(self.anchor_field, value_id) for value_id in self.anchor_ids]
+        if len(postings) == 1:
+            return postings[0]
+        return heapq.merge(*postings)
+
+    def _accepts(self, conditions, position):
+        columns = self.columns
+        for field, ids, negated, index_field, index_ids in conditions:
+            if (columns[field][position] in ids) == negated:
+                return False
+        return True
+
+    def _match_right(self, offset, position, limit):
+        if offset == len(self.elements):
+            return position
+        conditions, low, high = self.elements[offset]
+        count = 0
+        while count < low:
+            if position + count >= limit or not self._accepts(conditions, position + count):
+                return None
+            count += 1
+        while True:
+            end = self._match_right(offset + 1, position + count, limit)
+            if end is not None:
+                return end
+            if count >= high or position + count >= limit or not self._accepts(conditions, position + count):
+                return None
+            count += 1
+
+    def _match_left(self, offset, position, limit):
+        if offset < 0:
+            return position
+        conditions, low, high = self.elements[offset]
+        count = 0
+        while count < low:
+            if position - count - 1 < limit or not self._accepts(conditions, position - count - 1):
+                return None
+            count += 1
+        while True:
+            start = self._match_left(offset - 1, position - count, limit)
+            if start is not None:
+                return start
+            if count >= high or position - count - 1 < limit or not self._accepts(conditions, position - count - 1):
+                return None
+            count += 1
+
+    def _match(self, position, sentence_start, sentence_end):
+        end = self._match_right(self.anchor + 1, position + 1, sentence_end)
+        if end is None:
+            return None
+        start = self._match_left(self.anchor - 1, position, sentence_start)
+        if start is None:
+            return None
+        return start, end
+
+    def matches(self):
+        anchor_conditions = self.elements[self.anchor][0]
+        for position in self._anchor_positions():
+            if not self._accepts(anchor_conditions, position):
+                continue
+            match = self._match(position, *self.index.sentence_bounds(position))
+            if match is not None:
+                yield match
+
+
+def format_kwic_line(left_tokens, match_tokens, right_tokens, doc_name, sent_num, width=KWIC_WIDTH):
+    left, match, right = " ".join(left_tokens), " ".join(match_tokens), " ".join(right_tokens)
+    return f"{left[-width:]:>{width}}  [{match}]  {right[:width]:<{width}}  ({doc_name}, предл. {sent_num})"
+
+
+def format_kwic(corpus, start, end, context=KWIC_CONTEXT_TOKENS, width=KWIC_WIDTH):
+    doc_name = corpus.docs[corpus.doc[start]]
+    document = corpus.documents[doc_name]
+    return format_kwic_line(corpus.values('token', max(document['start'], start - context), start),
+                            corpus.values('token', start, end),
+                            corpus.values('token', end, min(document['end'], end + context)),
+                            doc_name, corpus.sent_num[start], width)
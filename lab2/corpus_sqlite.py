@@ -0,0 +1,483 @@
+import json
+import os
+import sqlite3
+import time
+from array import array
+from bisect import bisect_right
+from itertools import groupby, islice
+from operator import itemgetter
+
+from corpus_engine import CorpusEngine
+from corpus_query import KWIC_CONTEXT_TOKENS, PatternQuery, format_kwic_line
+from corpus_store import Vocabulary
+from kwic import SORT_CONTEXT_TOKENS, KwicResults, context_key, value_ranks
+from lemma_cache import DEFAULT_CACHE_PATH
+from text_pipeline import iter_records, iter_stream_tokens
+from text_stream import SentenceReader
+
+try:
+    from collocations import ngram_table, ngram_window
+except ImportError:
+    ngram_table = ngram_window = None
+
+
+DATABASE_EXTENSION = '.sqlite'
+INSERT_BATCH_ROWS = 50_000
+PATTERN_BATCH_ANCHORS = 1000
+CACHE_SIZE_KB = 64 * 1024
+FREQUENCY_COLUMNS = {'tokens': 'token_lower', 'lemmas': 'lemma', 'tags': 'tag'}
+DOCUMENT_COLUMNS = ('name', 'start', 'end', 'sentences', 'words', 'source', 'characters', 'added')
+UNSUPPORTED = "{} недоступен для корпуса в базе SQLite: загрузите корпус .scorpus в память."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strings (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, start INTEGER NOT NULL, "end" INTEGER NOT NULL,
+    sentences INTEGER NOT NULL, words INTEGER NOT NULL, source TEXT, characters INTEGER, added REAL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY, doc INTEGER NOT NULL, sent_num INTEGER NOT NULL, token_num INTEGER NOT NULL,
+    token INTEGER NOT NULL, token_lower INTEGER NOT NULL, lemma INTEGER NOT NULL, tag INTEGER NOT NULL,
+    is_word INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tokens_token_lower ON tokens (token_lower);
+CREATE INDEX IF NOT EXISTS tokens_lemma ON tokens (lemma);
+CREATE INDEX IF NOT EXISTS tokens_tag ON tokens (tag);
+CREATE TABLE IF NOT EXISTS frequencies (
+    kind TEXT NOT NULL, value INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (kind, value)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS sentences USING fts5(text, doc UNINDEXED, sent_num UNINDEXED, length UNINDEXED);
+"""
+
+
+def is_database(path):
+    return path.lower().endswith(DATABASE_EXTENSION)
+
+
+def fts_phrase(words):
+    return '"' + " ".join(word.replace('"', '""') for word in words) + '"'
+
+
+class SqliteCorpus:
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        self.connection.executescript(SCHEMA)
+        self.strings = Vocabulary(value for value, in self.connection.execute("SELECT value FROM strings ORDER BY id"))
+        self.tags = Vocabulary(value for value, in self.connection.execute("SELECT value FROM tags ORDER BY id"))
+        self.documents = {}
+        self.document_ids = {}
+        columns = ", ".join(f'"{column}"' for column in DOCUMENT_COLUMNS)
+        for row in self.connection.execute(f"SELECT id, {columns} FROM documents ORDER BY start"):
+            document = dict(zip(DOCUMENT_COLUMNS, row[1:]))
+            self.document_ids[document['name']] = row[0]
+            self.documents[document.pop('name')] = document
+        self.next_id = self.connection.execute("SELECT coalesce(max(id), -1) + 1 FROM tokens").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return sum(document['end'] - document['start'] for document in self.documents.values())
+
+    def word_count(self):
+        return sum(document['words'] for document in self.documents.values())
+
+    def has_document(self, doc_name):
+        return doc_name in self.documents
+
+    def document_names(self):
+        return list(self.documents)
+
+    def add_document(self, doc_name, records, source=None, characters=None):
+        def tokens():
+            for record in records:
+                if record['doc_name'] != doc_name:
+                    raise ValueError(f"Токен документа '{record['doc_name']}' передан в документ '{doc_name}'.")
+                yield (record['token'], record['token_lower'], record['tag'], record['lemma'],
+                       record['sent_num'], record['token_num'])
+        return self._insert_document(doc_name, tokens(), source, characters)
+
+    def add_batch(self, doc_name, batch, source=None, characters=None):
+        strings, tags = batch.strings.strings, batch.tags.strings
+        tokens = ((strings[token], strings[token_lower], tags[tag], strings[lemma], sent_num, token_num)
+                  for token, token_lower, tag, lemma, sent_num, token_num
+                  in zip(batch.token, batch.token_lower, batch.tag, batch.lemma, batch.sent_num, batch.token_num))
+        return self._insert_document(doc_name, tokens, source, characters)
+
+    def set_characters(self, doc_name, characters):
+        with self.connection:
+            self.connection.execute("UPDATE documents SET characters = ? WHERE id = ?",
+                                    (characters, self.document_ids[doc_name]))
+        self.documents[doc_name]['characters'] = characters
+
+    def _insert_document(self, doc_name, tokens, source=None, characters=None):
+        if doc_name in self.documents:
+            raise ValueError(f"Документ '{doc_name}' уже есть в корпусе.")
+        connection = self.connection
+        strings, tags = self.strings, self.tags
+        saved_strings, saved_tags = len(strings), len(tags)
+        new_strings, new_tags = [], []
+        inserted_strings = inserted_tags = 0
+        start = position = self.next_id
+        sentences = words = 0
+        sentence, sentence_start, sentence_num = [], start, None
+        sentence_insert = "INSERT INTO sentences (rowid, text, doc, sent_num, length) VALUES (?, ?, ?, ?, ?)"
+
+        def intern(vocabulary, value, new_values):
+            value_id = vocabulary.get(value)
+            if value_id is None:
+                value_id = vocabulary.intern(value)
+                new_values.append((value_id, value))
+            return value_id
+
+        try:
+            with connection:
+                added = time.time()
+                doc_id = connection.execute(
+                    'INSERT INTO documents (name, start, "end", sentences, words, source, characters, added) '
+                    'VALUES (?, ?, ?, 0, 0, ?, ?, ?)', (doc_name, start, start, source, characters, added)
+                ).lastrowid
+
+                while True:
+                    chunk = list(islice(tokens, INSERT_BATCH_ROWS))
+                    if not chunk:
+                        break
+                    rows, sentence_rows = [], []
+                    for token, token_lower, tag, lemma, sent_num, token_num in chunk:
+                        if sent_num != sentence_num or not sentence:
+                            if sentence:
+                                sentence_rows.append((sentence_start, " ".join(sentence), doc_id, sentence_num, len(sentence)))
+                            sentence, sentence_start, sentence_num = [], position, sent_num
+                            sentences += 1
+                        sentence.append(token_lower)
+                        is_word = token.isalpha()
+                        words += is_word
+                        rows.append((position, doc_id, sent_num, token_num, intern(strings, token, new_strings),
+                                     intern(strings, token_lower, new_strings), intern(strings, lemma, new_strings),
+                                     intern(tags, tag, new_tags), is_word))
+                        position += 1
+
+                    connection.executemany("INSERT INTO strings (id, value) VALUES (?, ?)", new_strings[inserted_strings:])
+                    connection.executemany("INSERT INTO tags (id, value) VALUES (?, ?)", new_tags[inserted_tags:])
+                    inserted_strings, inserted_tags = len(new_strings), len(new_tags)
+                    connection.executemany("INSERT INTO tokens VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    connection.executemany(sentence_insert, sentence_rows)
+
+                if sentence:
+                    connection.execute(sentence_insert, (sentence_start, " ".join(sentence), doc_id, sentence_num, len(sentence)))
+                for kind, column in FREQUENCY_COLUMNS.items():
+                    connection.execute(
+                        f"INSERT INTO frequencies (kind, value, count) SELECT ?, {column}, count(*) FROM tokens "
+                        f"WHERE id >= ? AND id < ? AND is_word GROUP BY {column} "
+                        f"ON CONFLICT (kind, value) DO UPDATE SET count = count + excluded.count", (kind, start, position))
+                connection.execute('UPDATE documents SET "end" = ?, sentences = ?, words = ? WHERE id = ?',
+                                   (position, sentences, words, doc_id))
+        except BaseException:
+            strings.truncate(saved_strings)
+            tags.truncate(saved_tags)
+            raise
+
+        self.next_id = position
+        self.document_ids[doc_name] = doc_id
+        document = self.documents[doc_name] = {
+            'start': start,
+            'end': position,
+            'sentences': sentences,
+            'words': words,
+            'source': source,
+            'characters': characters,
+            'added': added,
+        }
+        return document
+
+    def remove_document(self, doc_name):
+        document = self.documents[doc_name]
+        start, end = document['start'], document['end']
+        connection = self.connection
+        with connection:
+            for kind, column in FREQUENCY_COLUMNS.items():
+                connection.execute(
+                    f"UPDATE frequencies SET count = frequencies.count - removed.count FROM "
+                    f"(SELECT {column} AS value, count(*) AS count FROM tokens "
+                    f"WHERE id >= ? AND id < ? AND is_word GROUP BY {column}) AS removed "
+                    f"WHERE frequencies.kind = ? AND frequencies.value = removed.value", (start, end, kind))
+            connection.execute("DELETE FROM frequencies WHERE count <= 0")
+            connection.execute("DELETE FROM tokens WHERE id >= ? AND id < ?", (start, end))
+            connection.execute("DELETE FROM sentences WHERE rowid >= ? AND rowid < ?", (start, end))
+            connection.execute("DELETE FROM documents WHERE id = ?", (self.document_ids[doc_name],))
+        del self.documents[doc_name]
+        del self.document_ids[doc_name]
+        return start, end
+
+    def find_phrase(self, words):
+        word_ids = [self.strings.get(word) for word in words]
+        if None in word_ids:
+            return
+        n_query = len(word_ids)
+        rows = self.connection.execute(
+            "SELECT sentences.rowid, tokens.id, tokens.token_lower FROM sentences JOIN tokens "
+            "ON tokens.id >= sentences.rowid AND tokens.id < sentences.rowid + sentences.length "
+            "WHERE sentences MATCH ? ORDER BY sentences.rowid", (fts_phrase(words),))
+        for start, sentence in groupby(rows, key=itemgetter(0)):
+            lowered = [value_id for _, _, value_id in sorted(sentence)]
+            for offset in range(len(lowered) - n_query + 1):
+                if lowered[offset:offset + n_query] == word_ids:
+                    yield start + offset
+
+    def ngram_counts(self, field, n, window, start, end):
+        def chain(last, columns):
+            joins = " ".join(f"JOIN tokens AS t{offset} ON t{offset}.id = t0.id + {offset} AND t{offset}.is_word"
+                             for offset in range(1, last + 1))
+            return (f"SELECT {columns} FROM tokens AS t0 {joins} WHERE t0.id >= ? AND t0.id < ? AND t0.is_word "
+                    f"AND t{last}.doc = t0.doc AND t{last}.sent_num = t0.sent_num")
+
+        if n == 2:
+            parts = [chain(offset, f"t0.{field} AS value0, t{offset}.{field} AS value1") for offset in range(1, window)]
+        else:
+            parts = [chain(n - 1, ", ".join(f"t{offset}.{field} AS value{offset}" for offset in range(n)))]
+        columns = ", ".join(f"value{position}" for position in range(n))
+        return self.connection.execute(f"SELECT {columns}, count(*) FROM ({' UNION ALL '.join(parts)}) GROUP BY {columns}",
+                                       (start, end) * len(parts)).fetchall()
+
+    def word_count_of(self, word):
+        word_id = self.strings.get(word)
+        if word_id is None:
+            return 0
+        return self.connection.execute("SELECT count(*) FROM tokens WHERE token_lower = ?", (word_id,)).fetchone()[0]
+
+    def iter_word_occurrences(self, word):
+        word_id = self.strings.get(word)
+        if word_id is None:
+            return
+        yield from self.connection.execute(
+            "SELECT documents.name, tokens.sent_num, tokens.token_num, token.value, tags.value, lemma.value "
+            "FROM tokens JOIN documents ON documents.id = tokens.doc "
+            "JOIN strings AS token ON token.id = tokens.token JOIN strings AS lemma ON lemma.id = tokens.lemma "
+            "JOIN tags ON tags.id = tokens.tag WHERE tokens.token_lower = ? ORDER BY tokens.id", (word_id,))
+
+
+class SqlitePatternQuery(PatternQuery):
+
+    def _columns(self):
+        return {}
+
+    def _values_of(self, field, ids):
+        if len(ids) == 1:
+            return f"{field} = ?", (next(iter(ids)),)
+        return f"{field} IN (SELECT value FROM json_each(?))", (json.dumps(sorted(ids)),)
+
+    def _estimate(self, field, ids, limit):
+        condition, parameters = self._values_of(field, ids)
+        return self.corpus.connection.execute(
+            f"SELECT count(*) FROM (SELECT 1 FROM tokens WHERE {condition} LIMIT ?)", (*parameters, limit)).fetchone()[0]
+
+    def _anchor_positions(self):
+        if not self.anchor_ids:
+            return iter(())
+        condition, parameters = self._values_of(self.anchor_field, self.anchor_ids)
+        return (position for position, in self.corpus.connection.execute(
+            f"SELECT id FROM tokens WHERE {condition} ORDER BY id", parameters))
+
+    def matches(self):
+        fields = sorted({condition[0] for conditions, low, high in self.elements for condition in conditions})
+        before = sum(high for conditions, low, high in self.elements[:self.anchor])
+        after = sum(high for conditions, low, high in self.elements[self.anchor + 1:])
+        query = (f"SELECT anchors.value, tokens.id, tokens.doc, tokens.sent_num, "
+                 f"{', '.join(f'tokens.{field}' for field in fields)} FROM json_each(?) AS anchors "
+                 f"JOIN tokens ON tokens.id >= anchors.value - ? AND tokens.id <= anchors.value + ? "
+                 f"ORDER BY anchors.key, tokens.id")
+        positions = self._anchor_positions()
+        while True:
+            anchors = list(islice(positions, PATTERN_BATCH_ANCHORS))
+            if not anchors:
+                return
+            rows = self.corpus.connection.execute(query, (json.dumps(anchors), before, after)).fetchall()
+            for position, window in groupby(rows, key=itemgetter(0)):
+                window = list(window)
+                sentences = {row[1]: row[2:4] for row in window}
+                self.columns = {field: {row[1]: row[4 + offset] for row in window}
+                                for offset, field in enumerate(fields)}
+                if not self._accepts(self.elements[self.anchor][0], position):
+                    continue
+                sentence = sentences[position]
+                sentence_start, sentence_end = position, position + 1
+                while sentences.get(sentence_start - 1) == sentence:
+                    sentence_start -= 1
+                while sentences.get(sentence_end) == sentence:
+                    sentence_end += 1
+                match = self._match(position, sentence_start, sentence_end)
+                if match is not None:
+                    yield match
+
+
+class SqliteStatistics:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def total(self, kind):
+        return self.corpus.connection.execute(
+            "SELECT coalesce(sum(count), 0) FROM frequencies WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def unique(self, kind):
+        return self.corpus.connection.execute("SELECT count(*) FROM frequencies WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def iter_ranked(self, kind):
+        vocabulary = 'tags' if kind == 'tags' else 'strings'
+        yield from self.corpus.connection.execute(
+            f"SELECT {vocabulary}.value, frequencies.count FROM frequencies "
+            f"JOIN {vocabulary} ON {vocabulary}.id = frequencies.value "
+            f"WHERE frequencies.kind = ? ORDER BY frequencies.count DESC, {vocabulary}.value", (kind,))
+
+    def top(self, kind, k):
+        return list(islice(self.iter_ranked(kind), k))
+
+
+class SqliteContexts:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.string_ranks = array('I')
+
+    def _string_ranks(self):
+        strings = self.corpus.strings.strings
+        if len(self.string_ranks) != len(strings):
+            self.string_ranks = value_ranks(strings)
+        return self.string_ranks
+
+    def _document_of(self):
+        documents = sorted((document['start'], document['end'], doc_name)
+                           for doc_name, document in self.corpus.documents.items())
+        starts = [start for start, _, _ in documents]
+        return lambda position: documents[bisect_right(starts, position) - 1]
+
+    def _values(self, start, end):
+        return [value for value, in self.corpus.connection.execute(
+            "SELECT token_lower FROM tokens WHERE id >= ? AND id < ? ORDER BY id", (start, end))]
+
+    def sort_key(self, sort):
+        positions = self.corpus.next_id + 1
+        if sort == 'position':
+            return lambda start, end: start
+        document_of = self._document_of()
+        if sort == 'document':
+            ranks = {doc_name: rank for rank, doc_name in enumerate(sorted(self.corpus.documents))}
+            return lambda start, end: ranks[document_of(start)[2]] * positions + start
+
+        ranks = self._string_ranks()
+
+        def key(start, end):
+            doc_start, doc_end, _ = document_of(start)
+            if sort == 'left':
+                values = self._values(max(doc_start, start - SORT_CONTEXT_TOKENS), start)[::-1]
+            else:
+                values = self._values(end, min(doc_end, end + SORT_CONTEXT_TOKENS))
+            return context_key(ranks, values) * positions + start
+        return key
+
+    def format_page(self, hits):
+        document_of = self._document_of()
+        lines = []
+        for start, end in hits:
+            doc_start, doc_end, doc_name = document_of(start)
+            low = max(doc_start, start - KWIC_CONTEXT_TOKENS)
+            rows = self.corpus.connection.execute(
+                "SELECT tokens.sent_num, strings.value FROM tokens JOIN strings ON strings.id = tokens.token "
+                "WHERE tokens.id >= ? AND tokens.id < ? ORDER BY tokens.id",
+                (low, min(doc_end, end + KWIC_CONTEXT_TOKENS))).fetchall()
+            tokens = [token for _, token in rows]
+            lines.append(format_kwic_line(tokens[:start - low], tokens[start - low:end - low], tokens[end - low:],
+                                          doc_name, rows[start - low][0]))
+        return lines
+
+
+class SqliteCorpusEngine(CorpusEngine):
+
+    database = True
+
+    def __init__(self, path, lemma_cache_path=DEFAULT_CACHE_PATH):
+        self.path = path
+        super().__init__(lemma_cache_path)
+
+    def _open(self):
+        self.corpus = SqliteCorpus(self.path)
+        self.stats = SqliteStatistics(self.corpus)
+        self.contexts = SqliteContexts(self.corpus)
+        self.index = None
+        self.terms = None
+        self.corpus_file = None
+
+    def _update_index(self, added=()):
+        pass
+
+    def close(self):
+        self.corpus.close()
+
+    def add_file(self, filepath):
+        doc_name = os.path.basename(filepath)
+        self._check_new_document(doc_name, f"Файл '{doc_name}' уже есть в корпусе.")
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = SentenceReader(f)
+            self.corpus.add_document(doc_name, iter_records(iter_stream_tokens(reader), doc_name), source=filepath)
+        self.corpus.set_characters(doc_name, reader.characters)
+        return doc_name
+
+    def remove_document(self, doc_name):
+        self.corpus.remove_document(doc_name)
+
+    def concordance(self, query_tokens_lower, sort='position', limit=None):
+        n_query = len(query_tokens_lower)
+        hits = ((start, start + n_query) for start in self.corpus.find_phrase(query_tokens_lower))
+        return KwicResults(self.contexts, hits, sort, limit)
+
+    def iter_word_report(self, word):
+        count = self.corpus.word_count_of(word.lower())
+        if not count:
+            yield f"Слово '{word}' не найдено в корпусе. Введите одно слово для анализа."
+            return
+
+        yield f"=== Информация о слове '{word}' ==="
+        yield ""
+        yield f"Найдено вхождений: {count}"
+        yield ""
+        yield "--- Местоположения ---"
+        for doc_name, sent_num, token_num, token, tag, lemma in self.corpus.iter_word_occurrences(word.lower()):
+            yield (f"- Документ: {doc_name}, "
+                   f"Предложение: {sent_num}, "
+                   f"Слово: {token_num}")
+            yield f"  Токен: '{token}', Тег: {tag}, Лемма: {lemma}"
+            yield ""
+
+    def pattern_query(self, query_text):
+        return SqlitePatternQuery(self.corpus, query_text)
+
+    def ngram_statistics(self, n=2, field='token_lower', window=None, min_freq=1, document=None):
+        self._check_ngram_request(document)
+        window = ngram_window(n, field, window)
+        if document is None:
+            start, end = 0, self.corpus.next_id
+        else:
+            start, end = self.corpus.documents[document]['start'], self.corpus.documents[document]['end']
+        return ngram_table(self.corpus, field, n, window, self.corpus.ngram_counts(field, n, window, start, end),
+                           max(min_freq, 1))
+
+    def document_analysis(self, *args, **kwargs):
+        raise ValueError(UNSUPPORTED.format("Анализ документов"))
+
+    def has_unsaved_changes(self):
+        return False
+
+    def save(self):
+        return 0, 0
+
+    def save_as(self, filepath):
+        raise ValueError(f"Корпус хранится в базе '{self.corpus.path}', изменения записываются в нее сразу.")
+
+    def load(self, filepath):
+        raise ValueError("Корпус в базе SQLite не загружается в память.")
@@ -0,0 +1,99 @@
+from collections import Counter
+from itertools import islice
+
+
+class RankedCounter:
+
+    def __init__(self):
+        self.counts = {}
+        self.buckets = {}
+        self.total = 0
+
+    def update(self, deltas):
+        counts, buckets = self.counts, self.buckets
+        for key, delta in deltas.items():
+            if not delta:
+                continue
+            old = counts.get(key, 0)
+            new = old + delta
+            if old:
+                bucket = buckets[old]
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[old]
+            if new > 0:
+                counts[key] = new
+                bucket = buckets.get(new)
+                if bucket is None:
+                    bucket = buckets[new] = set()
+                bucket.add(key)
+            else:
+                counts.pop(key, None)
+            self.total += new - old if new > 0 else -old
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, key):
+        return self.counts.get(key, 0)
+
+    def iter_ranked(self, sort_key=None):
+        for count in sorted(self.buckets, reverse=True):
+            for key in sorted(self.buckets[count], key=sort_key):
+                yield key, count
+
+    def top(self, k, sort_key=None):
+        return list(islice(self.iter_ranked(sort_key), k))
+
+
+class CorpusStatistics:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.counters = {'tokens': RankedCounter(), 'lemmas': RankedCounter(), 'tags': RankedCounter()}
+        self.counted = 0
+
+    def _vocabulary(self, kind):
+        return self.corpus.tags if kind == 'tags' else self.corpus.strings
+
+    def _range_counts(self, start, end):
+        corpus = self.corpus
+        is_word = corpus.is_word
+        words = [position for position, token in enumerate(corpus.token[start:end], start) if is_word[token]]
+        return {
+            'tokens': Counter(corpus.token_lower[position] for position in words),
+            'lemmas': Counter(corpus.lemma[position] for position in words),
+            'tags': Counter(corpus.tag[position] for position in words),
+        }
+
+    def update(self):
+        total = len(self.corpus)
+        if self.counted >= total:
+            return
+        for kind, counts in self._range_counts(self.counted, total).items():
+            self.counters[kind].update(counts)
+        self.counted = total
+
+    def remove_range(self, start, end):
+        if start >= self.counted:
+            return
+        for kind, counts in self._range_counts(start, end).items():
+            self.counters[kind].update({key: -count for key, count in counts.items()})
+        self.counted -= end - start
+
+    def total(self, kind):
+        self.update()
+        return self.counters[kind].total
+
+    def unique(self, kind):
+        self.update()
+        return len(self.counters[kind])
+
+    def iter_ranked(self, kind):
+        self.update()
+        strings = self._vocabulary(kind).strings
+        for key, count in self.counters[kind].iter_ranked(sort_key=strings.__getitem__):
+            yield strings[key], count
+
+    def top(self, kind, k):
+        return list(islice(self.iter_ranked(kind), k))
@@ -0,0 +1,267 @@
+import time
+from array import array
+
+
+STRING_FIELDS = ('token', 'token_lower', 'lemma')
+
+
+class Vocabulary:
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self.ids = {}
+        for value in strings:
+            self.intern(value)
+
+    def intern(self, value):
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def get(self, value):
+        return self.ids.get(value)
+
+    def truncate(self, size):
+        for value in self.strings[size:]:
+            del self.ids[value]
+        del self.strings[size:]
+
+    def __getitem__(self, index):
+        return self.strings[index]
+
+    def __contains__(self, value):
+        return value in self.ids
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getstate__(self):
+        return self.strings
+
+    def __setstate__(self, strings):
+        self.strings = strings
+        self.ids = {value: index for index, value in enumerate(strings)}
+
+
+class TokenBatch:
+
+    def __init__(self):
+        self.strings = Vocabulary()
+        self.tags = Vocabulary()
+        self.token = array('I')
+        self.token_lower = array('I')
+        self.lemma = array('I')
+        self.tag = array('H')
+        self.sent_num = array('I')
+        self.token_num = array('I')
+
+    def append(self, token, token_lower, tag, lemma, sent_num, token_num):
+        strings = self.strings
+        self.token.append(strings.intern(token))
+        self.token_lower.append(strings.intern(token_lower))
+        self.lemma.append(strings.intern(lemma))
+        self.tag.append(self.tags.intern(tag))
+        self.sent_num.append(sent_num)
+        self.token_num.append(token_num)
+
+    def __len__(self):
+        return len(self.token)
+
+
+class ColumnarCorpus:
+
+    def __init__(self):
+        self.strings = Vocabulary()
+        self.is_word = bytearray()
+        self.tags = Vocabulary()
+        self.docs = Vocabulary()
+        self.token = array('I')
+        self.token_lower = array('I')
+        self.lemma = array('I')
+        self.tag = array('H')
+        self.doc = array('I')
+        self.sent_num = array('I')
+        self.token_num = array('I')
+        self.documents = {}
+        self._current_document = None
+        self._column_loaders = {}
+
+    def __getattr__(self, name):
+        loaders = self.__dict__.get('_column_loaders')
+        if not loaders or name not in loaders:
+            raise AttributeError(name)
+        column = loaders.pop(name)()
+        setattr(self, name, column)
+        return column
+
+    def defer_column(self, name, loader):
+        self.__dict__.pop(name, None)
+        self._column_loaders[name] = loader
+
+    def materialize(self):
+        self._columns()
+
+    @classmethod
+    def from_records(cls, records):
+        corpus = cls()
+        corpus.extend(records)
+        return corpus
+
+    def _intern_string(self, value):
+        index = self.strings.intern(value)
+        if index == len(self.is_word):
+            self.is_word.append(value.isalpha())
+        return index
+
+    def _columns(self):
+        return (self.token, self.token_lower, self.lemma, self.tag, self.doc, self.sent_num, self.token_num)
+
+    def _register_document(self, doc_name, source=None, characters=None):
+        if doc_name in self.documents:
+            raise ValueError(f"Документ '{doc_name}' уже есть в корпусе.")
+        position = len(self)
+        document = self.documents[doc_name] = {
+            'start': position,
+            'end': position,
+            'sentences': 0,
+            'words': 0,
+            'source': source,
+            'characters': characters,
+            'added': time.time(),
+        }
+        self._current_document = doc_name
+        return document
+
+    def append(self, record):
+        doc_name = record['doc_name']
+        if doc_name != self._current_document:
+            self._register_document(doc_name)
+        document = self.documents[doc_name]
+        if document['end'] == document['start'] or record['sent_num'] != self.sent_num[-1]:
+            document['sentences'] += 1
+        document['end'] += 1
+
+        self.token.append(self._intern_string(record['token']))
+        document['words'] += self.is_word[self.token[-1]]
+        self.token_lower.append(self._intern_string(record['token_lower']))
+        self.lemma.append(self._intern_string(record['lemma']))
+        self.tag.append(self.tags.intern(record['tag']))
+        self.doc.append(self.docs.intern(record['doc_name']))
+        self.sent_num.append(record['sent_num'])
+        self.token_num.append(record['token_num'])
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def add_document(self, doc_name, records, source=None, characters=None):
+        self._register_document(doc_name, source, characters)
+        for record in records:
+            if record['doc_name'] != doc_name:
+                raise ValueError(f"Токен документа '{record['doc_name']}' передан в документ '{doc_name}'.")
+            self.append(record)
+        return self.documents[doc_name]
+
+    def add_batch(self, doc_name, batch, source=None, characters=None):
+        document = self._register_document(doc_name, source, characters)
+        string_ids = [self._intern_string(value) for value in batch.strings.strings]
+        tag_ids = [self.tags.intern(value) for value in batch.tags.strings]
+        doc_id = self.docs.intern(doc_name)
+
+        self.token.extend(string_ids[value] for value in batch.token)
+        self.token_lower.extend(string_ids[value] for value in batch.token_lower)
+        self.lemma.extend(string_ids[value] for value in batch.lemma)
+        self.tag.extend(tag_ids[value] for value in batch.tag)
+        self.doc.extend(array('I', [doc_id]) * len(batch))
+        self.sent_num.extend(batch.sent_num)
+        self.token_num.extend(batch.token_num)
+
+        is_word = self.is_word
+        document['end'] = len(self.token)
+        document['words'] = sum(is_word[string_ids[value]] for value in batch.token)
+        document['sentences'] = len(set(batch.sent_num))
+        return document
+
+    def remove_document(self, doc_name):
+        columns = self._columns()
+        document = self.documents.pop(doc_name)
+        start, end = document['start'], document['end']
+        removed = end - start
+        for column in columns:
+            del column[start:end]
+        for other in self.documents.values():
+            if other['start'] >= end:
+                other['start'] -= removed
+                other['end'] -= removed
+        if self._current_document == doc_name:
+            self._current_document = next(reversed(self.documents), None)
+        return start, end
+
+    def word_count(self):
+        return sum(document['words'] for document in self.documents.values())
+
+    def __len__(self):
+        if not self.documents:
+            return 0
+        return self.documents[next(reversed(self.documents))]['end']
+
+    def record(self, position):
+        strings = self.strings
+        return {
+            'token': strings[self.token[position]],
+            'token_lower': strings[self.token_lower[position]],
+            'tag': self.tags[self.tag[position]],
+            'lemma': strings[self.lemma[position]],
+            'doc_name': self.docs[self.doc[position]],
+            'sent_num': self.sent_num[position],
+            'token_num': self.token_num[position],
+        }
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.record(position) for position in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return self.record(item)
+
+    def __iter__(self):
+        return (self.record(position) for position in range(len(self)))
+
+    def has_document(self, doc_name):
+        return doc_name in self.documents
+
+    def document_names(self):
+        return list(self.documents)
+
+    def _column(self, key):
+        if key == 'tag':
+            return self.tag, self.tags
+        if key == 'doc_name':
+            return self.doc, self.docs
+        if key in STRING_FIELDS:
+            return getattr(self, key), self.strings
+        raise KeyError(key)
+
+    def attribute_values(self, key, words_only=True):
+        column, vocabulary = self._column(key)
+        strings = vocabulary.strings
+        if not words_only:
+            return [strings[value] for value in column]
+        is_word = self.is_word
+        return [strings[value] for value, token in zip(column, self.token) if is_word[token]]
+
+    def values(self, key, start, stop):
+        column, vocabulary = self._column(key)
+        strings = vocabulary.strings
+        return [strings[value] for value in column[start:stop]]
+
+    def positions(self, key, value):
+        column, vocabulary = self._column(key)
+        value_id = vocabulary.get(value)
+        if value_id is None:
+            return []
+        return [position for position, current in enumerate(column) if current == value_id]
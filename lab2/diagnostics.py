@@ -0,0 +1,249 @@
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from array import array
+from contextlib import contextmanager
+
+
+PIPELINE_STAGES = {
+    'sentences': ("Разбиение на предложения", "предл."),
+    'tokenize': ("Токенизация", "ток."),
+    'tag': ("Разметка частей речи", "ток."),
+    'lemmatize': ("Лемматизация", "ток."),
+}
+MEMORY_SOURCES = {
+    'corpus_store.py': "Колонки и словари корпуса",
+    'corpus_format.py': "Колонки и индексы из файла .scorpus",
+    'corpus_index.py': "Инвертированный индекс",
+    'corpus_stats.py': "Частотная статистика",
+    'lemma_cache.py': "Кэш лемм",
+    'document_terms.py': "Матрица документ-термин",
+    'kwic.py': "Результаты конкорданса (KWIC)",
+    'collocations.py': "N-граммы",
+    'corpus_query.py': "Поиск по шаблону",
+    'corpus_sqlite.py': "Словари базы SQLite",
+    'result_view.py': "Окно результатов",
+}
+OTHER_MEMORY = "Прочее (библиотеки, интерпретатор)"
+TRACE_FRAMES = 32
+
+
+class Timings:
+
+    def __init__(self):
+        self.entries = {}
+
+    def _entry(self, name):
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.entries[name] = {'calls': 0, 'seconds': 0.0, 'items': 0, 'last': 0.0, 'max': 0.0}
+        return entry
+
+    def add(self, name, seconds, items=0, calls=1):
+        entry = self._entry(name)
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        entry['items'] += items
+        entry['last'] = seconds
+        entry['max'] = max(entry['max'], seconds)
+
+    @contextmanager
+    def measure(self, name, items=0):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started, items)
+
+    def merge(self, entries):
+        for name, other in entries.items():
+            entry = self._entry(name)
+            for key in ('calls', 'seconds', 'items'):
+                entry[key] += other[key]
+            entry['last'] = other['last']
+            entry['max'] = max(entry['max'], other['max'])
+
+    def drain(self):
+        entries, self.entries = self.entries, {}
+        return entries
+
+    def reset(self):
+        self.entries = {}
+
+    def as_dict(self):
+        return {name: dict(entry) for name, entry in self.entries.items()}
+
+
+pipeline_timings = Timings()
+action_timings = Timings()
+
+
+def timed_lines(timings, name, make_lines):
+    seconds = 0.0
+    count = 0
+    try:
+        started = time.perf_counter()
+        try:
+            lines = iter(make_lines())
+        finally:
+            seconds += time.perf_counter() - started
+        while True:
+            started = time.perf_counter()
+            try:
+                line = next(lines, None)
+            finally:
+                seconds += time.perf_counter() - started
+            if line is None:
+                return
+            count += 1
+            yield line
+    finally:
+        timings.add(name, seconds, count)
+
+
+def set_memory_tracing(enabled):
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_by_structure():
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    structures = {}
+    for stat in tracemalloc.take_snapshot().statistics('traceback'):
+        label = next((MEMORY_SOURCES[name] for name in (os.path.basename(frame.filename) for frame in reversed(stat.traceback))
+                      if name in MEMORY_SOURCES), OTHER_MEMORY)
+        entry = structures.setdefault(label, {'bytes': 0, 'blocks': 0})
+        entry['bytes'] += stat.size
+        entry['blocks'] += stat.count
+    return {'current': current, 'peak': peak, 'structures': structures}
+
+
+def deep_size(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+
+def _vocabulary_parts(vocabulary):
+    return [vocabulary.strings, vocabulary.ids]
+
+
+def structure_parts(engine):
+    corpus = engine.corpus
+    loaded = vars(corpus)
+    parts = [
+        ("Колонки корпуса", [value for value in loaded.values() if isinstance(value, (array, bytearray))]),
+        ("Словарь строк", _vocabulary_parts(corpus.strings)),
+        ("Словари тегов и документов", [*_vocabulary_parts(corpus.tags),
+                                        *(_vocabulary_parts(corpus.docs) if 'docs' in loaded else [])]),
+        ("Реестр документов", [corpus.documents, loaded.get('document_ids', {})]),
+    ]
+    if engine.index is not None:
+        parts.append(("Инвертированный индекс", [engine.index.postings, engine.index.sentence_starts]))
+    counters = getattr(engine.stats, 'counters', {})
+    parts.append(("Частотная статистика", [part for counter in counters.values()
+                                           for part in (counter.counts, counter.buckets)]))
+    parts.append(("Кэш лемм", [engine.lemma_cache.entries, engine.lemma_cache.new_entries]))
+    if engine.terms is not None:
+        parts.append(("Матрица документ-термин", [
+            part for matrix in engine.terms.matrices.values()
+            for part in (matrix.indptr, matrix.indices, matrix.data, matrix.doc_names, matrix.rows, matrix._arrays,
+                         matrix._weights)]))
+    parts.append(("Ключи сортировки KWIC", [engine.contexts.string_ranks]))
+    return parts
+
+
+def structure_sizes(engine):
+    seen = set()
+    return {label: sum(deep_size(value, seen) for value in values) for label, values in structure_parts(engine)}
+
+
+def collect_diagnostics(engine):
+    corpus = engine.corpus
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'corpus': {
+            'backend': 'sqlite' if engine.database else 'memory',
+            'documents': len(corpus.documents),
+            'tokens': len(corpus),
+            'strings': len(corpus.strings),
+        },
+        'pipeline': pipeline_timings.as_dict(),
+        'actions': action_timings.as_dict(),
+        'structures': structure_sizes(engine),
+        'memory': memory_by_structure(),
+    }
+
+
+def export_diagnostics(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def iter_diagnostics_report(data):
+    corpus = data['corpus']
+    yield f"=== Диагностика ({data['created']}) ==="
+    yield (f"Корпус: документов {corpus['documents']}, токенов {corpus['tokens']}, строк в словаре {corpus['strings']}"
+           f"{', база SQLite' if corpus['backend'] == 'sqlite' else ''}")
+
+    yield ""
+    yield "--- Этапы обработки текста ---"
+    pipeline = data['pipeline']
+    if not pipeline:
+        yield "Тексты еще не обрабатывались."
+    else:
+        total = sum(entry['seconds'] for entry in pipeline.values()) or 1.0
+        yield f"{'Этап':<28} {'Вызовов':>9} {'Время, с':>10} {'Обработано':>17} {'мкс/ед.':>9} {'Доля':>6}"
+        for stage, (label, unit) in PIPELINE_STAGES.items():
+            entry = pipeline.get(stage)
+            if entry is None:
+                continue
+            per_item = entry['seconds'] / entry['items'] * 1e6 if entry['items'] else 0.0
+            yield (f"{label:<28} {entry['calls']:>9} {entry['seconds']:>10.2f} {entry['items']:>10} {unit:<6} "
+                   f"{per_item:>9.1f} {entry['seconds'] / total:>6.0%}")
+
+    yield ""
+    yield "--- Действия ---"
+    actions = data['actions']
+    if not actions:
+        yield "Замеров еще нет."
+    else:
+        yield f"{'Действие':<40} {'Вызовов':>8} {'Всего, с':>9} {'Среднее, с':>11} {'Последнее, с':>13} {'Макс., с':>9}"
+        for name, entry in sorted(actions.items(), key=lambda item: -item[1]['seconds']):
+            yield (f"{name:<40} {entry['calls']:>8} {entry['seconds']:>9.2f} {entry['seconds'] / entry['calls']:>11.3f} "
+                   f"{entry['last']:>13.3f} {entry['max']:>9.3f}")
+
+    yield ""
+    yield "--- Структуры данных ---"
+    yield "Размер структур в памяти процесса (sys.getsizeof вместе с вложенными строками и списками)."
+    yield "Колонки, еще не прочитанные из файла .scorpus, не учитываются."
+    yield f"{'Структура':<40} {'МБ':>10}"
+    for label, size in sorted(data['structures'].items(), key=lambda item: -item[1]):
+        yield f"{label:<40} {size / 2 ** 20:>10.2f}"
+
+    yield ""
+    yield "--- Память (tracemalloc) ---"
+    memory = data['memory']
+    if memory is None:
+        yield "Отслеживание памяти (tracemalloc) выключено."
+        return
+    yield f"Отслеживается: {memory['current'] / 2 ** 20:.1f} МБ, пик {memory['peak'] / 2 ** 20:.1f} МБ"
+    yield ("Учитываются только объекты, созданные после включения отслеживания; каждый блок относится "
+           "к ближайшему модулю программы в стеке вызовов, где он выделен.")
+    yield f"{'Структура':<40} {'МБ':>10} {'Блоков':>10}"
+    for label, entry in sorted(memory['structures'].items(), key=lambda item: -item[1]['bytes']):
+        yield f"{label:<40} {entry['bytes'] / 2 ** 20:>10.2f} {entry['blocks']:>10}"
@@ -0,0 +1,176 @@
+from array import array
+
+import numpy as np
+
+
+FIELDS = ('lemma', 'token_lower')
+KEYNESS_MIN_LOG_LIKELIHOOD = 3.84
+
+
+def _top(scores, limit):
+    limit = min(limit, len(scores))
+    if limit <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class DocumentTermMatrix:
+
+    def __init__(self, corpus, field):
+        self.corpus = corpus
+        self.field = field
+        self.doc_names = []
+        self.rows = {}
+        self.indptr = array('q', [0])
+        self.indices = array('I')
+        self.data = array('I')
+        self.pending = []
+        self._arrays = None
+        self._weights = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, doc_names):
+        self.pending.extend(doc_names)
+
+    def update(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        corpus = self.corpus
+        is_word = np.frombuffer(bytes(corpus.is_word), dtype=np.uint8).astype(bool)
+        column, tokens = getattr(corpus, self.field), corpus.token
+        for doc_name in pending:
+            document = corpus.documents.get(doc_name)
+            if document is None or doc_name in self.rows:
+                continue
+            start, end = document['start'], document['end']
+            values = np.frombuffer(column[start:end], dtype=np.dtype(column.typecode))
+            words = is_word[np.frombuffer(tokens[start:end], dtype=np.dtype(tokens.typecode))]
+            terms, counts = np.unique(values[words], return_counts=True)
+            self.rows[doc_name] = len(self.doc_names)
+            self.doc_names.append(doc_name)
+            self.indices.frombytes(terms.astype(np.uint32).tobytes())
+            self.data.frombytes(counts.astype(np.uint32).tobytes())
+            self.indptr.append(len(self.indices))
+        self._arrays = self._weights = None
+
+    def remove(self, doc_name):
+        row = self.rows.pop(doc_name, None)
+        if row is None:
+            return
+        self.doc_names[row] = None
+        self._arrays = self._weights = None
+
+    def _compact(self):
+        live = np.array([doc_name is not None for doc_name in self.doc_names], dtype=bool)
+        if live.all():
+            return
+        lengths = np.diff(np.array(self.indptr, dtype=np.int64))
+        cells = np.repeat(live, lengths)
+        self.indices = array('I', np.array(self.indices, dtype=np.uint32)[cells].tobytes())
+        self.data = array('I', np.array(self.data, dtype=np.uint32)[cells].tobytes())
+        self.indptr = array('q', np.concatenate(([0], np.cumsum(lengths[live]))).astype(np.int64).tobytes())
+        self.doc_names = [doc_name for doc_name in self.doc_names if doc_name is not None]
+        self.rows = {doc_name: row for row, doc_name in enumerate(self.doc_names)}
+
+    def arrays(self):
+        if self._arrays is None:
+            self._compact()
+            self._arrays = (np.array(self.indptr, dtype=np.int64), np.array(self.indices, dtype=np.int64),
+                            np.array(self.data, dtype=np.float64))
+        return self._arrays
+
+    def weights(self):
+        if self._weights is None:
+            indptr, indices, counts = self.arrays()
+            n_docs = len(self.doc_names)
+            rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+            document_frequency = np.bincount(indices, minlength=len(self.corpus.strings))
+            idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+            weights = (1 + np.log(counts)) * idf[indices]
+            norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_docs))
+            self._weights = rows, document_frequency, weights, norms
+        return self._weights
+
+    def _row(self, doc_name):
+        row = self.rows[doc_name]
+        indptr = self.arrays()[0]
+        return row, slice(indptr[row], indptr[row + 1])
+
+    def _term(self, term_id):
+        return self.corpus.strings[int(term_id)]
+
+    def top_terms(self, doc_name, limit):
+        _, indices, counts = self.arrays()
+        _, document_frequency, weights, _ = self.weights()
+        _, cells = self._row(doc_name)
+        terms, row_counts, row_weights = indices[cells], counts[cells], weights[cells]
+        return [(self._term(terms[i]), int(row_counts[i]), int(document_frequency[terms[i]]), float(row_weights[i]))
+                for i in _top(row_weights, limit)]
+
+    def keyness(self, doc_name, limit):
+        _, indices, counts = self.arrays()
+        _, cells = self._row(doc_name)
+        totals = np.bincount(indices, weights=counts, minlength=len(self.corpus.strings))
+        observed = np.zeros(len(totals))
+        observed[indices[cells]] = counts[cells]
+        document_total = observed.sum()
+        rest_total = totals.sum() - document_total
+        if not document_total or not rest_total:
+            raise ValueError("Для ключевых слов нужны слова и в документе, и в остальном корпусе.")
+
+        terms = np.flatnonzero(totals)
+        a = observed[terms]
+        b = totals[terms] - a
+        expected_a = document_total * (a + b) / (document_total + rest_total)
+        expected_b = rest_total * (a + b) / (document_total + rest_total)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_likelihood = 2 * (np.where(a > 0, a * np.log(a / expected_a), 0.0)
+                                  + np.where(b > 0, b * np.log(b / expected_b), 0.0))
+        log_ratio = np.log2(((a + 0.5) / document_total) / ((b + 0.5) / rest_total))
+        overused = a / document_total >= b / rest_total
+        significant = log_likelihood >= KEYNESS_MIN_LOG_LIKELIHOOD
+
+        def rows(selected):
+            positions = np.flatnonzero(selected)
+            return [(self._term(terms[i]), int(a[i]), int(b[i]), float(log_likelihood[i]), float(log_ratio[i]))
+                    for i in positions[_top(log_likelihood[positions], limit)]]
+        return int(document_total), int(rest_total), rows(significant & overused), rows(significant & ~overused)
+
+    def similar(self, doc_name, limit):
+        _, indices, _ = self.arrays()
+        rows, _, weights, norms = self.weights()
+        row, cells = self._row(doc_name)
+        query = np.zeros(len(self.corpus.strings))
+        query[indices[cells]] = weights[cells]
+        products = np.bincount(rows, weights=weights * query[indices], minlength=len(self.doc_names))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, products / (norms * norms[row]), 0.0)
+        scores[row] = -np.inf
+        return [(self.doc_names[i], float(scores[i])) for i in _top(scores, min(limit, len(scores) - 1))]
+
+
+class DocumentTerms:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.matrices = {field: DocumentTermMatrix(corpus, field) for field in FIELDS}
+        self.add(corpus.document_names())
+
+    def add(self, doc_names):
+        for matrix in self.matrices.values():
+            matrix.add(doc_names)
+
+    def remove(self, doc_name):
+        for matrix in self.matrices.values():
+            matrix.remove(doc_name)
+
+    def matrix(self, field):
+        if field not in self.matrices:
+            raise ValueError(f"Неизвестное поле '{field}'.")
+        matrix = self.matrices[field]
+        matrix.update()
+        return matrix
@@ -0,0 +1,95 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from text_pipeline import init_worker, process_file
+
+
+CANCEL_POLL_SECONDS = 0.1
+
+
+def find_text_files(directory):
+    found = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.txt'):
+                found.append(os.path.join(dirpath, filename))
+    return found
+
+
+class IngestJob:
+
+    def __init__(self, filepaths, max_workers=None, lemma_entries=()):
+        self.filepaths = filepaths
+        self.lemma_entries = lemma_entries
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.messages = queue.Queue()
+        self.completed = 0
+        self.tokens = 0
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def tokens_per_second(self):
+        elapsed = self.elapsed
+        return self.tokens / elapsed if elapsed else 0.0
+
+    def _finish(self, kind, payload=None):
+        self.finished_at = time.perf_counter()
+        self.messages.put((kind, payload))
+
+    def _run(self):
+        try:
+            self.messages.put(('start', len(self.filepaths)))
+            if not self.filepaths:
+                self._finish('done')
+                return
+
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(self.filepaths)),
+                                           initializer=init_worker, initargs=(self.lemma_entries,))
+            try:
+                futures = {executor.submit(process_file, filepath): filepath for filepath in self.filepaths}
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    if self._cancel_event.is_set():
+                        self._finish('cancelled')
+                        return
+
+                    for future in done:
+                        filepath = futures[future]
+                        self.completed += 1
+                        try:
+                            batch, characters, lemma_report, timings = future.result()
+                        except Exception as e:
+                            self.messages.put(('failed', (filepath, e)))
+                            continue
+                        self.tokens += len(batch)
+                        self.messages.put(('document', (filepath, batch, characters, lemma_report, timings)))
+            finally:
+                executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+
+            self._finish('done')
+        except Exception as e:
+            self._finish('error', e)
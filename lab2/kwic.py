@@ -0,0 +1,113 @@
+import heapq
+from array import array
+
+from corpus_query import format_kwic
+
+
+KWIC_SORT_LABELS = {
+    'position': "по порядку в корпусе",
+    'document': "по имени документа",
+    'left': "по левому контексту",
+    'right': "по правому контексту",
+}
+SORT_CONTEXT_TOKENS = 3
+PAGE_ROWS = 200
+
+
+def value_ranks(strings):
+    ranks = array('I', bytes(4 * len(strings)))
+    for rank, value_id in enumerate(sorted(range(len(strings)), key=strings.__getitem__), 1):
+        ranks[value_id] = rank
+    return ranks
+
+
+def context_key(ranks, values):
+    base = len(ranks) + 1
+    key = 0
+    for offset in range(SORT_CONTEXT_TOKENS):
+        key = key * base + (ranks[values[offset]] if offset < len(values) else 0)
+    return key
+
+
+class CorpusContexts:
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.string_ranks = array('I')
+
+    def _string_ranks(self):
+        strings = self.corpus.strings.strings
+        if len(self.string_ranks) != len(strings):
+            self.string_ranks = value_ranks(strings)
+        return self.string_ranks
+
+    def sort_key(self, sort):
+        corpus = self.corpus
+        positions = len(corpus) + 1
+        doc = corpus.doc
+        if sort == 'position':
+            return lambda start, end: start
+        if sort == 'document':
+            ranks = value_ranks(corpus.docs.strings)
+            return lambda start, end: ranks[doc[start]] * positions + start
+
+        ranks, column = self._string_ranks(), corpus.token_lower
+
+        def key(start, end):
+            document = doc[start]
+            if sort == 'left':
+                window = range(start - 1, max(-1, start - 1 - SORT_CONTEXT_TOKENS), -1)
+            else:
+                window = range(end, min(positions - 1, end + SORT_CONTEXT_TOKENS))
+            values = []
+            for position in window:
+                if doc[position] != document:
+                    break
+                values.append(column[position])
+            return context_key(ranks, values) * positions + start
+        return key
+
+    def format_page(self, hits):
+        return [format_kwic(self.corpus, start, end) for start, end in hits]
+
+
+class KwicResults:
+
+    def __init__(self, contexts, hits, sort='position', limit=None):
+        self.contexts = contexts
+        self.sort = sort
+        self.limit = limit
+        self.total = 0
+        self.starts = array('I')
+        self.ends = array('I')
+        key = contexts.sort_key(sort)
+
+        if limit is not None:
+            def keyed():
+                for start, end in hits:
+                    self.total += 1
+                    yield key(start, end), start, end
+            for _, start, end in heapq.nsmallest(limit, keyed()):
+                self.starts.append(start)
+                self.ends.append(end)
+            return
+
+        for start, end in hits:
+            self.starts.append(start)
+            self.ends.append(end)
+        self.total = count = len(self.starts)
+        if sort == 'position' or count < 2:
+            return
+        keys = [key(start, end) * count + row for row, (start, end) in enumerate(zip(self.starts, self.ends))]
+        keys.sort()
+        starts, ends = self.starts, self.ends
+        self.starts = array('I', (starts[row % count] for row in keys))
+        self.ends = array('I', (ends[row % count] for row in keys))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lines(self):
+        for offset in range(0, len(self.starts), PAGE_ROWS):
+            yield from self.contexts.format_page(zip(self.starts[offset:offset + PAGE_ROWS],
+                                                     self.ends[offset:offset + PAGE_ROWS]))
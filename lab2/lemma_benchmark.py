@@ -0,0 +1,82 @@
+import argparse
+import sys
+import time
+
+import text_pipeline
+from text_pipeline import get_wordnet_pos, iter_pos_tagged, process_text_batch
+
+
+def read_corpus(paths):
+    texts = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            texts.append(f.read())
+    return texts
+
+
+def load_reference_corpus():
+    from nltk.corpus import gutenberg
+
+    return [gutenberg.raw(fileid) for fileid in gutenberg.fileids()]
+
+
+def configure_cache(max_size):
+    cache = text_pipeline.lemma_cache
+    cache.clear()
+    cache.max_size = max_size
+    return cache
+
+
+def time_lemmatization(pairs, cache):
+    start = time.perf_counter()
+    for form, pos in pairs:
+        cache.lemmatize(form, pos)
+    return time.perf_counter() - start
+
+
+def time_ingest(texts):
+    start = time.perf_counter()
+    tokens = sum(len(process_text_batch(text)) for text in texts)
+    return tokens, time.perf_counter() - start
+
+
+def run(texts, max_size, out=sys.stdout):
+    pairs = [(token.lower(), get_wordnet_pos(tag)) for text in texts for token, tag, _, _ in iter_pos_tagged(text)]
+    print(f"Документов: {len(texts)}, токенов: {len(pairs)}, уникальных пар (форма, часть речи): {len(set(pairs))}", file=out)
+
+    uncached_time = time_lemmatization(pairs, configure_cache(0))
+    cache = configure_cache(max_size)
+    cached_time = time_lemmatization(pairs, cache)
+    print(f"Лемматизация без кэша: {uncached_time:.3f} с, {len(pairs) / uncached_time:.0f} токенов/с", file=out)
+    print(f"Лемматизация с кэшем:  {cached_time:.3f} с, {len(pairs) / cached_time:.0f} токенов/с, "
+          f"попаданий {cache.hits}, промахов {cache.misses} ({cache.hit_rate():.1%})", file=out)
+    print(f"Ускорение лемматизации: {uncached_time / cached_time:.1f}x", file=out)
+
+    configure_cache(0)
+    tokens, uncached_ingest = time_ingest(texts)
+    cache = configure_cache(max_size)
+    _, cached_ingest = time_ingest(texts)
+    print(f"Обработка текста без кэша: {uncached_ingest:.2f} с, {tokens / uncached_ingest:.0f} токенов/с", file=out)
+    print(f"Обработка текста с кэшем:  {cached_ingest:.2f} с, {tokens / cached_ingest:.0f} токенов/с "
+          f"({cache.hit_rate():.1%} попаданий)", file=out)
+    speedup = uncached_ingest / cached_ingest
+    print(f"Ускорение обработки: {speedup:.2f}x", file=out)
+    return speedup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Замер ускорения лемматизации и обработки текста за счет кэша лемм."
+    )
+    parser.add_argument("files", nargs="*", help="текстовые файлы (по умолчанию - корпус NLTK gutenberg)")
+    parser.add_argument("--max-size", type=int, default=text_pipeline.lemma_cache.max_size,
+                        help="максимальное число записей в кэше")
+    args = parser.parse_args(argv)
+
+    texts = read_corpus(args.files) if args.files else load_reference_corpus()
+    run(texts, args.max_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
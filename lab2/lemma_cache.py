@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+from collections import OrderedDict
+
+
+DEFAULT_MAX_SIZE = 200_000
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("IAZIS_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "iazis"),
+    "lemma_cache.json.gz",
+)
+
+
+class LemmaCache:
+
+    def __init__(self, lemmatize, max_size=DEFAULT_MAX_SIZE):
+        self._lemmatize = lemmatize
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.record_new = False
+        self.new_entries = []
+
+    def lemmatize(self, form, pos):
+        key = (form, pos)
+        lemma = self.entries.get(key)
+        if lemma is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return lemma
+
+        self.misses += 1
+        lemma = self._lemmatize(form, pos=pos)
+        if self.max_size:
+            self.entries[key] = lemma
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            if self.record_new:
+                self.new_entries.append((form, pos, lemma))
+        return lemma
+
+    def snapshot(self):
+        return [(form, pos, lemma) for (form, pos), lemma in self.entries.items()]
+
+    def merge(self, entries):
+        for form, pos, lemma in entries:
+            self.entries[(form, pos)] = lemma
+            self.entries.move_to_end((form, pos))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def drain_new_entries(self):
+        entries, self.new_entries = self.new_entries, []
+        return entries
+
+    def add_counts(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+
+    def counts(self):
+        return self.hits, self.misses
+
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.new_entries = []
+        self.hits = self.misses = 0
+
+    def load(self, filepath=DEFAULT_CACHE_PATH):
+        try:
+            with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return 0
+        self.merge(entries)
+        return len(entries)
+
+    def save(self, filepath=DEFAULT_CACHE_PATH):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = filepath + ".tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(temp_path, filepath)
+
+    def format_stats(self):
+        return (f"Кэш лемм: {len(self.entries)} из {self.max_size} записей, "
+                f"попаданий {self.hits}, промахов {self.misses} ({self.hit_rate():.1%})")
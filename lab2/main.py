@@ -1,59 +1,33 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox, simpledialog, Toplevel, Text, Label, Entry, Button
+from tkinter import filedialog, scrolledtext, messagebox, simpledialog, Toplevel, Text, Label, Entry, Button, ttk
 import os
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.stem import WordNetLemmatizer
-from collections import Counter
-import pickle
-
-
-corpus = []
-lemmatizer = WordNetLemmatizer()
-
-def get_wordnet_pos(treebank_tag):
-    if treebank_tag.startswith('J'):
-        return nltk.corpus.wordnet.ADJ
-    elif treebank_tag.startswith('V'):
-        return nltk.corpus.wordnet.VERB
-    elif treebank_tag.startswith('N'):
-        return nltk.corpus.wordnet.NOUN
-    elif treebank_tag.startswith('R'):
-        return nltk.corpus.wordnet.ADV
-    else:
-        return nltk.corpus.wordnet.NOUN
-
-def process_text(text, doc_name):
-    processed_tokens = []
-    raw_sentences = sent_tokenize(text)
+import tracemalloc
+from functools import partial
 
-    for sent_idx, sentence_text in enumerate(raw_sentences):
-        raw_tokens = word_tokenize(sentence_text)
-        if not raw_tokens:
-            continue
+from corpus_engine import (DOCUMENT_ANALYSES, DOCUMENT_FIELD_LABELS, INGEST_STATUS, NGRAM_FIELD_LABELS, NGRAM_MEASURE_LABELS,
+                           WHOLE_CORPUS, CorpusEngine)
+from corpus_format import CORPUS_EXTENSION, is_segmented_corpus
+from corpus_query import QuerySyntaxError
+from corpus_sqlite import DATABASE_EXTENSION, SqliteCorpusEngine
+from diagnostics import (action_timings, collect_diagnostics, export_diagnostics, iter_diagnostics_report,
+                         pipeline_timings, set_memory_tracing, timed_lines)
+from kwic import KWIC_SORT_LABELS
+from result_view import ResultView
 
-        tagged_tokens = nltk.pos_tag(raw_tokens)
 
-        for token_idx, (token, tag) in enumerate(tagged_tokens):
-            token_lower = token.lower()
-            wn_tag = get_wordnet_pos(tag)
-            lemma = lemmatizer.lemmatize(token_lower, pos=wn_tag)
+INGEST_POLL_MS = 100
 
-            token_info = {
-                'token': token,
-                'token_lower': token_lower,
-                'tag': tag,
-                'lemma': lemma,
-                'doc_name': doc_name,
-                'sent_num': sent_idx + 1,
-                'token_num': token_idx + 1
-            }
-            processed_tokens.append(token_info)
+engine = CorpusEngine()
 
-    return processed_tokens
+def ingest_in_progress():
+    if engine.ingest_job is not None:
+        messagebox.showwarning("Предупреждение", "Дождитесь окончания загрузки файлов или отмените ее.")
+        return True
+    return False
 
 def add_file_to_corpus():
-    global corpus
+    if ingest_in_progress():
+        return
     filepath = filedialog.askopenfilename(
         title="Выберите текстовый файл (.txt)",
         filetypes=(("Text files", "*.txt"), ("All files", "*.*"))
@@ -61,28 +35,90 @@ def add_file_to_corpus():
     if not filepath:
         return
 
-    doc_name = os.path.basename(filepath)
+    try:
+        with action_timings.measure("Добавить файл"):
+            doc_name = engine.add_file(filepath)
+    except ValueError as e:
+        messagebox.showwarning("Предупреждение", str(e))
+        return
+    except Exception as e:
+        messagebox.showerror("Ошибка чтения файла", f"Не удалось прочитать или обработать файл:\n{e}")
+        return
+
+    update_status(f"Файл '{doc_name}' добавлен. Всего токенов в корпусе: {len(engine.corpus)}")
+    view_corpus_content()
+
 
-    if any(token_info['doc_name'] == doc_name for token_info in corpus):
-        messagebox.showwarning("Предупреждение", f"Файл '{doc_name}' уже есть в корпусе.")
+def add_folder_to_corpus():
+    if ingest_in_progress():
         return
+    directory = filedialog.askdirectory(title="Выберите папку с текстовыми файлами (.txt)")
+    if not directory:
+        return
+    start_ingest([directory])
+
+def add_many_files_to_corpus():
+    if ingest_in_progress():
+        return
+    filepaths = filedialog.askopenfilenames(
+        title="Выберите текстовые файлы (.txt)",
+        filetypes=(("Text files", "*.txt"), ("All files", "*.*"))
+    )
+    if filepaths:
+        start_ingest(list(filepaths))
 
+def start_ingest(paths):
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            raw_text = f.read()
+        job = engine.start_ingest(paths)
+    except ValueError as e:
+        messagebox.showwarning("Предупреждение", str(e))
+        return
 
-        new_tokens = process_text(raw_text, doc_name)
-        corpus.extend(new_tokens)
+    ingest_progress.config(value=0, maximum=len(job.filepaths))
+    ingest_label.config(text=f"Обработка файлов: 0 из {len(job.filepaths)}")
+    ingest_cancel_button.config(state=tk.NORMAL)
+    ingest_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, before=result_view)
+    root.after(INGEST_POLL_MS, poll_ingest)
+
+def cancel_ingest():
+    if engine.ingest_job is not None:
+        engine.cancel_ingest()
+        ingest_cancel_button.config(state=tk.DISABLED)
+        ingest_label.config(text="Отмена...")
+
+def poll_ingest():
+    job = engine.ingest_job
+    if job is None:
+        return
 
-        update_status(f"Файл '{doc_name}' добавлен. Всего токенов в корпусе: {len(corpus)}")
-        view_corpus_content()
+    finished = engine.poll_ingest()
+    if finished is not None:
+        finish_ingest(job, *finished)
+        return
 
-    except Exception as e:
-        messagebox.showerror("Ошибка чтения файла", f"Не удалось прочитать или обработать файл:\n{e}")
+    if not job.cancelled:
+        ingest_progress.config(value=job.completed)
+        ingest_label.config(text=engine.format_ingest_progress(job))
+    root.after(INGEST_POLL_MS, poll_ingest)
+
+def finish_ingest(job, kind, error=None):
+    ingest_frame.pack_forget()
+    action_timings.add("Загрузка файлов (в фоне)", job.elapsed, job.tokens)
 
+    summary = engine.ingest_summary
+    status = INGEST_STATUS[kind]
+    update_status(f"{status}. Добавлено документов: {summary['added']}. Всего токенов в корпусе: {len(engine.corpus)}")
+    view_corpus_content()
+
+    message = engine.format_ingest_summary(job, kind, error)
+    if kind == 'error' or summary['failed']:
+        messagebox.showwarning("Загрузка файлов", message)
+    else:
+        messagebox.showinfo("Загрузка файлов", message)
 
 def add_text_directly():
-    global corpus
+    if ingest_in_progress():
+        return
 
     input_window = Toplevel(root)
     input_window.title("Добавить текст в корпус")
@@ -93,12 +129,7 @@ def add_text_directly():
     Label(input_window, text="Идентификатор:").pack(pady=(10, 0))
     identifier_entry = Entry(input_window, width=50)
     identifier_entry.pack(pady=5)
-    existing_ids = {token_info['doc_name'] for token_info in corpus if token_info['doc_name'].startswith('Введенный текст')}
-    count = 1
-    while f"Введенный текст {count}" in existing_ids:
-        count += 1
-    default_id = f"Введенный текст {count}"
-    identifier_entry.insert(0, default_id)
+    identifier_entry.insert(0, engine.next_text_identifier())
 
     Label(input_window, text="Введите текст:").pack(pady=5)
     text_area = scrolledtext.ScrolledText(input_window, wrap=tk.WORD, width=60, height=15)
@@ -111,20 +142,20 @@ def add_text_directly():
         if not identifier or not raw_text:
             messagebox.showwarning("Предупреждение", "Введите идентификатор и текст.", parent=input_window)
             return
-        if any(token_info['doc_name'] == identifier for token_info in corpus):
-             messagebox.showwarning("Предупреждение", f"Идентификатор '{identifier}' уже используется.", parent=input_window)
-             return
 
         try:
-            new_tokens = process_text(raw_text, identifier)
-            corpus.extend(new_tokens)
-
-            update_status(f"Текст '{identifier}' добавлен. Всего токенов в корпусе: {len(corpus)}")
-            view_corpus_content()
-            input_window.destroy()
-
+            with action_timings.measure("Добавить текст"):
+                engine.add_text(identifier, raw_text)
+        except ValueError as e:
+            messagebox.showwarning("Предупреждение", str(e), parent=input_window)
+            return
         except Exception as e:
             messagebox.showerror("Ошибка обработки текста", f"Не удалось обработать текст:\n{e}", parent=input_window)
+            return
+
+        update_status(f"Текст '{identifier}' добавлен. Всего токенов в корпусе: {len(engine.corpus)}")
+        view_corpus_content()
+        input_window.destroy()
 
     button_frame = tk.Frame(input_window)
     button_frame.pack(pady=10)
@@ -136,257 +167,532 @@ def add_text_directly():
     input_window.wait_window()
 
 
-def get_all_items(item_type='tokens'):
-    if not corpus:
-        return []
-
-    key_map = {
-        'tokens': 'token_lower',
-        'lemmas': 'lemma',
-        'tags': 'tag'
-    }
-    attribute_key = key_map.get(item_type)
-    if not attribute_key:
-        return []
-
-    all_items = [
-        token_info[attribute_key]
-        for token_info in corpus
-        if token_info['token'].isalpha()
-    ]
-    return all_items
+def corpus_is_empty():
+    if not engine.corpus:
+        messagebox.showinfo("Информация", "Корпус пуст. Добавьте файлы или текст.")
+        return True
+    return False
 
 def show_frequency_stats():
-    if not corpus:
-        messagebox.showinfo("Информация", "Корпус пуст. Добавьте файлы или текст.")
+    if corpus_is_empty():
         return
 
-    all_tokens = get_all_items('tokens')
-    all_lemmas = get_all_items('lemmas')
-    all_tags = get_all_items('tags')
-
-    if not all_tokens:
+    if not engine.stats.total('tokens'):
          messagebox.showinfo("Информация", "В корпусе нет слов для статистики.")
          return
 
-    token_counts = Counter(all_tokens)
-    lemma_counts = Counter(all_lemmas)
-    tag_counts = Counter(all_tags)
+    display_report(engine.iter_frequency_report, "Показать статистику")
 
-    unique_docs = {token_info['doc_name'] for token_info in corpus}
-
-    report = "=== Частотная статистика ===\n\n"
-    report += f"Всего документов/текстов: {len(unique_docs)}\n"
-    report += f"Всего слов: {len(all_tokens)}\n"
-    report += f"Уникальных слов: {len(token_counts)}\n"
-    report += f"Всего лемм: {len(all_lemmas)}\n"
-    report += f"Уникальных лемм: {len(lemma_counts)}\n"
-    report += f"Всего тегов частей речи: {len(all_tags)}\n"
-    report += f"Уникальных тегов: {len(tag_counts)}\n\n"
-
-    report += "--- Частота Токенов ---\n"
-    for token, count in token_counts.most_common():
-        report += f"{token}: {count}\n"
-    report += "\n"
-
-    report += "--- Частота Лемм ---\n"
-    for lemma, count in lemma_counts.most_common():
-        report += f"{lemma}: {count}\n"
-    report += "\n"
+def show_ngram_stats():
+    if corpus_is_empty():
+        return
 
-    report += "--- Частота Тегов Частей Речи ---\n"
-    for tag, count in tag_counts.most_common():
-        report += f"{tag}: {count}\n"
+    fields = {label: field for field, label in NGRAM_FIELD_LABELS.items()}
+    measures = {label: measure for measure, label in NGRAM_MEASURE_LABELS.items()}
+
+    ngram_window = Toplevel(root)
+    ngram_window.title("N-граммы и коллокации")
+    ngram_window.transient(root)
+    ngram_window.grab_set()
+
+    def add_choice(row, label, values):
+        Label(ngram_window, text=label).grid(row=row, column=0, sticky=tk.W, padx=10, pady=3)
+        box = ttk.Combobox(ngram_window, values=values, state="readonly", width=30)
+        box.current(0)
+        box.grid(row=row, column=1, padx=10, pady=3)
+        return box
+
+    def add_number(row, label, default):
+        Label(ngram_window, text=label).grid(row=row, column=0, sticky=tk.W, padx=10, pady=3)
+        entry = Entry(ngram_window, width=32)
+        entry.insert(0, str(default))
+        entry.grid(row=row, column=1, padx=10, pady=3)
+        return entry
+
+    size_box = add_choice(0, "Длина n-граммы:", ["2", "3"])
+    field_box = add_choice(1, "Считать по:", list(fields))
+    window_entry = add_number(2, "Окно (только для биграмм):", 2)
+    min_freq_entry = add_number(3, "Минимальная частота:", 2)
+    document_box = add_choice(4, "Документ:", [WHOLE_CORPUS] + engine.corpus.document_names())
+    measure_box = add_choice(5, "Сортировать по:", list(measures))
 
-    display_results(report)
+    def on_ok():
+        n = int(size_box.get())
+        try:
+            window = int(window_entry.get()) if n == 2 else n
+            min_freq = int(min_freq_entry.get())
+        except ValueError:
+            messagebox.showwarning("Предупреждение", "Окно и минимальная частота должны быть целыми числами.",
+                                   parent=ngram_window)
+            return
+        document = None if document_box.get() == WHOLE_CORPUS else document_box.get()
+        try:
+            with action_timings.measure("N-граммы и коллокации"):
+                table = engine.ngram_statistics(n, fields[field_box.get()], window, min_freq, document)
+        except ValueError as e:
+            messagebox.showwarning("Предупреждение", str(e), parent=ngram_window)
+            return
+        measure = measures[measure_box.get()]
+        ngram_window.destroy()
+        display_report(lambda: engine.iter_ngram_report(table, measure, document))
 
-def find_concordance():
-    if not corpus:
-        messagebox.showinfo("Информация", "Корпус пуст. Добавьте файлы или текст.")
-        return
+    button_frame = tk.Frame(ngram_window)
+    button_frame.grid(row=6, column=0, columnspan=2, pady=10)
+    Button(button_frame, text="OK", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
+    Button(button_frame, text="Отмена", width=10, command=ngram_window.destroy).pack(side=tk.LEFT, padx=5)
+    ngram_window.wait_window()
 
-    query = simpledialog.askstring("Конкорданс", "Введите слово или фразу для поиска:")
-    if not query:
-        return
 
-    query_tokens_lower = [token.lower() for token in word_tokenize(query) if token.isalpha()]
-    if not query_tokens_lower:
-        messagebox.showwarning("Предупреждение", "Запрос не содержит слов для поиска.")
+def compare_documents():
+    if corpus_is_empty():
         return
-    n_query = len(query_tokens_lower)
 
-    results = []
-    context_window_tokens = 7
+    analyses = {label: analysis for analysis, label in DOCUMENT_ANALYSES.items()}
+    fields = {label: field for field, label in DOCUMENT_FIELD_LABELS.items()}
+
+    compare_window = Toplevel(root)
+    compare_window.title("Сравнение документов")
+    compare_window.transient(root)
+    compare_window.grab_set()
+
+    def add_choice(row, label, values):
+        Label(compare_window, text=label).grid(row=row, column=0, sticky=tk.W, padx=10, pady=3)
+        box = ttk.Combobox(compare_window, values=values, state="readonly", width=45)
+        box.current(0)
+        box.grid(row=row, column=1, padx=10, pady=3)
+        return box
+
+    document_box = add_choice(0, "Документ:", engine.corpus.document_names())
+    analysis_box = add_choice(1, "Анализ:", list(analyses))
+    field_box = add_choice(2, "Считать по:", list(fields))
+    Label(compare_window, text="Число строк:").grid(row=3, column=0, sticky=tk.W, padx=10, pady=3)
+    limit_entry = Entry(compare_window, width=47)
+    limit_entry.insert(0, "50")
+    limit_entry.grid(row=3, column=1, padx=10, pady=3)
 
+    def on_ok():
+        try:
+            limit = int(limit_entry.get())
+        except ValueError:
+            messagebox.showwarning("Предупреждение", "Число строк должно быть целым числом.", parent=compare_window)
+            return
+        document, analysis, field = document_box.get(), analyses[analysis_box.get()], fields[field_box.get()]
+        compare_window.config(cursor="watch")
+        compare_window.update_idletasks()
+        try:
+            with action_timings.measure("Сравнение документов"):
+                result = engine.document_analysis(analysis, document, field, limit)
+        except ValueError as e:
+            compare_window.config(cursor="")
+            messagebox.showwarning("Предупреждение", str(e), parent=compare_window)
+            return
+        compare_window.destroy()
+        display_report(lambda: engine.iter_document_report(analysis, document, field, result))
+
+    button_frame = tk.Frame(compare_window)
+    button_frame.grid(row=4, column=0, columnspan=2, pady=10)
+    Button(button_frame, text="OK", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
+    Button(button_frame, text="Отмена", width=10, command=compare_window.destroy).pack(side=tk.LEFT, padx=5)
+    compare_window.wait_window()
+
+
+def ask_kwic_query(title, prompt):
+    sorts = {label: sort for sort, label in KWIC_SORT_LABELS.items()}
+    answer = []
+
+    query_window = Toplevel(root)
+    query_window.title(title)
+    query_window.transient(root)
+    query_window.grab_set()
+
+    Label(query_window, text=prompt, justify=tk.LEFT).grid(row=0, column=0, columnspan=2, sticky=tk.W, padx=10, pady=(10, 3))
+    query_entry = Entry(query_window, width=60)
+    query_entry.grid(row=1, column=0, columnspan=2, padx=10, pady=3)
+    query_entry.focus_set()
+    Label(query_window, text="Сортировать:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=3)
+    sort_box = ttk.Combobox(query_window, values=list(sorts), state="readonly", width=30)
+    sort_box.current(0)
+    sort_box.grid(row=2, column=1, sticky=tk.W, padx=10, pady=3)
+    Label(query_window, text="Показать первые N (пусто - все):").grid(row=3, column=0, sticky=tk.W, padx=10, pady=3)
+    limit_entry = Entry(query_window, width=32)
+    limit_entry.grid(row=3, column=1, sticky=tk.W, padx=10, pady=3)
 
-    for i in range(len(corpus) - n_query + 1):
-        potential_match = True
-        phrase_tokens_info = []
-        first_token_info = corpus[i]
+    def on_ok():
+        query = query_entry.get().strip()
+        if not query:
+            return
+        try:
+            limit = int(limit_entry.get()) if limit_entry.get().strip() else None
+        except ValueError:
+            messagebox.showwarning("Предупреждение", "Число строк должно быть целым числом.", parent=query_window)
+            return
+        if limit is not None and limit < 1:
+            messagebox.showwarning("Предупреждение", "Число строк должно быть положительным.", parent=query_window)
+            return
+        answer.extend((query, sorts[sort_box.get()], limit))
+        query_window.destroy()
 
-        for j in range(n_query):
-            current_token_info = corpus[i+j]
-            phrase_tokens_info.append(current_token_info)
-            if (current_token_info['token_lower'] != query_tokens_lower[j] or
-                current_token_info['doc_name'] != first_token_info['doc_name'] or
-                current_token_info['sent_num'] != first_token_info['sent_num']):
-                potential_match = False
-                break
+    query_entry.bind("<Return>", lambda event: on_ok())
+    button_frame = tk.Frame(query_window)
+    button_frame.grid(row=4, column=0, columnspan=2, pady=10)
+    Button(button_frame, text="OK", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
+    Button(button_frame, text="Отмена", width=10, command=query_window.destroy).pack(side=tk.LEFT, padx=5)
+    query_window.wait_window()
+    return answer or None
 
-        if potential_match:
-            doc_name = first_token_info['doc_name']
-            sent_num = first_token_info['sent_num']
-            sent_start_idx = -1
-            sent_end_idx = -1
 
-            k = i
-            while k >= 0 and corpus[k]['doc_name'] == doc_name and corpus[k]['sent_num'] == sent_num:
-                sent_start_idx = k
-                k -= 1
+def find_concordance():
+    if corpus_is_empty():
+        return
 
-            k = i + n_query - 1
-            while k < len(corpus) and corpus[k]['doc_name'] == doc_name and corpus[k]['sent_num'] == sent_num:
-                sent_end_idx = k + 1
-                k += 1
+    answer = ask_kwic_query("Конкорданс", "Введите слово или фразу для поиска:")
+    if answer is None:
+        return
+    query, sort, limit = answer
 
-            if sent_start_idx != -1 and sent_end_idx != -1:
-                sentence_tokens_info = corpus[sent_start_idx:sent_end_idx]
-                sentence_original_tokens = [info['token'] for info in sentence_tokens_info]
-                phrase_start_in_sentence = phrase_tokens_info[0]['token_num'] - 1
+    try:
+        with action_timings.measure("Найти конкорданс"):
+            results = engine.concordance(engine.concordance_query(query), sort, limit)
+    except ValueError as e:
+        messagebox.showwarning("Предупреждение", str(e))
+        return
+    display_report(lambda: engine.iter_concordance_report(query, results))
 
-                context_start = max(0, phrase_start_in_sentence - context_window_tokens)
-                context_end = min(len(sentence_original_tokens), phrase_start_in_sentence + n_query + context_window_tokens)
 
-                left_context = " ".join(sentence_original_tokens[context_start:phrase_start_in_sentence])
-                match_phrase = " ".join(sentence_original_tokens[phrase_start_in_sentence : phrase_start_in_sentence + n_query])
-                right_context = " ".join(sentence_original_tokens[phrase_start_in_sentence + n_query : context_end])
+PATTERN_QUERY_PROMPT = ("Введите шаблон, например:\n"
+                        "[lemma=\"be\"] [tag=\"VBN\"]\n"
+                        "[tag=\"JJ*\"] []{0,2} [word=/.*ness/]")
 
-                results.append(f"[{doc_name}, Предл. {sent_num}]: ...{left_context} **{match_phrase}** {right_context}...")
+def find_pattern():
+    if corpus_is_empty():
+        return
 
-    if results:
-        unique_results = sorted(list(set(results)))
-        display_results(f"=== Конкорданс для '{query}' ({len(unique_results)} найдено) ===\n\n" + "\n".join(unique_results))
-    else:
-        display_results(f"Фраза '{query}' не найдена в корпусе.")
+    answer = ask_kwic_query("Поиск по шаблону", PATTERN_QUERY_PROMPT)
+    if answer is None:
+        return
+    query_text, sort, limit = answer
+    try:
+        query = engine.pattern_query(query_text)
+    except QuerySyntaxError as e:
+        messagebox.showerror("Ошибка в запросе", str(e))
+        return
+    display_report(lambda: engine.iter_pattern_report(query, sort, limit), "Поиск по шаблону")
 
 
 def get_word_info():
-
-    if not corpus:
-        messagebox.showinfo("Информация", "Корпус пуст. Добавьте файлы или текст.")
+    if corpus_is_empty():
         return
 
     word = simpledialog.askstring("Информация о слове", "Введите слово:")
     if not word:
         return
 
-    word_lower = word.lower()
-    found_occurrences_info = []
-
-    for token_info in corpus:
-        if token_info['token_lower'] == word_lower:
-            found_occurrences_info.append(token_info)
-
-    if found_occurrences_info:
-        report = f"=== Информация о слове '{word}' ===\n\n"
-        report += f"Найдено вхождений: {len(found_occurrences_info)}\n\n"
-        report += "--- Местоположения ---\n"
-
-        for info in found_occurrences_info:
-            report += (f"- Документ: {info['doc_name']}, "
-                       f"Предложение: {info['sent_num']}, "
-                       f"Слово: {info['token_num']}\n")
-
-            report += f"  Токен: '{info['token']}', Тег: {info['tag']}, Лемма: {info['lemma']}\n\n"
-
-        display_results(report)
-
-    else:
-        display_results(f"Слово '{word}' не найдено в корпусе. Введите одно слово для анализа.")
-
-
-
+    display_report(lambda: engine.iter_word_report(word), "Информация о слове")
 
 
+CORPUS_FILETYPES = (("Corpus files", f"*{CORPUS_EXTENSION}"), ("All files", "*.*"))
 
 def save_corpus():
-    global corpus
-    if not corpus:
+    if engine.database:
+        update_status(f"Изменения уже записаны в базу '{os.path.basename(engine.corpus.path)}'")
+        return
+    if engine.corpus_file is None:
+        save_corpus_as()
+        return
+    filename = os.path.basename(engine.corpus_file.path)
+    if not engine.has_unsaved_changes():
+        update_status(f"Изменений нет: корпус уже сохранен в '{filename}'")
+        return
+    try:
+        with action_timings.measure("Сохранить корпус"):
+            segments, written = engine.save()
+        update_status(f"Корпус сохранен в '{filename}': дописано сегментов {segments}, {written / 1024:.0f} КБ")
+    except Exception as e:
+        messagebox.showerror("Ошибка сохранения", f"Не удалось сохранить корпус:\n{e}")
+
+def save_corpus_as():
+    if engine.database:
+        messagebox.showinfo("Информация", "Корпус в базе SQLite сохраняется автоматически при каждом изменении.")
+        return
+    if not engine.corpus.documents:
         messagebox.showinfo("Информация", "Корпус пуст. Нечего сохранять.")
         return
     filepath = filedialog.asksaveasfilename(
         title="Сохранить корпус как...",
-        defaultextension=".corpus",
-        filetypes=(("Corpus files", "*.corpus"), ("All files", "*.*"))
+        defaultextension=CORPUS_EXTENSION,
+        filetypes=CORPUS_FILETYPES
     )
     if not filepath: return
     try:
-        with open(filepath, 'wb') as f:
-            pickle.dump(corpus, f)
-        update_status(f"Корпус сохранен в '{os.path.basename(filepath)}'")
+        with action_timings.measure("Сохранить корпус как"):
+            segments, written = engine.save_as(filepath)
+        update_status(f"Корпус сохранен в '{os.path.basename(filepath)}': "
+                      f"{len(engine.corpus.documents)} документов, {written / 1024:.0f} КБ")
     except Exception as e:
         messagebox.showerror("Ошибка сохранения", f"Не удалось сохранить корпус:\n{e}")
 
+def ask_legacy_target(filepath):
+    filename = os.path.basename(filepath)
+    if not messagebox.askyesno("Корпус старого формата",
+                               f"Файл '{filename}' сохранен в старом формате. "
+                               f"Преобразовать его в формат {CORPUS_EXTENSION}? Исходный файл не изменится."):
+        return None
+    return filedialog.asksaveasfilename(
+        title="Сохранить преобразованный корпус как...",
+        initialfile=os.path.splitext(filename)[0] + CORPUS_EXTENSION,
+        defaultextension=CORPUS_EXTENSION,
+        filetypes=CORPUS_FILETYPES
+    ) or None
+
 def load_corpus():
-    global corpus
+    if ingest_in_progress():
+        return
     filepath = filedialog.askopenfilename(
         title="Загрузить корпус",
-        filetypes=(("Corpus files", "*.corpus"), ("All files", "*.*"))
+        filetypes=(("Corpus files", f"*{CORPUS_EXTENSION} *.corpus"), ("All files", "*.*"))
     )
     if not filepath: return
+    new_engine = CorpusEngine()
     try:
-        with open(filepath, 'rb') as f:
-            corpus = pickle.load(f)
-            if not isinstance(corpus, list):
-                raise TypeError("Загруженный файл не содержит список токенов.")
-        update_status(f"Корпус загружен из '{os.path.basename(filepath)}'. Всего токенов: {len(corpus)}")
-        view_corpus_content()
-    except (pickle.UnpicklingError, TypeError, EOFError) as e:
-         messagebox.showerror("Ошибка загрузки", f"Не удалось загрузить корпус или формат файла некорректен:\n{e}")
-         corpus = []
+        if is_segmented_corpus(filepath):
+            with action_timings.measure("Загрузить корпус"):
+                new_engine.load(filepath)
+        else:
+            target = ask_legacy_target(filepath)
+            if not target:
+                return
+            with action_timings.measure("Преобразовать корпус старого формата"):
+                new_engine.import_legacy(filepath, target)
+            filepath = target
+    except Exception as e:
+        new_engine.close()
+        messagebox.showerror("Ошибка загрузки", f"Не удалось загрузить корпус или формат файла некорректен:\n{e}")
+        return
+
+    use_engine(new_engine)
+    update_status(f"Корпус загружен из '{os.path.basename(filepath)}'. Всего токенов: {len(engine.corpus)}")
+    view_corpus_content()
+
+def confirm_discard_changes():
+    if engine.database or not engine.has_unsaved_changes():
+        return True
+    return messagebox.askyesno("Несохраненные изменения",
+                               "Корпус в памяти содержит несохраненные изменения. Продолжить без сохранения?")
+
+def close_engine():
+    display_results("")
+    engine.close()
+
+def use_engine(new_engine):
+    global engine
+    close_engine()
+    engine = new_engine
+    corpus_menu.entryconfig("Сравнение документов...", state=tk.DISABLED if engine.database else tk.NORMAL)
+
+def open_database():
+    if ingest_in_progress():
+        return
+    filepath = filedialog.asksaveasfilename(
+        title="Открыть или создать базу SQLite",
+        defaultextension=DATABASE_EXTENSION,
+        filetypes=(("SQLite corpus", f"*{DATABASE_EXTENSION}"), ("All files", "*.*")),
+        confirmoverwrite=False
+    )
+    if not filepath or not confirm_discard_changes():
+        return
+    try:
+        with action_timings.measure("Открыть базу SQLite"):
+            new_engine = SqliteCorpusEngine(filepath)
     except Exception as e:
-        messagebox.showerror("Ошибка загрузки", f"Не удалось загрузить корпус:\n{e}")
-        corpus = []
+        messagebox.showerror("Ошибка загрузки", f"Не удалось открыть базу:\n{e}")
+        return
+    use_engine(new_engine)
+    update_status(f"Открыта база '{os.path.basename(filepath)}'. Всего токенов: {len(engine.corpus)}")
+    view_corpus_content()
 
 def view_corpus_content():
-    if not corpus:
-        display_results("Корпус пуст.")
+    display_report(engine.iter_content_report, "Показать содержимое")
+
+
+def remove_document():
+    if ingest_in_progress():
         return
 
-    unique_docs = sorted(list({token_info['doc_name'] for token_info in corpus}))
-    total_tokens = len(corpus)
-    total_words = len(get_all_items('tokens'))
+    if not engine.corpus.documents:
+        messagebox.showinfo("Информация", "Корпус пуст. Нечего удалять.")
+        return
 
-    content_report = "=== Содержимое корпуса ===\n\n"
-    content_report += f"Всего документов/текстов: {len(unique_docs)}\n"
-    content_report += f"Всего токенов (вкл. пунктуацию): {total_tokens}\n"
-    content_report += f"Всего токенов (только слова): {total_words}\n\n"
-    content_report += "--- Документы/Тексты в корпусе ---\n"
-    for i, doc_name in enumerate(unique_docs):
-         content_report += f"{i+1}. {doc_name}\n"
-    display_results(content_report)
+    remove_window = Toplevel(root)
+    remove_window.title("Удалить документ")
+    remove_window.geometry("400x350")
+    remove_window.transient(root)
+    remove_window.grab_set()
+
+    Label(remove_window, text="Выберите документ:").pack(pady=(10, 0))
+    doc_listbox = tk.Listbox(remove_window, width=50, height=12)
+    doc_listbox.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
+    for doc_name in engine.corpus.document_names():
+        doc_listbox.insert(tk.END, doc_name)
+
+    def on_remove():
+        selection = doc_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Предупреждение", "Выберите документ.", parent=remove_window)
+            return
+        doc_name = doc_listbox.get(selection[0])
+        if not messagebox.askyesno("Удалить документ", f"Удалить '{doc_name}' из корпуса?", parent=remove_window):
+            return
+
+        try:
+            with action_timings.measure("Удалить документ"):
+                engine.remove_document(doc_name)
+        except Exception as e:
+            messagebox.showerror("Ошибка удаления", f"Не удалось удалить документ '{doc_name}':\n{e}", parent=remove_window)
+            remove_window.destroy()
+            view_corpus_content()
+            return
+
+        update_status(f"Документ '{doc_name}' удален. Всего токенов в корпусе: {len(engine.corpus)}")
+        view_corpus_content()
+        remove_window.destroy()
+
+    button_frame = tk.Frame(remove_window)
+    button_frame.pack(pady=10)
+    remove_button = Button(button_frame, text="Удалить", width=10, command=on_remove)
+    remove_button.pack(side=tk.LEFT, padx=5)
+    cancel_button = Button(button_frame, text="Отмена", width=10, command=remove_window.destroy)
+    cancel_button.pack(side=tk.LEFT, padx=5)
+    remove_window.wait_window()
+
+def save_results():
+    if not result_view.has_content():
+        messagebox.showwarning("Предупреждение", "Нет результатов для сохранения.")
+        return
+    filepath = filedialog.asksaveasfilename(
+        defaultextension=".txt",
+        filetypes=[("Текстовые файлы", "*.txt"), ("Все файлы", "*.*")],
+        title="Сохранить результаты как..."
+    )
+    if not filepath:
+        return
+    try:
+        with action_timings.measure("Сохранить результаты"):
+            saved = result_view.save_to(filepath)
+        update_status(f"Результаты сохранены в '{os.path.basename(filepath)}' (строк: {saved})")
+    except Exception as e:
+        messagebox.showerror("Ошибка", f"Не удалось сохранить результаты: {e}")
+
+def show_lemma_cache_stats():
+    message = engine.lemma_cache.format_stats()
+    message += f"\n\nФайл кэша: {engine.lemma_cache_path}"
+    message += "\nСохраняется при выходе." if persist_lemma_cache_var.get() else "\nСохранение между запусками отключено."
+    messagebox.showinfo("Кэш лемм", message)
+
+def show_diagnostics():
+    diagnostics_window = Toplevel(root)
+    diagnostics_window.title("Диагностика")
+    diagnostics_window.geometry("800x500")
+    diagnostics_window.transient(root)
+
+    report_area = scrolledtext.ScrolledText(diagnostics_window, wrap=tk.NONE, font=("Courier", 9))
+    memory_var = tk.BooleanVar(value=tracemalloc.is_tracing())
+
+    def refresh():
+        report_area.config(state=tk.NORMAL)
+        report_area.delete("1.0", tk.END)
+        report_area.insert(tk.END, "\n".join(iter_diagnostics_report(collect_diagnostics(engine))))
+        report_area.config(state=tk.DISABLED)
+
+    def reset():
+        action_timings.reset()
+        pipeline_timings.reset()
+        refresh()
+
+    def toggle_memory():
+        set_memory_tracing(memory_var.get())
+        refresh()
+
+    def export():
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Все файлы", "*.*")],
+            title="Экспорт диагностики",
+            parent=diagnostics_window
+        )
+        if not filepath:
+            return
+        try:
+            export_diagnostics(filepath, collect_diagnostics(engine))
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Не удалось записать файл: {e}", parent=diagnostics_window)
+            return
+        update_status(f"Диагностика записана в '{os.path.basename(filepath)}'")
+
+    button_frame = tk.Frame(diagnostics_window)
+    button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+    tk.Checkbutton(button_frame, text="Отслеживать память (tracemalloc)", variable=memory_var,
+                   command=toggle_memory).pack(side=tk.LEFT, padx=5)
+    Button(button_frame, text="Закрыть", width=10, command=diagnostics_window.destroy).pack(side=tk.RIGHT, padx=5)
+    Button(button_frame, text="Экспорт в JSON...", command=export).pack(side=tk.RIGHT, padx=5)
+    Button(button_frame, text="Сбросить замеры", command=reset).pack(side=tk.RIGHT, padx=5)
+    Button(button_frame, text="Обновить", width=10, command=refresh).pack(side=tk.RIGHT, padx=5)
+    report_area.pack(padx=10, pady=(10, 0), fill=tk.BOTH, expand=True)
+    refresh()
+
+def load_lemma_cache():
+    try:
+        engine.load_lemma_cache()
+    except (OSError, ValueError) as e:
+        print(f"Не удалось загрузить кэш лемм: {e}")
+
+def exit_app():
+    try:
+        engine.save_lemma_cache(persist_lemma_cache_var.get())
+    except OSError as e:
+        print(f"Не удалось сохранить кэш лемм: {e}")
+    close_engine()
+    root.quit()
 
 def show_help():
     help_text = """
     === Справка по Корпусному Менеджеру ===
 
-    **Структура данных:** Корпус хранится как единый список токенов. Каждый токен содержит информацию о себе, своей части речи, лемме, а также о документе, предложении и позиции, откуда он взят.
+    **Структура данных:** Корпус хранится как единый список токенов. Каждый токен содержит информацию о себе, своей части речи, лемме, а также о документе, предложении и позиции, откуда он взят. Для экономии памяти строки хранятся в словарях один раз, а сами токены - в колонках целых чисел. Поиск конкорданса и информации о слове идет по инвертированному индексу словоформ и лемм, поэтому время запроса зависит от числа найденных вхождений, а не от размера корпуса.
+
+    **Файл корпуса (.scorpus):** Каждый документ записывается в файл отдельным сегментом со своими колонками и индексом. При повторном сохранении в конец файла дописываются только новые документы и отметки об удаленных, поэтому сохранение после добавления одного документа занимает время, пропорциональное этому документу. При загрузке файл отображается в память, а колонки и индекс читаются по мере обращения к ним. Файлы .corpus старого формата при загрузке однократно преобразуются в .scorpus (также: python corpus_format.py convert старый.corpus новый.scorpus).
+
+    **База SQLite (.sqlite):** Для корпусов, которые не помещаются в память, корпус можно хранить в базе SQLite (Файл - Открыть базу SQLite...). Каждый токен - строка таблицы с кодами словоформы, леммы и тега, предложения проиндексированы полнотекстовым индексом FTS5, частоты хранятся в отдельной таблице. Документы записываются в базу сразу при добавлении большими транзакциями, а конкорданс, информация о слове и статистика вычисляются запросами к базе, поэтому в памяти находятся только словари строк и текущая страница отчета. Поиск по шаблону ищет кандидатов по индексу и проверяет только окно токенов вокруг каждого из них, n-граммы считаются запросом с группировкой по базе. Сравнение документов в этом режиме недоступно, пункт меню отключен. Из командной строки база выбирается по расширению: python corpus_cli.py add корпус.sqlite папка_с_текстами.
+
+    **Без графического интерфейса:** Все операции с корпусом выполняет модуль corpus_engine (класс CorpusEngine), а это окно только вызывает его. Те же операции доступны из командной строки: python corpus_cli.py add корпус.scorpus папка_с_текстами, python corpus_cli.py stats корпус.scorpus, python corpus_cli.py query корпус.scorpus '[lemma="be"] [tag="VBN"]' и т.д. (список команд: python corpus_cli.py --help). Модели NLTK загружаются только при первой обработке текста, поэтому отчеты по сохраненному корпусу строятся без их загрузки.
 
     **Файл:**
-      - Добавить файл (.txt): Добавить текстовый файл в корпус. Текст будет разбит на токены, и они добавятся в общий список.
+      - Добавить файл (.txt): Добавить текстовый файл в корпус. Текст будет разбит на токены, и они добавятся в общий список. Файл читается частями и разбивается на предложения по ходу чтения, поэтому целиком в память не загружается даже очень большой файл.
+      - Добавить несколько файлов... / Добавить папку...: Добавить сразу много файлов .txt (из папки - включая вложенные папки). Файлы обрабатываются параллельно в нескольких процессах, окно остается отзывчивым; ход загрузки и скорость (токенов/с) показываются внизу окна, загрузку можно отменить.
       - Добавить текст...: Открыть окно для ввода/вставки текста. Текст будет обработан и добавлен в общий список токенов.
-      - Сохранить корпус: Сохранить текущий список токенов в файл .corpus.
-      - Загрузить корпус: Загрузить ранее сохраненный список токенов из файла .corpus.
+      - Сохранить корпус: Дописать изменения в файл .scorpus, из которого корпус был загружен или в который уже сохранялся; при первом сохранении - выбрать файл.
+      - Сохранить корпус как...: Записать корпус целиком в новый файл .scorpus (заодно убирает из файла сегменты удаленных документов).
+      - Загрузить корпус: Загрузить корпус из файла .scorpus или преобразовать файл .corpus старого формата.
+      - Открыть базу SQLite...: Открыть корпус в базе .sqlite или создать новую базу. Добавление и удаление документов сразу записываются в базу, сохранять корпус не нужно.
+      - Сохранить результаты...: Записать текущий отчет в текстовый файл целиком. Строки формируются заново и пишутся в файл по одной, не проходя через окно результатов.
+      - Сохранять кэш лемм между запусками: Леммы уже встречавшихся пар (словоформа, часть речи) берутся из кэша вместо повторного обращения к WordNet. При включенном флажке кэш сохраняется при выходе и загружается при следующем запуске.
       - Выход: Закрыть приложение.
 
     **Корпус:**
-      - Показать содержимое: Отобразить сводную информацию: список документов/текстов в корпусе и общее количество токенов.
-      - Показать статистику: Рассчитать и показать частотную статистику по словам, леммам и частям речи для всего корпуса.
+      - Показать содержимое: Отобразить сводную информацию: список документов/текстов в корпусе с числом токенов, слов и предложений, а также источником.
+      - Показать статистику: Показать частотную статистику по словам, леммам и частям речи для всего корпуса. Счетчики обновляются при добавлении и удалении документов.
+      - N-граммы и коллокации...: Подсчитать биграммы или триграммы по словоформам, леммам или тегам во всем корпусе или в одном документе и вычислить меры ассоциации PMI, log-likelihood и t-score. Для биграмм можно задать окно: пары слов на расстоянии меньше окна внутри предложения. N-граммы не переходят через знаки препинания: в "however, the" биграммы "however the" нет. N-граммы реже минимальной частоты не выводятся. Подсчет выполняется над массивами идентификаторов с помощью NumPy.
+      - Сравнение документов...: Для выбранного документа показать ключевые термины по TF-IDF, ключевые слова в сравнении с остальным корпусом (log-likelihood и log ratio; выводятся только различия с LL не меньше 3.84, то есть значимые на уровне 0.05) или самые похожие документы по косинусному сходству векторов TF-IDF. Счет идет по леммам или словоформам. Для этого при добавлении каждого документа в разреженную матрицу "документ - термин" дописывается строка с частотами его слов, а все меры вычисляются над этой матрицей с помощью NumPy, поэтому запрос остается быстрым и при десятках тысяч документов.
+      - Статистика кэша лемм: Показать размер кэша лемм и число попаданий и промахов.
+      - Диагностика...: Показать, сколько времени заняли этапы обработки текста (разбиение на предложения, токенизация, разметка частей речи, лемматизация; при параллельной загрузке замеры собираются из всех процессов) и каждое действие меню: число вызовов, общее, среднее, последнее и наибольшее время. Для отчетов, которые строятся по мере прокрутки (статистика, поиск по шаблону, информация о слове, содержимое корпуса), учитывается время формирования всех выведенных строк; вызовом считается каждый проход по отчету - показ, возврат к началу после прокрутки, сохранение в файл. Всегда показывается размер основных структур в памяти: колонок корпуса, словарей, индексов, статистики, кэша лемм, матрицы документ-термин. При включенном флажке "Отслеживать память" tracemalloc дополнительно показывает, в каких модулях программы выделена память после включения; каждый блок относится к ближайшему модулю программы в стеке вызовов (чтобы учесть весь корпус, включите флажок до загрузки или запустите python -X tracemalloc=32 main.py). Замеры можно сбросить и выгрузить в файл JSON для сравнения между версиями; из командной строки - python corpus_cli.py --diagnostics замеры.json stats корпус.scorpus.
+      - Удалить документ...: Выбрать документ/текст и удалить его токены из корпуса и индекса. Остальные документы не обрабатываются заново.
 
     **Анализ:**
-      - Найти конкорданс: Поиск слова или фразы в корпусе. Отображает найденную фразу в контексте предложения, из которого она взята.
+      - Найти конкорданс: Поиск слова или фразы в корпусе. Результаты выводятся в формате KWIC: найденная фраза в квадратных скобках, слева и справа - ее контекст в пределах документа. Строки можно упорядочить по позиции в корпусе, по имени документа, по левому контексту (по ближайшему слову слева, затем следующему и т.д.) или по правому контексту. Для сортировки у каждого вхождения хранятся только позиция и длина, а ключи сортировки - целые числа, вычисленные из алфавитного порядка словоформ; текст строк формируется только для тех строк, до которых дошла прокрутка. Если указать "Показать первые N", из всех вхождений отбираются N первых в выбранном порядке без сортировки остальных.
+      - Поиск по шаблону...: Поиск последовательностей токенов по условиям на каждую позицию. Позиция записывается в квадратных скобках: [word="..."] - словоформа без учета регистра, [token="..."] - с учетом регистра, [lemma="..."] - лемма, [tag="..."] - тег части речи. Значение может содержать * и ?, а вместо кавычек можно указать регулярное выражение: [word=/.*ness/]. Условия объединяются знаком &, != означает отрицание, [] - любой токен, {m,n} после позиции - число повторов (например, []{0,3} - пропуск до трех токенов). Слово без скобок равносильно [word="слово"]. Пример: [lemma="be"] [tag="VBN"]. Поиск начинается с самого редкого условия по индексу, результаты выводятся в формате KWIC и сортируются так же, как конкорданс.
       - Информация о слове: Показать детальную информацию о каждом вхождении слова (документ, предложение, позиция, тег, лемма).
 
+    **Окно результатов:** Отчеты формируются по мере прокрутки: в окне находятся только видимые строки, а следующие строки запрашиваются у отчета, когда до них доходит прокрутка. Каждая строка отчета занимает одну строку окна: длинные строки не переносятся, их можно прокрутить по горизонтали. В памяти хранятся только последние 20000 полученных строк; при возврате к более ранним строкам отчет формируется заново с начала. Внизу показан номер видимых строк и сколько строк уже получено ("+" - отчет еще не закончен). Поле "Строка" переходит к строке с указанным номером, поле "Найти" ищет текст (без учета регистра) начиная с текущего места, при необходимости дочитывая отчет; повторное нажатие ищет следующее вхождение. Прокрутка - колесом мыши, клавишами стрелок и PageUp/PageDown, Ctrl+Home/Ctrl+End - в начало и к последней полученной строке.
+
     **Помощь:**
       - Справка: Показать это окно.
 
@@ -394,52 +700,87 @@ def show_help():
     messagebox.showinfo("Справка", help_text)
 
 
-root = tk.Tk()
-root.title("Корпусный Менеджер")
-root.geometry("800x600")
-
-menu_bar = tk.Menu(root)
-root.config(menu=menu_bar)
-
-file_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Файл", menu=file_menu)
-file_menu.add_command(label="Добавить файл (.txt)", command=add_file_to_corpus)
-file_menu.add_command(label="Добавить текст...", command=add_text_directly)
-file_menu.add_separator()
-file_menu.add_command(label="Сохранить корпус", command=save_corpus)
-file_menu.add_command(label="Загрузить корпус", command=load_corpus)
-file_menu.add_separator()
-file_menu.add_command(label="Выход", command=root.quit)
-
-corpus_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Корпус", menu=corpus_menu)
-corpus_menu.add_command(label="Показать содержимое", command=view_corpus_content)
-corpus_menu.add_command(label="Показать статистику", command=show_frequency_stats)
-
-analysis_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Анализ", menu=analysis_menu)
-analysis_menu.add_command(label="Найти конкорданс", command=find_concordance)
-analysis_menu.add_command(label="Информация о слове", command=get_word_info)
-
-help_menu = tk.Menu(menu_bar, tearoff=0)
-menu_bar.add_cascade(label="Помощь", menu=help_menu)
-help_menu.add_command(label="Справка", command=show_help)
-
-results_text = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=30, font=("Arial", 10))
-results_text.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
-results_text.insert(tk.END, "Добро пожаловать в Корпусный Менеджер!\nДобавьте файлы или текст для начала работы.")
-results_text.config(state=tk.DISABLED)
-
 def display_results(text):
-    results_text.config(state=tk.NORMAL)
-    results_text.delete(1.0, tk.END)
-    results_text.insert(tk.END, text)
-    results_text.config(state=tk.DISABLED)
+    result_view.show_text(text)
 
-status_bar = tk.Label(root, text="Готово", bd=1, relief=tk.SUNKEN, anchor=tk.W)
-status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+def display_report(make_lines, action=None):
+    if action is not None:
+        make_lines = partial(timed_lines, action_timings, action, make_lines)
+    result_view.show(make_lines)
 
 def update_status(message):
     status_bar.config(text=message)
 
-root.mainloop()
+def main():
+    global root, persist_lemma_cache_var, status_bar, result_view, corpus_menu
+    global ingest_frame, ingest_label, ingest_cancel_button, ingest_progress
+
+    root = tk.Tk()
+    root.title("Корпусный Менеджер")
+    root.protocol("WM_DELETE_WINDOW", exit_app)
+
+    persist_lemma_cache_var = tk.BooleanVar(value=True)
+    load_lemma_cache()
+    root.geometry("800x600")
+
+    menu_bar = tk.Menu(root)
+    root.config(menu=menu_bar)
+
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Файл", menu=file_menu)
+    file_menu.add_command(label="Добавить файл (.txt)", command=add_file_to_corpus)
+    file_menu.add_command(label="Добавить несколько файлов...", command=add_many_files_to_corpus)
+    file_menu.add_command(label="Добавить папку...", command=add_folder_to_corpus)
+    file_menu.add_command(label="Добавить текст...", command=add_text_directly)
+    file_menu.add_separator()
+    file_menu.add_command(label="Сохранить корпус", command=save_corpus)
+    file_menu.add_command(label="Сохранить корпус как...", command=save_corpus_as)
+    file_menu.add_command(label="Загрузить корпус", command=load_corpus)
+    file_menu.add_command(label="Открыть базу SQLite...", command=open_database)
+    file_menu.add_command(label="Сохранить результаты...", command=save_results)
+    file_menu.add_separator()
+    file_menu.add_checkbutton(label="Сохранять кэш лемм между запусками", variable=persist_lemma_cache_var)
+    file_menu.add_separator()
+    file_menu.add_command(label="Выход", command=exit_app)
+
+    corpus_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Корпус", menu=corpus_menu)
+    corpus_menu.add_command(label="Показать содержимое", command=view_corpus_content)
+    corpus_menu.add_command(label="Показать статистику", command=show_frequency_stats)
+    corpus_menu.add_command(label="N-граммы и коллокации...", command=show_ngram_stats)
+    corpus_menu.add_command(label="Сравнение документов...", command=compare_documents)
+    corpus_menu.add_command(label="Статистика кэша лемм", command=show_lemma_cache_stats)
+    corpus_menu.add_command(label="Диагностика...", command=show_diagnostics)
+    corpus_menu.add_separator()
+    corpus_menu.add_command(label="Удалить документ...", command=remove_document)
+
+    analysis_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Анализ", menu=analysis_menu)
+    analysis_menu.add_command(label="Найти конкорданс", command=find_concordance)
+    analysis_menu.add_command(label="Поиск по шаблону...", command=find_pattern)
+    analysis_menu.add_command(label="Информация о слове", command=get_word_info)
+
+    help_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Помощь", menu=help_menu)
+    help_menu.add_command(label="Справка", command=show_help)
+
+    status_bar = tk.Label(root, text="Готово", bd=1, relief=tk.SUNKEN, anchor=tk.W)
+    status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+
+    result_view = ResultView(root, font=("Arial", 10), on_save=save_results)
+    result_view.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+    display_results("Добро пожаловать в Корпусный Менеджер!\nДобавьте файлы или текст для начала работы.")
+
+    ingest_frame = tk.Frame(root)
+    ingest_label = Label(ingest_frame, text="", anchor=tk.W)
+    ingest_label.pack(side=tk.LEFT)
+    ingest_cancel_button = Button(ingest_frame, text="Отмена", command=cancel_ingest)
+    ingest_cancel_button.pack(side=tk.RIGHT)
+    ingest_progress = ttk.Progressbar(ingest_frame, orient=tk.HORIZONTAL, mode='determinate')
+    ingest_progress.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=5)
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
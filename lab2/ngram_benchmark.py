@@ -0,0 +1,108 @@
+import argparse
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from collocations import ngram_statistics
+from corpus_store import ColumnarCorpus
+
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def synthetic_word(index):
+    word = ''
+    while True:
+        index, letter = divmod(index, len(LETTERS))
+        word += LETTERS[letter]
+        if not index:
+            return word
+
+
+def synthetic_corpus(tokens, vocabulary_size, sentence_length, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = ((rng.zipf(1.3, tokens) - 1) % vocabulary_size).astype(np.uint32)
+    positions = np.arange(tokens, dtype=np.uint32)
+
+    corpus = ColumnarCorpus()
+    for index in range(vocabulary_size):
+        corpus._intern_string(synthetic_word(index))
+    corpus.tags.intern('NN')
+    document = corpus._register_document("synthetic.txt")
+    corpus.docs.intern("synthetic.txt")
+
+    for column in (corpus.token, corpus.token_lower, corpus.lemma):
+        column.frombytes(ids.tobytes())
+    corpus.tag.frombytes(np.zeros(tokens, dtype=np.uint16).tobytes())
+    corpus.doc.frombytes(np.zeros(tokens, dtype=np.uint32).tobytes())
+    corpus.sent_num.frombytes((positions // sentence_length + 1).tobytes())
+    corpus.token_num.frombytes((positions % sentence_length + 1).tobytes())
+    document['end'] = tokens
+    return corpus
+
+
+def count_with_loops(corpus, n):
+    column, sent_num = corpus.token_lower, corpus.sent_num
+    return Counter(tuple(column[position:position + n]) for position in range(len(column) - n + 1)
+                   if sent_num[position] == sent_num[position + n - 1])
+
+
+def time_call(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(sizes, vocabulary_size, sentence_length, window, min_freq, out=sys.stdout):
+    baseline_corpus = synthetic_corpus(sizes[0], vocabulary_size, sentence_length)
+    _, loop_time = time_call(lambda: count_with_loops(baseline_corpus, 2))
+    _, vector_time = time_call(lambda: ngram_statistics(baseline_corpus, 2))
+    print(f"Подсчет биграмм на {sizes[0]} токенах: циклы Python {loop_time:.2f} с, NumPy {vector_time:.2f} с "
+          f"(ускорение {loop_time / vector_time:.1f}x)", file=out)
+    del baseline_corpus
+
+    print(f"{'Токенов':>12} {'биграммы, с':>12} {'окно ' + str(window) + ', с':>12} {'триграммы, с':>13} "
+          f"{'мкс/токен':>10} {'масштаб':>8}", file=out)
+    reference = None
+    worst = 1.0
+    for tokens in sizes:
+        corpus = synthetic_corpus(tokens, vocabulary_size, sentence_length)
+        _, bigram_time = time_call(lambda: ngram_statistics(corpus, 2, min_freq=min_freq))
+        _, window_time = time_call(lambda: ngram_statistics(corpus, 2, window=window, min_freq=min_freq))
+        _, trigram_time = time_call(lambda: ngram_statistics(corpus, 3, min_freq=min_freq))
+        per_token = (bigram_time + window_time + trigram_time) / tokens
+        reference = reference or per_token
+        worst = max(worst, per_token / reference)
+        print(f"{tokens:>12} {bigram_time:>12.2f} {window_time:>12.2f} {trigram_time:>13.2f} "
+              f"{per_token * 1e6:>10.3f} {per_token / reference:>7.2f}x", file=out)
+        del corpus
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Замер масштабирования подсчета n-грамм и мер ассоциации на синтетическом корпусе."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000],
+                        help="размеры корпуса в токенах")
+    parser.add_argument("--vocabulary", type=int, default=50_000, help="размер словаря")
+    parser.add_argument("--sentence-length", type=int, default=20, help="длина предложения в токенах")
+    parser.add_argument("--window", type=int, default=5, help="окно для биграмм с промежутками")
+    parser.add_argument("--min-freq", type=int, default=2, help="минимальная частота n-граммы")
+    parser.add_argument("--max-slowdown", type=float, default=None,
+                        help="допустимый рост времени на токен относительно наименьшего размера; "
+                             "при большем значении код выхода 1")
+    args = parser.parse_args(argv)
+
+    worst = run(sorted(args.sizes), args.vocabulary, args.sentence_length, args.window, args.min_freq)
+    if args.max_slowdown is not None and worst > args.max_slowdown:
+        print(f"Время на токен выросло в {worst:.2f} раза, порог {args.max_slowdown:.2f}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+
+FETCH_LINES = 1000
+MAX_CACHED_LINES = 20000
+WHEEL_LINES = 3
+
+
+class ResultView(tk.Frame):
+
+    def __init__(self, master, font=None, on_save=None, on_error=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.make_lines = None
+        self.source = iter(())
+        self.lines = []
+        self.first = 0
+        self.exhausted = True
+        self.top = 0
+        self.marked_line = None
+        self.match = None
+        self.on_error = on_error
+
+        toolbar = tk.Frame(self)
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        self.position_label = tk.Label(toolbar, text="", anchor=tk.W)
+        self.position_label.pack(side=tk.LEFT)
+        if on_save is not None:
+            tk.Button(toolbar, text="Сохранить...", command=on_save).pack(side=tk.RIGHT, padx=(5, 0))
+        tk.Button(toolbar, text="Найти далее", command=self.find_next).pack(side=tk.RIGHT)
+        self.search_entry = tk.Entry(toolbar, width=20)
+        self.search_entry.pack(side=tk.RIGHT, padx=5)
+        self.search_entry.bind("<Return>", lambda event: self.find_next())
+        tk.Label(toolbar, text="Найти:").pack(side=tk.RIGHT)
+        tk.Button(toolbar, text="Перейти", command=self.jump_to_entry_line).pack(side=tk.RIGHT, padx=(0, 10))
+        self.line_entry = tk.Entry(toolbar, width=8)
+        self.line_entry.pack(side=tk.RIGHT, padx=5)
+        self.line_entry.bind("<Return>", lambda event: self.jump_to_entry_line())
+        tk.Label(toolbar, text="Строка:").pack(side=tk.RIGHT)
+
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(body, wrap=tk.NONE, font=font, state=tk.DISABLED, height=10)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        xscrollbar = ttk.Scrollbar(body, orient=tk.HORIZONTAL, command=self.text.xview)
+        xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text.config(xscrollcommand=xscrollbar.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure('marked', background='#fff3b0')
+        self.text.tag_configure('match', background='#ffd24d')
+        self.line_height = tkfont.Font(font=self.text['font']).metrics('linespace')
+
+        self.text.bind("<Configure>", lambda event: self._render())
+        self.text.bind("<MouseWheel>", self._on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-WHEEL_LINES))
+        self.text.bind("<Button-5>", lambda event: self.scroll(WHEEL_LINES))
+        self.text.bind("<Button-1>", lambda event: self.text.focus_set())
+        self.text.bind("<Up>", lambda event: self.scroll(-1))
+        self.text.bind("<Down>", lambda event: self.scroll(1))
+        self.text.bind("<Prior>", lambda event: self.scroll(-self._rows()))
+        self.text.bind("<Next>", lambda event: self.scroll(self._rows()))
+        self.text.bind("<Control-Home>", lambda event: self.jump_to(1))
+        self.text.bind("<Control-End>", lambda event: self.jump_to(self.fetched))
+
+    def show(self, make_lines):
+        self.make_lines = make_lines
+        self._restart()
+        self.top = 0
+        self.marked_line = None
+        self.match = None
+        self._render()
+
+    def show_text(self, text):
+        self.show(lambda: iter(text.split("\n")))
+
+    def iter_all(self):
+        if self.make_lines is None:
+            return iter(())
+        return iter(self.make_lines())
+
+    @property
+    def fetched(self):
+        return self.first + len(self.lines)
+
+    def has_content(self):
+        self._load(self.first, self.first + FETCH_LINES)
+        return self.first > 0 or any(line.strip() for line in self.lines)
+
+    def save_to(self, filepath):
+        saved = 0
+        with open(filepath, "w", encoding="utf-8") as f:
+            for line in self.iter_all():
+                f.write(line)
+                f.write("\n")
+                saved += 1
+        return saved
+
+    def _restart(self):
+        self.source = iter(self.make_lines())
+        self.lines = []
+        self.first = 0
+        self.exhausted = False
+
+    def _load(self, start, stop):
+        if start < self.first:
+            self._restart()
+        while not self.exhausted and self.fetched < stop:
+            for _ in range(FETCH_LINES):
+                try:
+                    line = next(self.source)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                except Exception as e:
+                    self._fail(e)
+                    break
+                self.lines.extend(line.split("\n"))
+            dropped = min(len(self.lines) - MAX_CACHED_LINES, start - self.first)
+            if dropped > 0:
+                del self.lines[:dropped]
+                self.first += dropped
+
+    def _fail(self, error):
+        self.lines.append(f"Ошибка при формировании результата: {error}")
+        self.exhausted = True
+        if self.on_error is not None:
+            self.after_idle(self.on_error, error)
+
+    def _rows(self):
+        return max(1, self.text.winfo_height() // self.line_height)
+
+    def _render(self):
+        rows = self._rows()
+        self._load(self.top, self.top + rows + 1)
+        self.top = max(0, min(self.top, self.fetched - rows))
+        self._load(self.top, self.top + rows + 1)
+
+        text = self.text
+        text.config(state=tk.NORMAL)
+        text.delete("1.0", tk.END)
+        offset = self.top - self.first
+        text.insert(tk.END, "\n".join(self.lines[offset:offset + rows]))
+        if self.marked_line is not None and self.top <= self.marked_line < self.top + rows:
+            row = self.marked_line - self.top + 1
+            text.tag_add('marked', f"{row}.0", f"{row}.end")
+        if self.match is not None and self.top <= self.match[0] < self.top + rows:
+            line, column, length = self.match
+            row = line - self.top + 1
+            text.tag_add('match', f"{row}.{column}", f"{row}.{column + length}")
+        text.config(state=tk.DISABLED)
+
+        total = self.fetched
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+            more = "" if self.exhausted else "+"
+            self.position_label.config(
+                text=f"Строки {self.top + 1}-{min(self.top + rows, total)} из {total}{more}")
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            self.position_label.config(text="")
+
+    def scroll(self, lines):
+        self.top = max(0, self.top + lines)
+        self._render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-WHEEL_LINES if event.delta > 0 else WHEEL_LINES)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.top = int(float(amount) * self.fetched)
+            self._render()
+        else:
+            self.scroll(int(amount) * (self._rows() if unit == tk.PAGES else 1))
+
+    def jump_to(self, line_number):
+        line_number = max(1, line_number)
+        self._load(line_number - 1, line_number)
+        self.marked_line = max(0, min(line_number, self.fetched) - 1)
+        self.top = max(0, self.marked_line - self._rows() // 3)
+        self._render()
+        return "break"
+
+    def jump_to_entry_line(self):
+        try:
+            line_number = int(self.line_entry.get())
+        except ValueError:
+            self.position_label.config(text="Номер строки должен быть целым числом.")
+            return
+        self.jump_to(line_number)
+
+    def _search(self, needle, start, stop=None):
+        line = start
+        while stop is None or line < stop:
+            self._load(line, line + 1)
+            if line >= self.fetched:
+                return None
+            column = self.lines[line - self.first].lower().find(needle)
+            if column >= 0:
+                return line, column
+            line += 1
+        return None
+
+    def find_next(self):
+        needle = self.search_entry.get().lower()
+        if not needle:
+            return
+        start = self.match[0] + 1 if self.match is not None else self.top
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            found = self._search(needle, start) or self._search(needle, 0, start)
+        finally:
+            self.config(cursor="")
+        if found is None:
+            self.match = None
+            self._render()
+            self.position_label.config(text=f"'{self.search_entry.get()}' не найдено.")
+            return
+        line, column = found
+        self.match = (line, column, len(needle))
+        self.marked_line = line
+        self.top = max(0, line - self._rows() // 3)
+        self._render()
@@ -0,0 +1,132 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from corpus_engine import CorpusEngine
+from corpus_sqlite import SqliteCorpusEngine
+from corpus_store import TokenBatch
+from ngram_benchmark import synthetic_word
+
+
+BACKENDS = ('memory', 'sqlite')
+BACKEND_LABELS = {'memory': "в памяти (.scorpus)", 'sqlite': "SQLite FTS5"}
+
+
+def synthetic_batch(tokens, vocabulary_size, sentence_length, seed):
+    rng = np.random.default_rng(seed)
+    ids = ((rng.zipf(1.3, tokens) - 1) % vocabulary_size).astype(np.uint32)
+    positions = np.arange(tokens, dtype=np.uint32)
+
+    batch = TokenBatch()
+    for index in range(vocabulary_size):
+        batch.strings.intern(synthetic_word(index))
+    batch.tags.intern('NN')
+    for column in (batch.token, batch.token_lower, batch.lemma):
+        column.frombytes(ids.tobytes())
+    batch.tag.frombytes(np.zeros(tokens, dtype=np.uint16).tobytes())
+    batch.sent_num.frombytes((positions // sentence_length + 1).tobytes())
+    batch.token_num.frombytes((positions % sentence_length + 1).tobytes())
+    return batch
+
+
+def peak_memory_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_call(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def build(backend, path, tokens, document_tokens, vocabulary_size, sentence_length):
+    engine = CorpusEngine() if backend == 'memory' else SqliteCorpusEngine(path)
+    start = time.perf_counter()
+    for number, offset in enumerate(range(0, tokens, document_tokens)):
+        batch = synthetic_batch(min(document_tokens, tokens - offset), vocabulary_size, sentence_length, number)
+        doc_name = f"synthetic{number:03}.txt"
+        engine.corpus.add_batch(doc_name, batch)
+        engine._update_index([doc_name])
+    if backend == 'memory':
+        engine.save_as(path)
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return {'ingest': elapsed, 'size': os.path.getsize(path), 'memory': peak_memory_mb()}
+
+
+def query(backend, path, concordance_words, phrase, word):
+    results = {}
+    if backend == 'memory':
+        engine = CorpusEngine()
+        _, results['open'] = time_call(lambda: engine.load(path))
+    else:
+        engine, results['open'] = time_call(lambda: SqliteCorpusEngine(path))
+    hits, results['concordance'] = time_call(lambda: sum(1 for _ in engine.concordance(concordance_words).lines()))
+    _, results['phrase'] = time_call(lambda: list(engine.concordance(phrase).lines()))
+    _, results['word'] = time_call(lambda: sum(1 for _ in engine.iter_word_report(word)))
+    _, results['stats'] = time_call(lambda: sum(1 for _ in engine.iter_frequency_report()))
+    results['hits'] = hits
+    results['memory'] = peak_memory_mb()
+    engine.close()
+    return results
+
+
+def in_child(function, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run(sizes, document_tokens, vocabulary_size, sentence_length, directory, out=sys.stdout):
+    concordance_words = [synthetic_word(100)]
+    phrase = [synthetic_word(0), synthetic_word(50)]
+    word = synthetic_word(200)
+    print(f"Запросы: конкорданс '{concordance_words[0]}', фраза '{' '.join(phrase)}', "
+          f"информация о слове '{word}', полная частотная статистика", file=out)
+    print(f"{'Токенов':>10} {'Хранилище':<20} {'загрузка, с':>11} {'файл, МБ':>9} {'память, МБ':>10} "
+          f"{'открытие, с':>11} {'конк., с':>9} {'фраза, с':>9} {'слово, с':>9} {'стат., с':>9} "
+          f"{'память, МБ':>10}", file=out)
+    for tokens in sizes:
+        for backend in BACKENDS:
+            extension = '.scorpus' if backend == 'memory' else '.sqlite'
+            path = os.path.join(directory, f"benchmark_{tokens}{extension}")
+            built = in_child(build, backend, path, tokens, document_tokens, vocabulary_size, sentence_length)
+            queried = in_child(query, backend, path, concordance_words, phrase, word)
+            print(f"{tokens:>10} {BACKEND_LABELS[backend]:<20} {built['ingest']:>11.1f} "
+                  f"{built['size'] / 1024 / 1024:>9.0f} {built['memory']:>10.0f} {queried['open']:>11.2f} "
+                  f"{queried['concordance']:>9.2f} {queried['phrase']:>9.2f} {queried['word']:>9.2f} "
+                  f"{queried['stats']:>9.2f} {queried['memory']:>10.0f}", file=out, flush=True)
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Сравнение корпуса в памяти и корпуса в базе SQLite на синтетических документах. "
+                    "Каждый этап выполняется в отдельном процессе, память - пиковый размер процесса."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 20_000_000],
+                        help="размеры корпуса в токенах")
+    parser.add_argument("--document-tokens", type=int, default=1_000_000, help="токенов в одном документе")
+    parser.add_argument("--vocabulary", type=int, default=50_000, help="размер словаря")
+    parser.add_argument("--sentence-length", type=int, default=20, help="длина предложения в токенах")
+    parser.add_argument("--directory", default=None, help="папка для файлов корпуса (по умолчанию временная)")
+    args = parser.parse_args(argv)
+
+    if args.directory is not None:
+        run(sorted(args.sizes), args.document_tokens, args.vocabulary, args.sentence_length, args.directory)
+        return 0
+    with tempfile.TemporaryDirectory() as directory:
+        run(sorted(args.sizes), args.document_tokens, args.vocabulary, args.sentence_length, directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
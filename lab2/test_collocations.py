@@ -0,0 +1,147 @@
+import math
+from collections import Counter
+from itertools import combinations
+
+import pytest
+from nltk.metrics.association import BigramAssocMeasures, TrigramAssocMeasures
+
+pytest.importorskip('numpy')
+
+
+FIRST = """The/DT cat/NN sat/VBD/sit on/IN the/DT mat/NN ./.
+The/DT cat/NN ,/, the/DT dog/NN and/CC the/DT cat/NN ran/VBD/run ./."""
+SECOND = """A/DT dog/NN sat/VBD/sit on/IN the/DT cat/NN ./."""
+ASSOCIATION = {2: BigramAssocMeasures, 3: TrigramAssocMeasures}
+
+
+@pytest.fixture
+def corpus_engine(engine):
+    engine.add_text('first', FIRST)
+    engine.add_text('second', SECOND)
+    return engine
+
+
+def table_rows(table):
+    return {words: (count, pmi, log_likelihood, t_score)
+            for words, count, pmi, log_likelihood, t_score in table.rows()}
+
+
+def word_runs(engine, field, document=None):
+    corpus = engine.corpus
+    if document is None:
+        start, end = 0, len(corpus)
+    else:
+        start, end = corpus.documents[document]['start'], corpus.documents[document]['end']
+    runs = [[]]
+    previous = None
+    for position in range(start, end):
+        record = corpus.record(position)
+        sentence = (record['doc_name'], record['sent_num'])
+        if sentence != previous or not record['token'].isalpha():
+            runs.append([])
+        previous = sentence
+        if record['token'].isalpha():
+            runs[-1].append(record[field])
+    return [run for run in runs if run]
+
+
+def reference_instances(runs, n, window):
+    if n == 2:
+        return [(run[left], run[right]) for run in runs
+                for left in range(len(run)) for right in range(left + 1, min(left + window, len(run)))]
+    return [tuple(run[start:start + n]) for run in runs for start in range(len(run) - n + 1)]
+
+
+def reference_rows(instances, n, min_freq=1):
+    total = len(instances)
+    subsets = {positions: Counter(tuple(instance[position] for position in positions) for instance in instances)
+               for size in range(1, n + 1) for positions in combinations(range(n), size)}
+    measures = ASSOCIATION[n]
+    rows = {}
+    for ngram, count in subsets[tuple(range(n))].items():
+        if count < min_freq:
+            continue
+        marginals = [[subsets[positions][tuple(ngram[position] for position in positions)]
+                      for positions in combinations(range(n), size)] for size in range(n - 1, 0, -1)]
+        if n == 2:
+            arguments = (count, tuple(marginals[0]), total)
+        else:
+            arguments = (count, tuple(marginals[0]), tuple(marginals[1]), total)
+        rows[ngram] = (count, measures.pmi(*arguments), measures.likelihood_ratio(*arguments),
+                       measures.student_t(*arguments))
+    return rows
+
+
+def assert_rows(actual, expected):
+    assert actual.keys() == expected.keys()
+    for ngram, (count, pmi, log_likelihood, t_score) in expected.items():
+        assert actual[ngram][0] == count
+        assert actual[ngram][1:] == pytest.approx((pmi, log_likelihood, t_score), rel=1e-9, abs=1e-9)
+
+
+def test_bigram_contingency_by_hand(corpus_engine):
+    table = corpus_engine.ngram_statistics(2)
+    rows = table_rows(table)
+    # the cat sat on the mat | the cat | the dog and the cat ran | a dog sat on the cat
+    assert table.total == 16
+    assert len(table) == 11
+    assert rows[('the', 'cat')][0] == 4
+    assert rows[('sat', 'on')][0] == 2
+    assert ('cat', 'the') not in rows
+    assert ('mat', 'the') not in rows
+
+    # ("the", "cat"): O11 = 4, слева "the" 6 раз, справа "cat" 4 раза из 16.
+    observed = [4, 2, 0, 10]
+    expected = [6 * 4 / 16, 6 * 12 / 16, 10 * 4 / 16, 10 * 12 / 16]
+    count, pmi, log_likelihood, t_score = rows[('the', 'cat')]
+    assert pmi == pytest.approx(math.log2(4 * 16 / (6 * 4)))
+    assert t_score == pytest.approx((4 - 6 * 4 / 16) / math.sqrt(4))
+    assert log_likelihood == pytest.approx(
+        2 * sum(o * math.log(o / e) for o, e in zip(observed, expected) if o))
+
+
+@pytest.mark.parametrize('n, window', [(2, None), (2, 3), (2, 5), (3, None)])
+@pytest.mark.parametrize('field', ['token_lower', 'lemma', 'tag'])
+def test_measures_match_reference(corpus_engine, n, window, field):
+    table = corpus_engine.ngram_statistics(n, field, window)
+    instances = reference_instances(word_runs(corpus_engine, field), n, window or n)
+    assert table.total == len(instances)
+    assert_rows(table_rows(table), reference_rows(instances, n))
+
+
+def test_document_and_min_freq(corpus_engine):
+    table = corpus_engine.ngram_statistics(2, document='second')
+    instances = reference_instances(word_runs(corpus_engine, 'token_lower', 'second'), 2, 2)
+    assert table.total == 5
+    assert_rows(table_rows(table), reference_rows(instances, 2))
+
+    instances = reference_instances(word_runs(corpus_engine, 'token_lower'), 2, 2)
+    rows = table_rows(corpus_engine.ngram_statistics(2, min_freq=2))
+    assert set(rows) == {('the', 'cat'), ('sat', 'on'), ('on', 'the')}
+    assert_rows(rows, reference_rows(instances, 2, min_freq=2))
+
+
+def test_rows_ordered_by_measure(corpus_engine):
+    table = corpus_engine.ngram_statistics(2)
+    for measure, column in (('count', 1), ('pmi', 2), ('log_likelihood', 3), ('t_score', 4)):
+        rows = list(table.rows(measure))
+        assert [(-row[column], -row[1]) for row in rows] == sorted((-row[column], -row[1]) for row in rows)
+    assert len(list(table.rows('pmi', limit=3))) == 3
+
+
+def test_ngrams_after_remove(corpus_engine):
+    corpus_engine.remove_document('first')
+    table = corpus_engine.ngram_statistics(2)
+    assert set(table_rows(table)) == {('a', 'dog'), ('dog', 'sat'), ('sat', 'on'), ('on', 'the'), ('the', 'cat')}
+
+
+@pytest.mark.parametrize('arguments', [
+    {'n': 4},
+    {'n': 2, 'window': 1},
+    {'n': 3, 'window': 4},
+    {'n': 2, 'field': 'sent_num'},
+    {'n': 2, 'document': 'missing'},
+])
+def test_invalid_arguments(corpus_engine, arguments):
+    with pytest.raises(ValueError):
+        corpus_engine.ngram_statistics(**arguments)
@@ -0,0 +1,136 @@
+import pytest
+
+from corpus_engine import CorpusEngine
+from corpus_format import is_segmented_corpus
+
+
+FIRST = """The/DT cat/NN sat/VBD on/IN the/DT mat/NN ./.
+A/DT dog/NN barked/VBD/bark ./."""
+SECOND = """Dogs/NNS/dog chase/VBP cats/NNS/cat ,/, mice/NNS/mouse and/CC birds/NNS/bird !/."""
+THIRD = """The/DT mat/NN was/VBD/be red/JJ ./.
+The/DT cat/NN slept/VBD/sleep ./."""
+
+
+def records(engine):
+    corpus = engine.corpus
+    return [corpus.record(position) for position in range(len(corpus))]
+
+
+def documents(engine):
+    return {doc_name: (document['end'] - document['start'], document['sentences'], document['words'])
+            for doc_name, document in engine.corpus.documents.items()}
+
+
+def reload(engine, path):
+    loaded = CorpusEngine(lemma_cache_path=engine.lemma_cache_path)
+    loaded.load(str(path))
+    return loaded
+
+
+def assert_same_corpus(loaded, expected):
+    assert records(loaded) == records(expected)
+    assert documents(loaded) == documents(expected)
+    assert list(loaded.iter_frequency_report()) == list(expected.iter_frequency_report())
+    for phrase in (['the', 'cat'], ['the', 'mat'], ['dogs'], ['cat']):
+        assert list(loaded.index.find_phrase(phrase)) == list(expected.index.find_phrase(phrase))
+
+
+@pytest.fixture
+def saved(engine, tmp_path):
+    engine.add_text('first', FIRST)
+    engine.add_text('second', SECOND)
+    path = tmp_path / 'corpus.scorpus'
+    engine.save_as(str(path))
+    return engine, path
+
+
+def test_unsaved_changes(engine):
+    assert not engine.has_unsaved_changes()
+    engine.add_text('first', FIRST)
+    assert engine.has_unsaved_changes()
+    engine.remove_document('first')
+    assert not engine.has_unsaved_changes()
+
+
+def test_save_and_load(saved):
+    engine, path = saved
+    assert is_segmented_corpus(str(path))
+    assert not engine.has_unsaved_changes()
+    loaded = reload(engine, path)
+    assert_same_corpus(loaded, engine)
+    assert not loaded.has_unsaved_changes()
+
+
+def test_append_writes_only_new_document(saved):
+    engine, path = saved
+    size = path.stat().st_size
+    loaded = reload(engine, path)
+    loaded.add_text('third', THIRD)
+    assert loaded.has_unsaved_changes()
+    segments, written = loaded.save()
+    assert segments == 2
+    assert path.stat().st_size == size + written
+    assert loaded.save() == (0, 0)
+
+    engine.add_text('third', THIRD)
+    assert_same_corpus(reload(engine, path), engine)
+
+
+def test_remove_writes_removal_segment(saved):
+    engine, path = saved
+    loaded = reload(engine, path)
+    loaded.add_text('third', THIRD)
+    loaded.save()
+    loaded.remove_document('first')
+    assert loaded.has_unsaved_changes()
+    assert loaded.save()[0] == 1
+
+    expected = CorpusEngine(lemma_cache_path=engine.lemma_cache_path)
+    expected.add_text('second', SECOND)
+    expected.add_text('third', THIRD)
+    assert_same_corpus(loaded, expected)
+    assert_same_corpus(reload(engine, path), expected)
+
+
+def test_readd_removed_document(saved):
+    engine, path = saved
+    loaded = reload(engine, path)
+    loaded.remove_document('first')
+    loaded.add_text('first', FIRST)
+    loaded.save()
+
+    expected = CorpusEngine(lemma_cache_path=engine.lemma_cache_path)
+    expected.add_text('second', SECOND)
+    expected.add_text('first', FIRST)
+    assert_same_corpus(reload(engine, path), expected)
+
+
+def test_load_rejects_other_files(engine, tmp_path):
+    path = tmp_path / 'notes.scorpus'
+    path.write_bytes(b'not a corpus at all, just some text')
+    with pytest.raises(ValueError):
+        engine.load(str(path))
+
+
+def test_close_releases_mapping(saved):
+    engine, path = saved
+    loaded = reload(engine, path)
+    mapping = loaded.corpus_file.mapping
+    assert not mapping.closed
+    loaded.close()
+    assert mapping.closed
+    assert len(loaded.corpus) == 0
+
+
+def test_save_as_over_mapped_file(saved):
+    engine, path = saved
+    loaded = reload(engine, path)
+    mapping = loaded.corpus_file.mapping
+    loaded.add_text('third', THIRD)
+    loaded.save_as(str(path))
+    assert mapping.closed
+    assert loaded.corpus_file.mapping is None
+
+    engine.add_text('third', THIRD)
+    assert_same_corpus(loaded, engine)
+    assert_same_corpus(reload(engine, path), engine)
@@ -0,0 +1,76 @@
+import pytest
+
+from corpus_query import MAX_REPEAT, QuerySyntaxError, parse_query
+
+
+FIRST = """The/DT cat/NN was/VBD/be seen/VBN/see by/IN the/DT dog/NN ./.
+Dogs/NNS/dog were/VBD/be quickly/RB chased/VBN/chase ./."""
+SECOND = """The/DT big/JJ old/JJ cat/NN is/VBZ/be here/RB ./.
+A/DT cat/NN ./."""
+
+
+@pytest.fixture
+def corpus_engine(engine):
+    engine.add_text('first', FIRST)
+    engine.add_text('second', SECOND)
+    return engine
+
+
+def matched(engine, text):
+    return [engine.corpus.values('token', start, end) for start, end in engine.pattern_query(text).matches()]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('[lemma="be"] [tag="VBN"]', [['was', 'seen']]),
+    ('[lemma="be"] [tag="RB"]? [tag="VBN"]', [['was', 'seen'], ['were', 'quickly', 'chased']]),
+    ('"the" [tag="JJ"]{0,3} "cat"', [['The', 'cat'], ['The', 'big', 'old', 'cat']]),
+    ('"the" [tag="JJ"]{1} "cat"', []),
+    ('cat', [['cat'], ['cat'], ['cat']]),
+    ('CAT', [['cat'], ['cat'], ['cat']]),
+    ('[token="Dogs"]', [['Dogs']]),
+    ('[token="dogs"]', []),
+    ('[word=/d.*/]', [['dog'], ['Dogs']]),
+    ('"ch*"', [['chased']]),
+    ('[tag="DT"] [tag!="NN"]', [['The', 'big']]),
+    ('[lemma="cat" & tag="NN"] [lemma="be"]', [['cat', 'was'], ['cat', 'is']]),
+    ('"dog" "."', [['dog', '.']]),
+    ('"." "dogs"', []),
+    ('"." "the"', []),
+    ('"unicorn"', []),
+])
+def test_pattern_matches(corpus_engine, text, expected):
+    assert matched(corpus_engine, text) == expected
+
+
+def test_pattern_matches_after_remove(corpus_engine):
+    corpus_engine.remove_document('first')
+    assert matched(corpus_engine, 'cat') == [['cat'], ['cat']]
+    assert matched(corpus_engine, '[lemma="be"] [tag="RB"]') == [['is', 'here']]
+
+
+def test_parse_query():
+    assert parse_query('[lemma="be" & tag!=/VB.*/] "a"? cat{2,}') == [
+        ([('lemma', '"be"', False, 'string'), ('tag', '/VB.*/', True, 'regex')], 1, 1),
+        ([('word', '"a"', False, 'string')], 0, 1),
+        ([('word', 'cat', False, 'name')], 2, MAX_REPEAT),
+    ]
+
+
+@pytest.mark.parametrize('text, message', [
+    ('', "Запрос пуст"),
+    ('[lemma="be"', "не закрыта скобка"),
+    ('[lemma "be"]', "ожидалось '=' или '!='"),
+    ('[lemma=be]', "ожидалось значение в кавычках или /регулярное выражение/"),
+    ('[color="red"]', "Неизвестный атрибут 'color'"),
+    ('[tag="NN" tag="VB"]', "ожидалось '&' или ']'"),
+    ('"a" ]', "неожиданное ']'"),
+    ('"a" !', "Неожиданный символ в позиции 5"),
+    ('"a"{3,1}', "Недопустимое число повторов"),
+    (f'"a"{{0,{MAX_REPEAT + 1}}}', "Недопустимое число повторов"),
+    ('[word=/(/]', "Ошибка в регулярном выражении"),
+    ('[tag!="NN"]', "нет условия для поиска по индексу"),
+    ('"a"? "b"{0,2}', "нет условия для поиска по индексу"),
+])
+def test_syntax_errors(corpus_engine, text, message):
+    with pytest.raises(QuerySyntaxError, match=message):
+        corpus_engine.pattern_query(text)
@@ -0,0 +1,138 @@
+import sqlite3
+
+import pytest
+
+from corpus_sqlite import SqliteCorpusEngine
+
+
+def has_fts5():
+    try:
+        sqlite3.connect(':memory:').execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not has_fts5(), reason="SQLite собран без FTS5")
+
+TEXTS = {
+    'first': """The/DT cat/NN sat/VBD on/IN the/DT mat/NN ./.
+The/DT cat/NN ,/, sat/VBD the/DT dog/NN ,/, or/CC not/RB ./.
+Not/RB the/DT cat/NN or/CC the/DT cat/NN ./.""",
+    'second': """The/DT café/NN near/IN the/DT mat/NN ./.
+Кот/NN сидел/VBD на/IN коврике/NN ./.
+the/DT the/DT the/DT cat/NN""",
+    'third': """cat/NN sat/VBD ./.
+The/DT cat/NN sat/VBD on/IN the/DT cat/NN sat/VBD ./.""",
+}
+PHRASES = [
+    ['cat'], ['the', 'cat'], ['cat', 'sat'], ['the', 'cat', 'sat'], ['sat', 'on', 'the'], ['or', 'not'],
+    ['not', 'the'], ['or', 'the', 'cat'], ['mat', 'the'], ['cat', 'the'], ['near'], ['café'], ['cafe'],
+    ['кот', 'сидел'], ['коврике'], ['the', 'the'], ['the', 'the', 'cat'], ['sat', 'cat'], ['unicorn'],
+    ['the', 'unicorn'],
+]
+
+
+@pytest.fixture
+def engines(engine, tmp_path):
+    database = SqliteCorpusEngine(str(tmp_path / 'corpus.sqlite'), lemma_cache_path=engine.lemma_cache_path)
+    for doc_name, text in TEXTS.items():
+        engine.add_text(doc_name, text)
+        database.add_text(doc_name, text)
+    yield engine, database
+    database.close()
+
+
+def concordance_lines(engine, phrase):
+    return list(engine.concordance(phrase).lines())
+
+
+@pytest.mark.parametrize('phrase', PHRASES)
+def test_find_phrase_matches_memory_index(engines, phrase):
+    memory, database = engines
+    assert list(database.corpus.find_phrase(phrase)) == list(memory.index.find_phrase(phrase))
+    assert concordance_lines(database, phrase) == concordance_lines(memory, phrase)
+
+
+def test_find_phrase_after_remove_and_reopen(engines, tmp_path):
+    memory, database = engines
+    memory.remove_document('first')
+    database.remove_document('first')
+    for phrase in PHRASES:
+        assert concordance_lines(database, phrase) == concordance_lines(memory, phrase)
+
+    database.close()
+    reopened = SqliteCorpusEngine(str(tmp_path / 'corpus.sqlite'), lemma_cache_path=memory.lemma_cache_path)
+    try:
+        for phrase in PHRASES:
+            assert concordance_lines(reopened, phrase) == concordance_lines(memory, phrase)
+        assert reopened.corpus.word_count_of('cat') == len(memory.index.positions('token_lower', 'cat'))
+    finally:
+        reopened.close()
+
+
+def test_frequency_report_matches_memory_corpus(engines):
+    memory, database = engines
+    assert list(database.iter_frequency_report()) == list(memory.iter_frequency_report())
+
+
+PATTERNS = [
+    '"the" "cat"', '[lemma="cat"] [tag="VBD"]', '"the"{1,3} "cat"', '[tag="DT"] [tag!="NN"]', '"cat" [tag="VBD"]? "on"',
+    '[word=/c.*/]', '[token="The"] "cat"', '"the" [tag="NN"]{0,2} "."', '"." "the"', '"cat" "," "sat"', '"unicorn"',
+    '[tag="DT" & word!="a"] [word=/.*a.*/]', '[tag="VBD"] "the"? [tag="NN"]',
+]
+
+
+def pattern_lines(engine, text):
+    return list(engine.iter_pattern_report(engine.pattern_query(text)))
+
+
+@pytest.mark.parametrize('text', PATTERNS)
+def test_pattern_query_matches_memory_corpus(engines, text):
+    memory, database = engines
+    assert list(database.pattern_query(text).matches()) == list(memory.pattern_query(text).matches())
+    assert pattern_lines(database, text) == pattern_lines(memory, text)
+
+
+def test_pattern_query_after_remove(engines):
+    memory, database = engines
+    memory.remove_document('second')
+    database.remove_document('second')
+    for text in PATTERNS:
+        assert pattern_lines(database, text) == pattern_lines(memory, text)
+
+
+def ngram_rows(table):
+    return {words: (count, *measures) for words, count, *measures in table.rows()}
+
+
+@pytest.mark.parametrize('n, window', [(2, None), (2, 3), (2, 5), (3, None)])
+@pytest.mark.parametrize('field', ['token_lower', 'lemma', 'tag'])
+def test_ngrams_match_memory_corpus(engines, n, window, field):
+    pytest.importorskip('numpy')
+    memory, database = engines
+    memory.remove_document('first')
+    database.remove_document('first')
+    for document, min_freq in ((None, 1), (None, 2), ('third', 1)):
+        expected = memory.ngram_statistics(n, field, window, min_freq, document)
+        table = database.ngram_statistics(n, field, window, min_freq, document)
+        assert table.total == expected.total
+        assert ngram_rows(table) == pytest.approx(ngram_rows(expected), rel=1e-9)
+
+
+def test_failed_add_rolls_back_vocabularies(engines):
+    memory, database = engines
+    strings, tags = list(database.corpus.strings.strings), list(database.corpus.tags.strings)
+    records = [{'doc_name': 'fourth', 'token': 'Zebra', 'token_lower': 'zebra', 'tag': 'NNP', 'lemma': 'zebra',
+                'sent_num': 1, 'token_num': 1},
+               {'doc_name': 'fifth', 'token': 'ran', 'token_lower': 'ran', 'tag': 'VBD', 'lemma': 'run',
+                'sent_num': 1, 'token_num': 2}]
+    with pytest.raises(ValueError):
+        database.corpus.add_document('fourth', iter(records))
+    assert database.corpus.strings.strings == strings
+    assert database.corpus.tags.strings == tags
+    assert not database.corpus.has_document('fourth')
+
+    memory.add_text('fourth', "zebra/NNP ran/VBD/run")
+    database.add_text('fourth', "zebra/NNP ran/VBD/run")
+    assert pattern_lines(database, '[tag="NNP"] [lemma="run"]') == pattern_lines(memory, '[tag="NNP"] [lemma="run"]')
@@ -0,0 +1,95 @@
+import math
+
+import pytest
+
+from corpus_engine import CorpusEngine
+
+pytest.importorskip('numpy')
+
+
+TEXTS = {
+    'cats': "Cat/NN cat/NN dog/NN ./.",
+    'fish': "Cats/NNS/cat fish/NN ,/, !/.",
+    'birds': "bird/NN bird/NN Bird/NN",
+}
+MORE = {'dogs': "dog/NN dog/NN cat/NN fish/NN"}
+
+
+@pytest.fixture
+def corpus_engine(engine):
+    for doc_name, text in TEXTS.items():
+        engine.add_text(doc_name, text)
+    return engine
+
+
+def idf(n_docs, document_frequency):
+    return math.log((1 + n_docs) / (1 + document_frequency)) + 1
+
+
+def tf(count):
+    return 1 + math.log(count)
+
+
+def test_tfidf_by_hand(corpus_engine):
+    # Три документа; "cat" встречается в двух, остальные слова - в одном. Знаки препинания не считаются.
+    assert corpus_engine.document_analysis('tfidf', 'cats', 'token_lower') == [
+        ('cat', 2, 1, pytest.approx(tf(2) * idf(3, 1))),
+        ('dog', 1, 1, pytest.approx(tf(1) * idf(3, 1))),
+    ]
+    assert corpus_engine.document_analysis('tfidf', 'cats', 'lemma') == [
+        ('cat', 2, 2, pytest.approx(tf(2) * idf(3, 2))),
+        ('dog', 1, 1, pytest.approx(tf(1) * idf(3, 1))),
+    ]
+    assert corpus_engine.document_analysis('tfidf', 'birds', 'lemma') == [
+        ('bird', 3, 1, pytest.approx(tf(3) * idf(3, 1))),
+    ]
+    assert len(corpus_engine.document_analysis('tfidf', 'cats', 'lemma', limit=1)) == 1
+
+
+def test_cosine_by_hand(corpus_engine):
+    cat_in_cats, dog = tf(2) * idf(3, 2), tf(1) * idf(3, 1)
+    cat_in_fish, fish = tf(1) * idf(3, 2), tf(1) * idf(3, 1)
+    expected = cat_in_cats * cat_in_fish / (math.hypot(cat_in_cats, dog) * math.hypot(cat_in_fish, fish))
+    assert corpus_engine.document_analysis('similar', 'cats', 'lemma') == [
+        ('fish', pytest.approx(expected)),
+        ('birds', 0.0),
+    ]
+    assert corpus_engine.document_analysis('similar', 'fish', 'lemma', limit=1) == [('cats', pytest.approx(expected))]
+    assert [score for _, score in corpus_engine.document_analysis('similar', 'cats', 'token_lower')] == [0.0, 0.0]
+
+
+def test_matrix_is_built_on_first_analysis(corpus_engine):
+    matrix = corpus_engine.terms.matrices['lemma']
+    assert len(matrix) == 0
+    assert matrix.pending == list(TEXTS)
+    corpus_engine.document_analysis('tfidf', 'cats')
+    assert len(matrix) == len(TEXTS)
+    assert matrix.pending == []
+    assert corpus_engine.terms.matrices['token_lower'].pending == list(TEXTS)
+
+
+@pytest.mark.parametrize('analysis', ['tfidf', 'similar'])
+@pytest.mark.parametrize('field', ['lemma', 'token_lower'])
+def test_remove_and_add_match_fresh_corpus(corpus_engine, analysis, field):
+    for doc_name in TEXTS:
+        corpus_engine.document_analysis(analysis, doc_name, field)
+    corpus_engine.remove_document('birds')
+    for doc_name, text in MORE.items():
+        corpus_engine.add_text(doc_name, text)
+
+    fresh = CorpusEngine(lemma_cache_path=corpus_engine.lemma_cache_path)
+    for doc_name in ('cats', 'fish', *MORE):
+        fresh.add_text(doc_name, {**TEXTS, **MORE}[doc_name])
+    for doc_name in fresh.corpus.document_names():
+        expected = fresh.document_analysis(analysis, doc_name, field)
+        assert corpus_engine.document_analysis(analysis, doc_name, field) == [
+            (*row[:-1], pytest.approx(row[-1])) for row in expected]
+
+
+def test_invalid_analysis(corpus_engine):
+    with pytest.raises(ValueError):
+        corpus_engine.document_analysis('tfidf', 'missing')
+    with pytest.raises(ValueError):
+        corpus_engine.document_analysis('tfidf', 'cats', 'tag')
+    with pytest.raises(ValueError):
+        corpus_engine.document_analysis('summary', 'cats')
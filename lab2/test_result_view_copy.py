@@ -0,0 +1,11 @@
+from pathlib import Path
+
+
+HERE = Path(__file__).parent
+
+
+def test_lab3_4_copy_matches_original():
+    original = (HERE / 'result_view.py').read_text(encoding='utf-8')
+    marker, copy = (HERE.parent / 'lab3_4' / 'result_view.py').read_text(encoding='utf-8').split('\n', 1)
+    assert marker.startswith('# Копия lab2/result_view.py')
+    assert copy == original
@@ -0,0 +1,64 @@
+import io
+
+import nltk.tokenize
+import pytest
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+import text_stream
+from text_stream import SentenceReader
+
+
+OVERLAP = 16
+TEXT = ("The cat sat. A dog barked at the mailman for a very long time without any pause at all. "
+        "He left. Dr. Smith arrived at 5 p.m. and said hello.\nShort one! "
+        "Then a sentence that is much longer than the scan overlap window runs across several chunks "
+        "before it finally ends. Ok. Yes?\n\nNo. The end.")
+
+
+@pytest.fixture
+def split(monkeypatch):
+    # Без данных punkt_tab: необученный Punkt делит так же, только без списка сокращений.
+    tokenize = PunktSentenceTokenizer().tokenize
+    monkeypatch.setattr(nltk.tokenize, 'sent_tokenize', tokenize)
+    monkeypatch.setattr(text_stream, 'SCAN_OVERLAP_CHARS', OVERLAP)
+    return tokenize
+
+
+def read(text, chunk_size):
+    return list(SentenceReader(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', range(OVERLAP // 2, 3 * OVERLAP))
+def test_chunked_reading_matches_whole_text(split, chunk_size):
+    assert read(TEXT, chunk_size) == split(TEXT)
+
+
+def test_break_at_chunk_boundary_inside_overlap(split):
+    # Граница "sat. A" попадает ровно на конец первого чанка, а конец предложения
+    # "barked ... all." - в последние OVERLAP символов буфера.
+    first = TEXT.index(" A dog") + 1
+    assert read(TEXT, first) == split(TEXT)
+    end = TEXT.index("all.") + len("all.")
+    for chunk_size in range(end - OVERLAP, end + 2):
+        assert read(TEXT, chunk_size) == split(TEXT)
+
+
+@pytest.mark.parametrize('chunk_size', range(OVERLAP // 2, 3 * OVERLAP))
+def test_sentence_yielded_once_next_one_starts(split, chunk_size):
+    # Итог совпадает и без перекрытия, поэтому проверяется задержка: предложение
+    # отдается не позже чем через чанк после первого слова следующего.
+    sentences = split(TEXT)
+    first_words = []
+    for sentence in sentences[1:]:
+        start = TEXT.index(sentence)
+        first_words.append(start + len(sentence.split()[0]))
+    reader = SentenceReader(io.StringIO(TEXT), chunk_size=chunk_size)
+    for number, sentence in enumerate(reader):
+        if number < len(first_words):
+            assert reader.characters <= first_words[number] + chunk_size
+
+
+def test_reader_counts_characters(split):
+    reader = SentenceReader(io.StringIO(TEXT), chunk_size=10)
+    list(reader)
+    assert reader.characters == len(TEXT)
@@ -0,0 +1,121 @@
+import time
+
+from corpus_store import TokenBatch
+from diagnostics import pipeline_timings
+from lemma_cache import LemmaCache
+from text_stream import SentenceReader
+
+
+WORDNET_ADJ, WORDNET_VERB, WORDNET_NOUN, WORDNET_ADV = 'a', 'v', 'n', 'r'
+
+lemmatizer = None
+
+def lemmatize(form, pos=WORDNET_NOUN):
+    global lemmatizer
+    if lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+    return lemmatizer.lemmatize(form, pos=pos)
+
+lemma_cache = LemmaCache(lemmatize)
+
+def get_wordnet_pos(treebank_tag):
+    if treebank_tag.startswith('J'):
+        return WORDNET_ADJ
+    elif treebank_tag.startswith('V'):
+        return WORDNET_VERB
+    elif treebank_tag.startswith('N'):
+        return WORDNET_NOUN
+    elif treebank_tag.startswith('R'):
+        return WORDNET_ADV
+    else:
+        return WORDNET_NOUN
+
+def iter_pos_tagged(text):
+    from nltk.tokenize import sent_tokenize
+    started = time.perf_counter()
+    sentences = sent_tokenize(text)
+    pipeline_timings.add('sentences', time.perf_counter() - started, len(sentences))
+    return iter_pos_tagged_sentences(sentences)
+
+def iter_pos_tagged_sentences(raw_sentences):
+    from nltk import pos_tag, word_tokenize
+    tokenize_time = tag_time = 0.0
+    sentences = tokens = 0
+    try:
+        for sent_idx, sentence_text in enumerate(raw_sentences):
+            started = time.perf_counter()
+            raw_tokens = word_tokenize(sentence_text)
+            tokenized = time.perf_counter()
+            tokenize_time += tokenized - started
+            sentences += 1
+            if not raw_tokens:
+                continue
+
+            tagged_tokens = pos_tag(raw_tokens)
+            tag_time += time.perf_counter() - tokenized
+            tokens += len(raw_tokens)
+
+            for token_idx, (token, tag) in enumerate(tagged_tokens):
+                yield token, tag, sent_idx + 1, token_idx + 1
+    finally:
+        pipeline_timings.add('tokenize', tokenize_time, tokens, sentences)
+        pipeline_timings.add('tag', tag_time, tokens, sentences)
+
+def iter_tagged_tokens(text):
+    return iter_lemmatized(iter_pos_tagged(text))
+
+def iter_lemmatized(pos_tagged):
+    elapsed = 0.0
+    tokens = 0
+    try:
+        for token, tag, sent_num, token_num in pos_tagged:
+            started = time.perf_counter()
+            token_lower = token.lower()
+            wn_tag = get_wordnet_pos(tag)
+            lemma = lemma_cache.lemmatize(token_lower, wn_tag)
+            elapsed += time.perf_counter() - started
+            tokens += 1
+            yield token, token_lower, tag, lemma, sent_num, token_num
+    finally:
+        pipeline_timings.add('lemmatize', elapsed, tokens)
+
+def iter_records(tagged_tokens, doc_name):
+    for token, token_lower, tag, lemma, sent_num, token_num in tagged_tokens:
+        yield {
+            'token': token,
+            'token_lower': token_lower,
+            'tag': tag,
+            'lemma': lemma,
+            'doc_name': doc_name,
+            'sent_num': sent_num,
+            'token_num': token_num
+        }
+
+def process_text(text, doc_name):
+    return list(iter_records(iter_tagged_tokens(text), doc_name))
+
+def iter_stream_tokens(reader):
+    return iter_lemmatized(iter_pos_tagged_sentences(reader))
+
+def fill_batch(tagged_tokens):
+    batch = TokenBatch()
+    for token_fields in tagged_tokens:
+        batch.append(*token_fields)
+    return batch
+
+def process_text_batch(text):
+    return fill_batch(iter_tagged_tokens(text))
+
+def init_worker(lemma_entries=()):
+    pipeline_timings.reset()
+    lemma_cache.merge(lemma_entries)
+    lemma_cache.record_new = True
+
+def process_file(filepath):
+    hits, misses = lemma_cache.counts()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        reader = SentenceReader(f)
+        batch = fill_batch(iter_stream_tokens(reader))
+    lemma_report = (lemma_cache.hits - hits, lemma_cache.misses - misses, lemma_cache.drain_new_entries())
+    return batch, reader.characters, lemma_report, pipeline_timings.drain()
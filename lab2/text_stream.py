@@ -0,0 +1,66 @@
+import time
+
+from diagnostics import pipeline_timings
+
+
+CHUNK_SIZE = 1 << 20
+MAX_SENTENCE_CHARS = 1 << 24
+SCAN_OVERLAP_CHARS = 1 << 10
+
+
+class SentenceReader:
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, max_sentence_chars=MAX_SENTENCE_CHARS):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_sentence_chars = max_sentence_chars
+        self.characters = 0
+
+    def _chunks(self):
+        pending = ''
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            self.characters += len(chunk)
+            text = pending + chunk
+            cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t'))
+            if cut < 0:
+                pending = text
+                if len(pending) < self.max_sentence_chars:
+                    continue
+                cut = len(pending) - 1
+            pending = text[cut + 1:]
+            yield text[:cut + 1]
+        if pending:
+            yield pending
+
+    def _split(self, text, count=True):
+        from nltk.tokenize import sent_tokenize
+        started = time.perf_counter()
+        sentences = sent_tokenize(text)
+        pipeline_timings.add('sentences', time.perf_counter() - started, len(sentences) if count else 0)
+        return sentences
+
+    def __iter__(self):
+        buffer = ''
+        scan_from = 0
+        for chunk in self._chunks():
+            buffer += chunk
+            if scan_from and len(self._split(buffer[scan_from:], count=False)) < 2:
+                sentences = None
+            else:
+                sentences = self._split(buffer)
+            if sentences is None or len(sentences) < 2:
+                if len(buffer) >= self.max_sentence_chars:
+                    yield from self._split(buffer) if sentences is None else sentences
+                    buffer = ''
+                    scan_from = 0
+                else:
+                    scan_from = max(0, len(buffer) - SCAN_OVERLAP_CHARS)
+                continue
+            yield from sentences[:-1]
+            buffer = buffer[buffer.rfind(sentences[-1]):]
+            scan_from = 0
+        if buffer:
+            yield from self._split(buffer)
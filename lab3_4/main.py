@@ -4,6 +4,9 @@ import nltk
 import spacy
 import os
 
+from extraction_cache import ExtractionCache
+from result_view import ResultView
+
 
 
 try:
@@ -44,6 +47,21 @@ except ImportError:
     print("spaCy not found. Dependency Parsing support will be disabled. Install with: pip install spacy en-core-web-sm")
 
 
+EXTRACTOR_VERSION = 1
+
+
+def get_wordnet_pos(treebank_tag):
+    if treebank_tag.startswith('J'):
+        return nltk.corpus.wordnet.ADJ
+    elif treebank_tag.startswith('V'):
+        return nltk.corpus.wordnet.VERB
+    elif treebank_tag.startswith('N'):
+        return nltk.corpus.wordnet.NOUN
+    elif treebank_tag.startswith('R'):
+        return nltk.corpus.wordnet.ADV
+    else:
+        return nltk.corpus.wordnet.NOUN
+
 
 class NLPLabApp:
     def __init__(self, root):
@@ -60,6 +78,11 @@ class NLPLabApp:
 
         self.analysis_type_var = tk.StringVar(value="Tokenization & POS Tagging")
         self.current_file_path = None
+        try:
+            self.extraction_cache = ExtractionCache()
+        except OSError as e:
+            print(f"Extraction cache disabled: {e}")
+            self.extraction_cache = None
 
         self.main_paned_window = ttk.PanedWindow(self.root, orient=tk.VERTICAL)
         self.main_paned_window.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -84,8 +107,9 @@ class NLPLabApp:
         self.output_frame = ttk.Frame(self.main_paned_window)
         self.main_paned_window.add(self.output_frame, weight=1)
         ttk.Label(self.output_frame, text="Результат анализа:").pack(anchor="w")
-        self.output_text_area = scrolledtext.ScrolledText(self.output_frame, wrap=tk.WORD, height=15, font=('Arial',11), state=tk.DISABLED)
-        self.output_text_area.pack(fill=tk.BOTH, expand=True)
+        self.output_view = ResultView(self.output_frame, font=('Arial',11),
+                                      on_save=self.save_results, on_error=self.show_analysis_error)
+        self.output_view.pack(fill=tk.BOTH, expand=True)
 
         self.create_menu()
 
@@ -97,6 +121,9 @@ class NLPLabApp:
         file_menu.add_command(label="Открыть...", command=self.open_file, accelerator="Ctrl+O")
         file_menu.add_command(label="Сохранить результат как...", command=self.save_results, accelerator="Ctrl+S")
         file_menu.add_separator()
+        file_menu.add_command(label="Статистика кэша извлечения", command=self.show_cache_stats)
+        file_menu.add_command(label="Очистить кэш извлечения", command=self.clear_extraction_cache)
+        file_menu.add_separator()
         file_menu.add_command(label="Выход", command=self.exit_app)
 
         edit_menu = tk.Menu(menubar, tearoff=0)
@@ -113,16 +140,30 @@ class NLPLabApp:
         self.root.bind_all("<Control-s>", lambda e: self.save_results())
 
     def set_output_text(self, text):
-        self.output_text_area.config(state=tk.NORMAL)
-        self.output_text_area.delete(1.0, tk.END)
-        self.output_text_area.insert(tk.END, text)
-        self.output_text_area.config(state=tk.DISABLED)
+        self.output_view.show_text(text)
+
+    def set_output_lines(self, make_lines):
+        self.output_view.show(make_lines)
+
+    def set_output_analysis(self, title, sentences, analyze, iter_result_lines):
+        results = []
+
+        def make_lines():
+            yield title
+            for i, sentence in enumerate(sentences):
+                if i == len(results):
+                    results.append(analyze(sentence))
+                yield ""
+                yield f"Предложение {i + 1}: {sentence}"
+                yield from iter_result_lines(results[i])
+
+        self.set_output_lines(make_lines)
 
     def copy_results(self):
         try:
-            content = self.output_text_area.get(1.0, tk.END)
             self.root.clipboard_clear()
-            self.root.clipboard_append(content)
+            for number, line in enumerate(self.output_view.iter_all()):
+                self.root.clipboard_append(f"\n{line}" if number else line)
             messagebox.showinfo("Скопировано", "Результат скопирован в буфер обмена.")
         except Exception as e:
             messagebox.showwarning("Ошибка копирования", f"Не удалось скопировать результат: {e}")
@@ -155,8 +196,15 @@ class NLPLabApp:
         try:
             content = ""
             file_extension = os.path.splitext(filepath)[1].lower()
-
-            if file_extension == ".txt":
+            cache_key = None
+            cached = None
+            if file_extension != ".txt" and self.extraction_cache is not None:
+                cache_key = self.extraction_cache.file_key(filepath, f"lab3_4-{file_extension.lstrip('.')}", EXTRACTOR_VERSION)
+                cached = self.extraction_cache.get(cache_key)
+
+            if cached is not None:
+                content = cached["text"]
+            elif file_extension == ".txt":
                 with open(filepath, "r", encoding="utf-8") as f:
                     content = f.read()
             elif file_extension == ".docx":
@@ -213,6 +261,12 @@ class NLPLabApp:
                                        f"Файлы с расширением '{file_extension}' не поддерживаются для автоматического чтения в этой версии.")
                 return
 
+            if cache_key is not None and cached is None:
+                try:
+                    self.extraction_cache.put(cache_key, {"text": content})
+                except OSError as e:
+                    print(f"Could not store extracted text in cache: {e}")
+
             self.input_text_area.delete(1.0, tk.END)
             self.input_text_area.insert(tk.END, content)
             self.set_output_text("")
@@ -222,9 +276,20 @@ class NLPLabApp:
             self.current_file_path = None
             self.root.title("Лабораторная работа №4 - Семантико-синтаксический анализ")
 
+    def show_cache_stats(self):
+        if self.extraction_cache is None:
+            messagebox.showinfo("Кэш извлечения", "Кэш извлечения текста недоступен.")
+            return
+        messagebox.showinfo("Кэш извлечения", self.extraction_cache.format_stats())
+
+    def clear_extraction_cache(self):
+        if self.extraction_cache is None:
+            return
+        if messagebox.askyesno("Кэш извлечения", "Удалить все сохраненные результаты извлечения текста?"):
+            self.extraction_cache.clear()
+
     def save_results(self):
-        content_to_save = self.output_text_area.get(1.0, tk.END).strip()
-        if not content_to_save:
+        if not self.output_view.has_content():
             messagebox.showwarning("Нечего сохранять", "Область результатов пуста.")
             return
 
@@ -237,8 +302,7 @@ class NLPLabApp:
             return
 
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(content_to_save)
+            self.output_view.save_to(filepath)
             messagebox.showinfo("Сохранено", f"Результат успешно сохранен в: {filepath}")
         except Exception as e:
             messagebox.showerror("Ошибка сохранения", f"Не удалось сохранить файл: {filepath}\n{str(e)}")
@@ -250,24 +314,15 @@ class NLPLabApp:
             return
 
         analysis_choice = self.analysis_type_var.get()
-        results = ""
-        self.output_text_area.config(state=tk.NORMAL)
-        self.output_text_area.delete(1.0, tk.END)
-
         try:
             sentences = nltk.sent_tokenize(input_text)
             if not sentences:
-                results = "Не удалось сегментировать текст на предложения."
-                self.set_output_text(results)
+                self.set_output_text("Не удалось сегментировать текст на предложения.")
                 return
 
             if analysis_choice == "Tokenization & POS Tagging":
-                results += "--- Токенизация и Частеречная разметка (POS Tagging) ---\n\n"
-                for i, sentence in enumerate(sentences):
-                    words = nltk.word_tokenize(sentence)
-                    tagged_words = nltk.pos_tag(words)
-                    results += f"Предложение {i + 1}: {sentence}\n"
-                    results += "Токены и теги: " + str(tagged_words) + "\n\n"
+                self.set_output_analysis("--- Токенизация и Частеречная разметка (POS Tagging) ---", sentences,
+                                         self.analyze_pos_tagging, self.iter_pos_tagging_lines)
 
             elif analysis_choice == "Sentiment Analysis":
 
@@ -278,67 +333,64 @@ class NLPLabApp:
                     return
 
                 analyzer = SentimentIntensityAnalyzer()
-                results += "--- Анализ тональности (Sentiment Analysis) ---\n\n"
-                for i, sentence in enumerate(sentences):
-                    scores = analyzer.polarity_scores(sentence)
-                    results += f"Предложение {i + 1}: {sentence}\n"
-                    results += (f"Положительный: {scores['pos']:.3f}, "
-                                f"Нейтральный: {scores['neu']:.3f}, "
-                                f"Отрицательный: {scores['neg']:.3f}, "
-                                f"Сводный балл: {scores['compound']:.3f}\n\n")
-                self.set_output_text(results.strip())
-                return
+                self.set_output_analysis("--- Анализ тональности (Sentiment Analysis) ---", sentences,
+                                         analyzer.polarity_scores, self.iter_sentiment_lines)
 
             elif analysis_choice == "Lemmatization":
-                results += "--- Лемматизация (WordNetLemmatizer) ---\n\n"
                 lemmatizer = nltk.stem.WordNetLemmatizer()
+                self.set_output_analysis("--- Лемматизация (WordNetLemmatizer) ---", sentences,
+                                         lambda sentence: self.analyze_lemmas(lemmatizer, sentence),
+                                         self.iter_lemmatization_lines)
 
-                def get_wordnet_pos(treebank_tag):
-                    if treebank_tag.startswith('J'):
-                        return nltk.corpus.wordnet.ADJ
-                    elif treebank_tag.startswith('V'):
-                        return nltk.corpus.wordnet.VERB
-                    elif treebank_tag.startswith('N'):
-                        return nltk.corpus.wordnet.NOUN
-                    elif treebank_tag.startswith('R'):
-                        return nltk.corpus.wordnet.ADV
-                    else:
-                        return nltk.corpus.wordnet.NOUN
-
-                for i, sentence in enumerate(sentences):
-                    words = nltk.word_tokenize(sentence)
-                    pos_tags = nltk.pos_tag(words)
-                    results += f"Предложение {i + 1}: {sentence}\n"
-                    results += "Слово -> Лемма (с учетом части речи):\n"
-                    for word, tag in pos_tags:
-                        wn_tag = get_wordnet_pos(tag)
-                        lemma = lemmatizer.lemmatize(word, wn_tag)
-                        results += f"  '{word}' ({tag} -> {wn_tag}) -> '{lemma}'\n"
-                    results += "\n"
             elif analysis_choice == "Dependency Parsing":
                 if not nlp:
                     self.set_output_text("Dependency Parsing недоступен: spaCy не установлен или модель не загружена.")
                     return
-                results = "--- Деревья зависимостей (spaCy) ---\n\n"
-                for i, sent in enumerate(sentences):
-                    doc = nlp(sent)
-                    results += f"Предложение {i+1}: {sent}\n"
-                    for token in doc:
-                        results += f"{token.text:<12} ---> {token.dep_:<10} ---> {token.head.text}\n"
-                    results += "\n"
-                self.set_output_text(results)
-                return
+                self.set_output_analysis("--- Деревья зависимостей (spaCy) ---", sentences,
+                                         self.analyze_dependencies, self.iter_dependency_lines)
 
             else:
-                results = "Выбран неизвестный тип анализа."
-
-            self.set_output_text(results.strip())
+                self.set_output_text("Выбран неизвестный тип анализа.")
 
         except Exception as e:
-            messagebox.showerror("Ошибка анализа",
-                                 f"Произошла ошибка во время анализа:\n{str(e)}\n\nУбедитесь, что необходимые ресурсы NLTK загружены (см. меню Помощь).")
+            self.show_analysis_error(e)
             self.set_output_text(f"Ошибка: {str(e)}")
 
+    def show_analysis_error(self, error):
+        messagebox.showerror("Ошибка анализа",
+                             f"Произошла ошибка во время анализа:\n{str(error)}\n\nУбедитесь, что необходимые ресурсы NLTK загружены (см. меню Помощь).")
+
+    def analyze_pos_tagging(self, sentence):
+        return nltk.pos_tag(nltk.word_tokenize(sentence))
+
+    def iter_pos_tagging_lines(self, tagged_words):
+        yield "Токены и теги: " + str(tagged_words)
+
+    def iter_sentiment_lines(self, scores):
+        yield (f"Положительный: {scores['pos']:.3f}, "
+               f"Нейтральный: {scores['neu']:.3f}, "
+               f"Отрицательный: {scores['neg']:.3f}, "
+               f"Сводный балл: {scores['compound']:.3f}")
+
+    def analyze_lemmas(self, lemmatizer, sentence):
+        lemmas = []
+        for word, tag in nltk.pos_tag(nltk.word_tokenize(sentence)):
+            wn_tag = get_wordnet_pos(tag)
+            lemmas.append((word, tag, wn_tag, lemmatizer.lemmatize(word, wn_tag)))
+        return lemmas
+
+    def iter_lemmatization_lines(self, lemmas):
+        yield "Слово -> Лемма (с учетом части речи):"
+        for word, tag, wn_tag, lemma in lemmas:
+            yield f"  '{word}' ({tag} -> {wn_tag}) -> '{lemma}'"
+
+    def analyze_dependencies(self, sentence):
+        return [(token.text, token.dep_, token.head.text) for token in nlp(sentence)]
+
+    def iter_dependency_lines(self, dependencies):
+        for text, dep, head in dependencies:
+            yield f"{text:<12} ---> {dep:<10} ---> {head}"
+
     def show_about(self):
         about_text = """
 Лабораторная работа №4: Семантико-синтаксический анализ текстов